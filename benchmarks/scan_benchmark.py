@@ -0,0 +1,97 @@
+"""
+Compares os.walk with the serial and threaded modes of core.scanner.scan_files.
+
+A synthetic deep/wide tree is built in a temporary folder (or pass --path to
+scan an existing folder, e.g. on a network mount). Local disks answer
+directory reads from cache in microseconds, so --latency-ms adds a fixed
+delay to every folder listing to model an NFS/SMB round-trip; os.walk and
+scan_files both list folders through os.scandir, so both pay it equally.
+Run from the project root:
+
+    python benchmarks/scan_benchmark.py --depth 4 --width 6 --files 20 --latency-ms 2
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.scanner import scan_files
+
+def build_tree(root, depth, width, files_per_folder):
+    """Creates `width` subfolders per level, `depth` levels deep, each holding some small files."""
+    folders = 0
+    pending = [(root, 0)]
+    while pending:
+        path, level = pending.pop()
+        os.makedirs(path, exist_ok=True)
+        folders += 1
+        for i in range(files_per_folder):
+            with open(os.path.join(path, f"file_{i:04d}.txt"), 'w') as f:
+                f.write("x")
+        if level < depth:
+            pending.extend((os.path.join(path, f"dir_{i:02d}"), level + 1) for i in range(width))
+    return folders
+
+def add_listing_latency(seconds):
+    """Wraps os.scandir so every folder listing sleeps first, like a remote round-trip."""
+    real_scandir = os.scandir
+    def slow_scandir(path='.'):
+        time.sleep(seconds)
+        return real_scandir(path)
+    os.scandir = slow_scandir
+
+def walk_count(folder):
+    return sum(len(files) for _, _, files in os.walk(folder))
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<36} {best * 1000:9.1f} ms  {count / best:12,.0f} files/s")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark directory traversal.")
+    parser.add_argument("--path", help="Scan this folder instead of building a synthetic tree.")
+    parser.add_argument("--depth", type=int, default=4, help="Levels of subfolders in the synthetic tree.")
+    parser.add_argument("--width", type=int, default=6, help="Subfolders per folder in the synthetic tree.")
+    parser.add_argument("--files", type=int, default=20, help="Files per folder in the synthetic tree.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated delay per folder listing.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 16, 32], help="Thread counts to measure.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported.")
+    args = parser.parse_args()
+
+    temp_dir = None
+    folder = args.path
+    if not folder:
+        temp_dir = tempfile.mkdtemp(prefix="scan_benchmark_")
+        folder = os.path.join(temp_dir, "tree")
+        folders = build_tree(folder, args.depth, args.width, args.files)
+        print(f"Synthetic tree: {folders:,} folders, {folders * args.files:,} files")
+    if args.latency_ms:
+        add_listing_latency(args.latency_ms / 1000)
+        print(f"Simulated latency: {args.latency_ms} ms per folder listing")
+    try:
+        expected = timed("os.walk", lambda: walk_count(folder), args.repeat)
+        timed("scan_files (serial)", lambda: sum(1 for _ in scan_files(folder)), args.repeat)
+        for workers in args.workers:
+            for ordered in (True, False):
+                label = f"scan_files workers={workers} {'ordered' if ordered else 'unordered'}"
+                count = timed(label, lambda: sum(1 for _ in scan_files(folder, workers=workers, ordered=ordered)), args.repeat)
+                if count != expected:
+                    print(f"  mismatch: {count} files vs {expected} from os.walk")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
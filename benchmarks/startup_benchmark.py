@@ -0,0 +1,81 @@
+"""
+Measures application cold-start cost.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import time. Run from the project root:
+
+    python benchmarks/startup_benchmark.py --repeat 5
+
+The GUI measurements need a display; without one only the import
+measurements are reported.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORT_APP = """
+import sys, time, json
+t0 = time.perf_counter()
+import core.app
+print(json.dumps({'seconds': time.perf_counter() - t0, 'unittest_loaded': 'unittest' in sys.modules}))
+"""
+
+IMPORT_TEST_MACHINERY = """
+import time, json
+t0 = time.perf_counter()
+import unittest, glob, run_tests
+print(json.dumps({'seconds': time.perf_counter() - t0}))
+"""
+
+BUILD_GUI = """
+import time, json
+import ttkbootstrap as ttk
+from tkinterdnd2 import TkinterDnD
+from core.app import FileRefactoringGUI
+root = TkinterDnD.Tk()
+ttk.Style(theme="superhero")
+t0 = time.perf_counter()
+app = FileRefactoringGUI(root)
+root.update_idletasks()
+lazy = time.perf_counter() - t0
+t0 = time.perf_counter()
+for name in app.plugin_names:
+    app._get_plugin_frame(name)
+root.update_idletasks()
+remaining = time.perf_counter() - t0
+root.destroy()
+print(json.dumps({'lazy_seconds': lazy, 'eager_extra_seconds': remaining, 'plugins': len(app.plugin_names)}))
+"""
+
+def run_snippet(code):
+    output = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def median_ms(samples, key):
+    return statistics.median(sample[key] for sample in samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application start-up.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh-interpreter runs per measurement.")
+    args = parser.parse_args()
+
+    app_imports = [run_snippet(IMPORT_APP) for _ in range(args.repeat)]
+    deferred = [run_snippet(IMPORT_TEST_MACHINERY) for _ in range(args.repeat)]
+    print(f"import core.app:                   {median_ms(app_imports, 'seconds'):8.1f} ms (unittest loaded: {app_imports[0]['unittest_loaded']})")
+    print(f"deferred Test Center imports:      {median_ms(deferred, 'seconds'):8.1f} ms (now paid only when the Test Center opens)")
+
+    try:
+        builds = [run_snippet(BUILD_GUI) for _ in range(args.repeat)]
+    except subprocess.CalledProcessError:
+        print("GUI construction:                  skipped (no display available)")
+        return
+    print(f"FileRefactoringGUI() with lazy UI: {median_ms(builds, 'lazy_seconds'):8.1f} ms")
+    print(f"building the other {builds[0]['plugins'] - 1} plugin frames: {median_ms(builds, 'eager_extra_seconds'):8.1f} ms (previously paid at start-up)")
+
+if __name__ == '__main__':
+    main()
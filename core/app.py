@@ -1,10 +1,9 @@
 import os
-import io
 import sys
+import queue
+import threading
 import tkinter as tk
 from tkinter import Toplevel
-import unittest
-import glob
 from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
@@ -16,8 +15,8 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-import run_tests
-from core.plugin_manager import PluginManager
+from core.plugin_manager import PluginManager, PluginHandle
+from core.interfaces import HeadlessActionPlugin, ActionContext
 
 # --- Helper Classes ---
 class CollapsiblePane(ttk.Frame):
@@ -47,11 +46,74 @@ class CollapsiblePane(ttk.Frame):
             self.toggle_button.config(text="▼")
             self._is_expanded.set(True)
 
+class BufferedLog:
+    """
+    A log sink for a Text widget that batches writes.
+
+    Messages are queued and inserted with a single call per UI tick, and
+    only the most recent `max_lines` are kept in the widget. If a file path
+    is given, the complete stream is also appended to that file.
+    Must only be used from the Tk main thread.
+    """
+    def __init__(self, root, text_widget, log_path=None, max_lines=5000, flush_interval_ms=100):
+        self.root = root
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.line_count = 0
+        self._pending = []
+        self._flush_scheduled = False
+        self._file = None
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+                self._file = open(log_path, 'a', encoding='utf-8')
+            except OSError:
+                self._file = None
+
+    def write(self, message):
+        self._pending.append(f"{datetime.now().strftime('%H:%M:%S')} - {message}\n")
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after(self.flush_interval_ms, self.flush)
+
+    def flush(self):
+        """Writes all pending lines to the log file and the widget."""
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        if self._file:
+            self._file.writelines(lines)
+            self._file.flush()
+        # Lines that would be trimmed straight away are never inserted.
+        text = ''.join(lines[-self.max_lines:])
+        widget = self.text_widget
+        widget.config(state='normal')
+        widget.insert(tk.END, text)
+        self.line_count += text.count('\n')
+        overflow = self.line_count - self.max_lines
+        if overflow > 0:
+            widget.delete('1.0', f'{overflow + 1}.0')
+            self.line_count -= overflow
+        widget.see(tk.END)
+        widget.config(state='disabled')
+
+    def close(self):
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
 class TestCenterWindow(Toplevel):
     """A dedicated window for viewing and running the application's test suite."""
 
     def __init__(self, parent):
         super().__init__(parent)
+        # The test runner pulls in unittest and test discovery, so it is only
+        # imported once the Test Center is actually opened.
+        import run_tests
+        self.run_tests = run_tests
         self.title("Test Center")
         self.geometry("1000x700")
         
@@ -84,10 +146,10 @@ class TestCenterWindow(Toplevel):
     def _refresh_log_list(self):
         """Loads log files and populates the history listbox."""
         self.history_listbox.delete(0, tk.END)
-        os.makedirs(run_tests.LOG_DIR, exist_ok=True)
-        log_files = sorted(glob.glob(os.path.join(run_tests.LOG_DIR, "*.log")), reverse=True)
+        os.makedirs(self.run_tests.LOG_DIR, exist_ok=True)
+        log_files = sorted((name for name in os.listdir(self.run_tests.LOG_DIR) if name.endswith(".log")), reverse=True)
         for log_file in log_files:
-            self.history_listbox.insert(tk.END, os.path.basename(log_file))
+            self.history_listbox.insert(tk.END, log_file)
         
         if self.history_listbox.size() > 0:
             self.history_listbox.selection_set(0)
@@ -99,7 +161,7 @@ class TestCenterWindow(Toplevel):
             return
         
         selected_file = self.history_listbox.get(self.history_listbox.curselection())
-        log_path = os.path.join(run_tests.LOG_DIR, selected_file)
+        log_path = os.path.join(self.run_tests.LOG_DIR, selected_file)
 
         try:
             with open(log_path, 'r', encoding='utf-8') as f:
@@ -123,8 +185,8 @@ class TestCenterWindow(Toplevel):
         self.results_text.text.config(state='disabled')
         self.update_idletasks()
 
-        output, was_successful = run_tests.run_suite_and_get_output()
-        run_tests.save_log_file(output)
+        output, was_successful = self.run_tests.run_suite_and_get_output()
+        self.run_tests.save_log_file(output)
         
         self.results_text.text.config(state='normal')
         self.results_text.text.delete('1.0', tk.END)
@@ -159,6 +221,12 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
 -   **Rollback:** Revert changes made by other actions using the generated log file.
 """
 
+    # How often (ms) the UI thread drains events from a running action.
+    POLL_INTERVAL_MS = 100
+    # The log widget keeps this many recent lines; the full log is written to APP_LOG_DIR.
+    LOG_MAX_LINES = 5000
+    APP_LOG_DIR = ".app_logs"
+
     def __init__(self, root):
         self.root = root
         self.root.title("FileRefactoring (Plugin Architecture)")
@@ -167,7 +235,12 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
         self.plugin_frames = {}
         self.plugins = {}
         self.plugin_names = []
+        self.event_queue = queue.Queue()
+        self._active_plugin = None
+        self._active_context = None
+        self._active_worker = None
         self._create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.log("Welcome! Application core loaded.")
         self._load_plugins()
 
@@ -181,8 +254,15 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
         self.paned_window.add(self.right_pane, weight=2)
         self.left_pane.rowconfigure(3, weight=1)
         self.left_pane.columnconfigure(0, weight=1)
-        self.run_button = ttk.Button(self.left_pane, text="Run Action", command=self.run_action, bootstyle="primary")
-        self.run_button.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        run_frame = ttk.Frame(self.left_pane)
+        run_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        run_frame.columnconfigure(0, weight=1)
+        self.run_button = ttk.Button(run_frame, text="Run Action", command=self.run_action, bootstyle="primary")
+        self.run_button.grid(row=0, column=0, sticky="ew")
+        self.cancel_button = ttk.Button(run_frame, text="Cancel", command=self.cancel_action, bootstyle="danger-outline", state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=(5, 0))
+        self.progress_bar = ttk.Progressbar(run_frame, mode="determinate", maximum=100)
+        self.progress_bar.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(5, 0))
         self.readme_pane = CollapsiblePane(self.left_pane, text="README", start_expanded=True)
         self.readme_pane.grid(row=1, column=0, sticky="ew", pady=(0, 10))
         readme_text = tk.Text(self.readme_pane.sub_frame, wrap=tk.WORD, relief="flat", height=12, font=("", 10))
@@ -204,12 +284,14 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
         self.log_pane.grid(row=0, column=0, sticky="nsew")
         self.log_text = ScrolledText(self.log_pane, wrap=tk.WORD, state='disabled', font=('Consolas', 10))
         self.log_text.pack(fill=tk.BOTH, expand=True)
+        log_path = os.path.join(self.APP_LOG_DIR, f"app_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
+        self.log_sink = BufferedLog(self.root, self.log_text.text, log_path=log_path, max_lines=self.LOG_MAX_LINES, flush_interval_ms=self.POLL_INTERVAL_MS)
 
     def _create_menu(self):
         menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
         file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self._on_close)
         menubar.add_cascade(label="File", menu=file_menu)
         tools_menu = tk.Menu(menubar, tearoff=0)
         tools_menu.add_command(label="Open Test Center", command=self.open_test_center)
@@ -221,7 +303,7 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
     def _load_plugins(self):
         self.log("Searching for plugins...")
         manager = PluginManager()
-        manager.discover_plugins(self) 
+        manager.discover_plugin_handles(self)
         loaded_plugins = manager.get_all_plugins()
         if not loaded_plugins:
             self.log("No plugins found. Place plugin files in the 'plugins' directory.")
@@ -235,9 +317,6 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
             if plugin.is_rollbackable(): plugin_name += " ⮌"
             self.plugins[plugin_name] = plugin
             self.plugin_names.append(plugin_name)
-            frame = ttk.Frame(self.plugin_options_container)
-            plugin.create_gui(frame)
-            self.plugin_frames[plugin_name] = frame
         self.action_combobox['values'] = self.plugin_names
         if self.plugin_names:
             self.action_combobox.current(0)
@@ -249,14 +328,45 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
             self.readme_pane.toggle(collapse=True)
         if self.active_plugin_frame:
             self.active_plugin_frame.pack_forget()
-        new_frame = self.plugin_frames.get(selected_action_name)
+        new_frame = self._get_plugin_frame(selected_action_name)
         if new_frame:
             new_frame.pack(fill=tk.BOTH, expand=True)
             self.active_plugin_frame = new_frame
+
+    def _get_plugin_frame(self, plugin_name):
+        """Returns the options frame for a plugin, building it on first use."""
+        frame = self.plugin_frames.get(plugin_name)
+        if frame is None:
+            try:
+                plugin = self._get_plugin(plugin_name)
+            except Exception as e:
+                self.log(f"[ERROR] Could not load plugin '{plugin_name}': {e}")
+                return None
+            if plugin is None:
+                return None
+            frame = ttk.Frame(self.plugin_options_container)
+            plugin.create_gui(frame)
+            self.plugin_frames[plugin_name] = frame
+        return frame
+
+    def _get_plugin(self, plugin_name):
+        """Returns the plugin instance for an action, importing its module on first use."""
+        plugin = self.plugins.get(plugin_name)
+        if isinstance(plugin, PluginHandle):
+            plugin = plugin.load()
+            self.plugins[plugin_name] = plugin
+        return plugin
             
     def run_action(self):
+        if self._active_worker:
+            Messagebox.show_warning("Another action is still running. Cancel it or wait for it to finish.", "Action Running")
+            return
         selected_action_name = self.action_var.get()
-        plugin = self.plugins.get(selected_action_name)
+        try:
+            plugin = self._get_plugin(selected_action_name)
+        except Exception as e:
+            plugin = None
+            self.log(f"[ERROR] Could not load plugin '{selected_action_name}': {e}")
         if not plugin:
             Messagebox.show_error("Could not find the selected plugin.", "Error")
             return
@@ -264,15 +374,97 @@ The application discovers and loads "Action" plugins from the `plugins/` directo
         if not is_valid:
             Messagebox.show_error(msg, "Validation Error")
             return
+        if not isinstance(plugin, HeadlessActionPlugin):
+            # Legacy plugins only provide execute(), which must run on the UI thread.
+            try:
+                plugin.execute()
+            except Exception as e:
+                self._report_plugin_error(plugin, e)
+            return
+        try:
+            if not plugin.confirm():
+                return
+            params = plugin.get_params()
+        except Exception as e:
+            self._report_plugin_error(plugin, e)
+            return
+        self._start_worker(plugin, params)
+
+    def cancel_action(self):
+        """Asks the running action to stop before its next file."""
+        if self._active_context and not self._active_context.cancelled:
+            self._active_context.cancel()
+            self.cancel_button.config(state="disabled")
+            self.log("Cancelling... the current file will be finished first.")
+
+    def _start_worker(self, plugin, params):
+        """Runs a headless plugin on a worker thread, reporting back through the event queue."""
+        context = ActionContext(log=lambda message: self.event_queue.put(('log', message)))
+        self._active_plugin = plugin
+        self._active_context = context
+        self._active_worker = threading.Thread(target=self._run_worker, args=(plugin, params, context), daemon=True)
+        self._set_running(True)
+        self._active_worker.start()
+        self.root.after(self.POLL_INTERVAL_MS, self._poll_worker)
+
+    def _run_worker(self, plugin, params, context):
         try:
-            plugin.execute()
+            outcome = plugin.run(params, context)
         except Exception as e:
-            error_msg = f"A critical error occurred in plugin '{plugin.get_name()}': {e}"
-            self.log(f"[CRITICAL] {error_msg}")
-            Messagebox.show_error(error_msg, "Plugin Execution Error")
+            outcome = e
+        self.event_queue.put(('done', outcome))
+
+    def _poll_worker(self):
+        """Drains pending events on the UI thread and reschedules itself until the run ends."""
+        finished, outcome = False, None
+        while True:
+            try:
+                kind, payload = self.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                self.log(payload)
+            elif kind == 'done':
+                finished, outcome = True, payload
+        self.log_sink.flush()
+        context = self._active_context
+        if context.total:
+            self.progress_bar['value'] = min(100, context.done * 100 / context.total)
+        if finished:
+            self._finish_run(outcome)
+        else:
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_worker)
+
+    def _finish_run(self, outcome):
+        plugin = self._active_plugin
+        self._active_plugin = self._active_context = self._active_worker = None
+        self._set_running(False)
+        if isinstance(outcome, Exception):
+            self._report_plugin_error(plugin, outcome)
+        elif outcome.cancelled:
+            Messagebox.show_info(f"The action was cancelled.\nCompleted: {outcome.success_count}\nFailed: {outcome.failure_count}", "Action Cancelled")
+        else:
+            self.progress_bar['value'] = 100
+            plugin.show_result(outcome)
+
+    def _set_running(self, running):
+        self.run_button.config(state="disabled" if running else "normal")
+        self.cancel_button.config(state="normal" if running else "disabled")
+        self.action_combobox.config(state="disabled" if running else "readonly")
+        self.progress_bar['value'] = 0
+
+    def _report_plugin_error(self, plugin, error):
+        error_msg = f"A critical error occurred in plugin '{plugin.get_name()}': {error}"
+        self.log(f"[CRITICAL] {error_msg}")
+        Messagebox.show_error(error_msg, "Plugin Execution Error")
+
+    def _on_close(self):
+        """Stops a running action between files before closing, so its change log stays consistent."""
+        if self._active_worker:
+            self._active_context.cancel()
+            self._active_worker.join(timeout=10)
+        self.log_sink.close()
+        self.root.destroy()
 
     def log(self, message):
-        self.log_text.text.config(state='normal')
-        self.log_text.text.insert(tk.END, f"{datetime.now().strftime('%H:%M:%S')} - {message}\n")
-        self.log_text.text.see(tk.END)
-        self.log_text.text.config(state='disabled')
+        self.log_sink.write(message)
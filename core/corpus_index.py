@@ -0,0 +1,220 @@
+import os
+import math
+import time
+import sqlite3
+import hashlib
+
+from core.scanner import scan_files
+from core.duplicate_finder import PARTIAL_CHUNK, partial_hash, full_hash, map_parallel
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial TEXT NOT NULL,
+    full TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_size_partial ON files (size, partial);
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    indexed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blooms (
+    root TEXT PRIMARY KEY,
+    bit_count INTEGER NOT NULL,
+    hash_count INTEGER NOT NULL,
+    bits BLOB NOT NULL
+);
+"""
+
+# False-positive rate of the size pre-check. A false positive only costs a
+# partial hash of the new file and one indexed query.
+BLOOM_ERROR_RATE = 0.01
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter of integers: `might_contain` is never wrong
+    when it says no, and wrong about one time in 1/error_rate when it says yes.
+    """
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, bit_count=None, hash_count=None, bits=None):
+        capacity = max(capacity, 1)
+        self.bit_count = bit_count or max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = hash_count or max(1, round(self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.bit_count for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+class CorpusIndex:
+    """
+    A persistent (SQLite) index of the size and content hashes of a
+    reference corpus (e.g. an archive), for checking which files in a new
+    folder already exist there without scanning the archive again.
+
+    `refresh` brings the index up to date for a reference folder, hashing
+    only files whose size or mtime changed since they were indexed.
+    `find_known` then only reads the new files: a Bloom filter of the sizes
+    indexed under the reference folder rules out most of them without any
+    I/O, the rest are compared by partial hash and then full hash against
+    that folder's part of the index. Other indexed roots are never matched.
+
+    All methods must be called from the thread that opened the index.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or self.default_path()
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+        self._blooms = {}
+
+    @staticmethod
+    def default_path():
+        return os.path.join(os.path.expanduser('~'), '.filerefactoring', 'corpus_index.sqlite3')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def has_root(self, folder):
+        return self.conn.execute("SELECT 1 FROM roots WHERE path = ?", (os.path.abspath(folder),)).fetchone() is not None
+
+    def refresh(self, folder, workers=1, scan_workers=1, should_stop=None, on_error=None):
+        """
+        Indexes every file under a reference folder. Unchanged files (same
+        path, size and mtime) keep their digests; files gone from the folder
+        are dropped.
+
+        Returns:
+            A dict with the number of files 'hashed', 'reused' and 'removed'.
+        """
+        folder = os.path.abspath(folder)
+        on_error = on_error or (lambda path, error: None)
+        low, high = self._subtree_bounds(folder)
+        known = {path: (size, mtime_ns) for path, size, mtime_ns in self.conn.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE path >= ? AND path < ?", (low, high))}
+        stats = {'hashed': 0, 'reused': 0, 'removed': 0}
+
+        def changed():
+            for entry in scan_files(folder, workers=scan_workers):
+                path = os.path.abspath(entry.path)
+                if known.pop(path, None) == (entry.size, entry.mtime_ns):
+                    stats['reused'] += 1
+                    continue
+                yield path, entry.size, entry.mtime_ns
+
+        def hash_file(item):
+            path, size = item[0], item[1]
+            partial = partial_hash(path, size)
+            return partial, (partial if size <= 2 * PARTIAL_CHUNK else full_hash(path))
+
+        with self.conn:
+            for (path, size, mtime_ns), digests in map_parallel(hash_file, changed(), workers, should_stop):
+                if isinstance(digests, Exception):
+                    on_error(path, digests)
+                    continue
+                stats['hashed'] += 1
+                self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", (path, size, mtime_ns, *digests))
+            if should_stop and should_stop():
+                return stats
+            # Anything still in `known` was not found by the scan.
+            self.conn.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in known))
+            stats['removed'] = len(known)
+            self.conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (folder, time.time_ns()))
+            self._save_blooms(folder)
+        return stats
+
+    def find_known(self, folder, entries, workers=1, should_stop=None, on_error=None, log=None):
+        """
+        Returns {digest: [new path, indexed path, ...]} for every new file
+        whose content is already indexed under the reference folder.
+
+        Args:
+            folder: The reference folder; only indexed files below it are matched.
+            entries: ScanEntry-like objects with `path` and `size` (the new folder's files).
+        """
+        on_error = on_error or (lambda path, error: None)
+        log = log or (lambda message: None)
+        folder = os.path.abspath(folder)
+        low, high = self._subtree_bounds(folder)
+        bloom = self._load_bloom(folder)
+        entries = list(entries)
+        candidates = [entry for entry in entries if bloom.might_contain(entry.size)]
+        log(f"Size check: {len(candidates)} of {len(entries)} new file(s) may match an indexed size.")
+        matches = {}
+        partial_matches = []
+        for entry, partial in map_parallel(lambda entry: partial_hash(entry.path, entry.size), candidates, workers, should_stop):
+            if isinstance(partial, Exception):
+                on_error(entry.path, partial)
+                continue
+            if self.conn.execute("SELECT 1 FROM files WHERE size = ? AND partial = ? AND path >= ? AND path < ? LIMIT 1",
+                                 (entry.size, partial, low, high)).fetchone():
+                partial_matches.append((entry, partial))
+        small = [(entry, partial) for entry, partial in partial_matches if entry.size <= 2 * PARTIAL_CHUNK]
+        large = [entry for entry, partial in partial_matches if entry.size > 2 * PARTIAL_CHUNK]
+        log(f"Partial hash: {len(partial_matches)} file(s) match the first and last blocks of an indexed file.")
+        hashed = list(map_parallel(lambda entry: full_hash(entry.path), large, workers, should_stop))
+        for entry, digest in small + hashed:
+            if isinstance(digest, Exception):
+                on_error(entry.path, digest)
+                continue
+            known = [row[0] for row in self.conn.execute(
+                "SELECT path FROM files WHERE size = ? AND full = ? AND path >= ? AND path < ? ORDER BY path",
+                (entry.size, digest, low, high))]
+            known = [path for path in known if path != os.path.abspath(entry.path)]
+            if known:
+                group = matches.setdefault(digest, [])
+                group.append(entry.path)
+                group.extend(path for path in known if path not in group)
+        return {digest: paths for digest, paths in sorted(matches.items(), key=lambda item: item[1][0])}
+
+    def _build_bloom(self, folder):
+        low, high = self._subtree_bounds(folder)
+        sizes = [size for (size,) in self.conn.execute(
+            "SELECT DISTINCT size FROM files WHERE path >= ? AND path < ?", (low, high))]
+        bloom = BloomFilter(len(sizes))
+        for size in sizes:
+            bloom.add(size)
+        return bloom
+
+    def _save_blooms(self, folder):
+        """Rebuilds the size filter of `folder` and of every indexed root nested in it or containing it."""
+        below = self._subtree_bounds(folder)[0]
+        for (root,) in self.conn.execute("SELECT path FROM roots").fetchall():
+            if root == folder or root.startswith(below) or folder.startswith(self._subtree_bounds(root)[0]):
+                bloom = self._blooms[root] = self._build_bloom(root)
+                self.conn.execute("INSERT OR REPLACE INTO blooms VALUES (?, ?, ?, ?)",
+                                  (root, bloom.bit_count, bloom.hash_count, bytes(bloom.bits)))
+
+    def _load_bloom(self, folder):
+        # A folder that is not an indexed root itself (e.g. a subfolder of one) gets a filter built on the fly.
+        if folder not in self._blooms:
+            row = self.conn.execute("SELECT bit_count, hash_count, bits FROM blooms WHERE root = ?", (folder,)).fetchone()
+            self._blooms[folder] = BloomFilter(0, bit_count=row[0], hash_count=row[1], bits=row[2]) if row else self._build_bloom(folder)
+        return self._blooms[folder]
+
+    @staticmethod
+    def _subtree_bounds(path):
+        # Every path strictly below `path` sorts between these two keys.
+        prefix = path.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
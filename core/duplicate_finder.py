@@ -0,0 +1,189 @@
+import os
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.hash_cache import file_identity
+
+METHOD_SIZE_NAME = 'size_name'
+METHOD_SIZE_HASH = 'size_hash'
+METHODS = (METHOD_SIZE_NAME, METHOD_SIZE_HASH)
+
+# Bytes hashed from each end of a file in the partial-hash stage. Files no
+# larger than two chunks are hashed whole there and skip the full stage.
+PARTIAL_CHUNK = 64 * 1024
+# Read buffer for full hashes; each worker thread reuses one with readinto.
+HASH_BUFFER_SIZE = 4 * 1024 * 1024
+
+_thread_buffers = threading.local()
+
+def new_hash():
+    return hashlib.blake2b(digest_size=20)
+
+def full_hash(path):
+    """Hex digest of a file's whole content, read in large blocks into a reused buffer."""
+    buffer = getattr(_thread_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _thread_buffers.buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    digest = new_hash()
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+def partial_hash(path, size):
+    """Hex digest of the first and last PARTIAL_CHUNK bytes (the whole file if it is small)."""
+    digest = new_hash()
+    with open(path, 'rb', buffering=0) as f:
+        if size <= 2 * PARTIAL_CHUNK:
+            digest.update(f.read(2 * PARTIAL_CHUNK))
+        else:
+            digest.update(f.read(PARTIAL_CHUNK))
+            f.seek(-PARTIAL_CHUNK, os.SEEK_END)
+            digest.update(f.read(PARTIAL_CHUNK))
+    return digest.hexdigest()
+
+def map_parallel(func, items, workers, should_stop):
+    """
+    Yields (item, result-or-exception) for each item, in order, running
+    `func(item)` on `workers` threads with a bounded number in flight.
+    """
+    if workers <= 1:
+        for item in items:
+            if should_stop and should_stop():
+                return
+            try:
+                yield item, func(item)
+            except OSError as e:
+                yield item, e
+        return
+
+    def call(item):
+        try:
+            return func(item)
+        except OSError as e:
+            return e
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash")
+    pending = deque()
+    try:
+        for item in items:
+            if should_stop and should_stop():
+                return
+            pending.append((item, executor.submit(call, item)))
+            while len(pending) >= workers * 4:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        while pending:
+            if should_stop and should_stop():
+                return
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+class DuplicateFinder:
+    """
+    Groups files with identical content (or identical size and name) in
+    stages, so most bytes are never read:
+
+    1. Files are bucketed by size from the scan's stat data; a file with a
+       unique size cannot have a duplicate.
+    2. Same-size files are hashed over their first and last PARTIAL_CHUNK
+       bytes only.
+    3. Files that still collide are hashed in full.
+
+    Hashing runs on `workers` threads. Unreadable files are passed to
+    `on_error(path, exception)` and left out. With a HashCache as `cache`,
+    digests of files whose device, inode, size and mtime are unchanged
+    since an earlier run are reused instead of read again.
+    """
+    def __init__(self, workers=1, should_stop=None, log=None, on_error=None, cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.should_stop = should_stop
+        self.log = log or (lambda message: None)
+        self.on_error = on_error or (lambda path, error: None)
+        self.bytes_hashed = 0
+
+    def find(self, entries, method=METHOD_SIZE_HASH):
+        """
+        Returns {group key: [paths]} for every group of two or more files,
+        largest files first.
+
+        Args:
+            entries: ScanEntry-like objects with `path`, `name` and `size`.
+            method: METHOD_SIZE_NAME (same size and name) or METHOD_SIZE_HASH (same content).
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown duplicate method '{method}'.")
+        by_size = {}
+        for entry in entries:
+            key = (entry.size, os.path.normcase(entry.name)) if method == METHOD_SIZE_NAME else entry.size
+            by_size.setdefault(key, []).append(entry)
+        groups = {key: members for key, members in by_size.items() if len(members) > 1}
+        candidates = sum(len(members) for members in groups.values())
+        self.log(f"Stage 1: {candidates} file(s) share a size with another file ({len(groups)} group(s)).")
+
+        if method == METHOD_SIZE_NAME:
+            return self._result({f"{name} ({size} bytes)": members for (size, name), members in groups.items()})
+
+        groups = self._split(groups, 'partial', lambda entry: partial_hash(entry.path, entry.size),
+                             lambda entry: min(entry.size, 2 * PARTIAL_CHUNK))
+        self.log(f"Stage 2: {sum(len(m) for m in groups.values())} file(s) still match after hashing their first and last {PARTIAL_CHUNK // 1024} KB.")
+        # Small files were hashed whole in stage 2; only larger ones need the full hash.
+        done = {key: members for key, members in groups.items() if key[0] <= 2 * PARTIAL_CHUNK}
+        large = {key: members for key, members in groups.items() if key[0] > 2 * PARTIAL_CHUNK}
+        fully_hashed = sum(len(members) for members in large.values())
+        large = self._split(large, 'full', lambda entry: full_hash(entry.path), lambda entry: entry.size)
+        self.log(f"Stage 3: {fully_hashed} file(s) compared by full hash; {self.bytes_hashed} bytes read in total.")
+        if self.cache is not None:
+            self.log(f"Hash cache: {self.cache.hits} digest(s) reused, {self.cache.misses} computed.")
+        done.update(large)
+        return self._result({digest: members for (_, digest), members in done.items()})
+
+    def _split(self, groups, kind, hash_entry, bytes_read):
+        """
+        Re-groups each group by a hash of its members, keeping groups that
+        still have two or more. Cached digests are looked up here, on the
+        calling thread; only cache misses are handed to the workers.
+        """
+        split = {}
+        def add(size_key, entry, digest):
+            size = size_key[0] if isinstance(size_key, tuple) else size_key
+            split.setdefault((size, digest), []).append(entry)
+
+        def uncached():
+            for size_key, members in groups.items():
+                for entry in members:
+                    identity = None
+                    if self.cache is not None:
+                        try:
+                            identity = file_identity(entry)
+                        except OSError:
+                            pass
+                        digest = identity and self.cache.get(identity, kind)
+                        if digest:
+                            add(size_key, entry, digest)
+                            continue
+                    yield size_key, entry, identity
+
+        for (size_key, entry, identity), digest in map_parallel(lambda item: hash_entry(item[1]), uncached(), self.workers, self.should_stop):
+            if isinstance(digest, Exception):
+                self.on_error(entry.path, digest)
+                continue
+            self.bytes_hashed += bytes_read(entry)
+            if identity is not None:
+                self.cache.put(identity, kind, digest)
+            add(size_key, entry, digest)
+        return {key: members for key, members in split.items() if len(members) > 1}
+
+    @staticmethod
+    def _result(groups):
+        ordered = sorted(groups.items(), key=lambda item: (-item[1][0].size, item[0]))
+        return {key: sorted(entry.path for entry in members) for key, members in ordered}
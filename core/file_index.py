@@ -0,0 +1,171 @@
+import os
+import time
+import sqlite3
+
+from core.scanner import EXCLUDED_DIR_NAMES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS files (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    PRIMARY KEY (dir, name)
+);
+"""
+
+# A folder modified this recently may still change within the same mtime
+# tick, so its listing is not trusted on the next refresh.
+RACY_WINDOW_NS = 2 * 10**9
+
+class IndexEntry:
+    """A file record read from the index, with the same attributes plugins use on ScanEntry."""
+    __slots__ = ('path', 'name', 'root', 'size', 'mtime_ns', 'inode')
+
+    def __init__(self, root, name, size, mtime_ns, inode):
+        self.path = os.path.join(root, name)
+        self.name = name
+        self.root = root
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+
+    @property
+    def mtime(self):
+        return self.mtime_ns / 1e9
+
+    def __repr__(self):
+        return f"IndexEntry({self.path!r})"
+
+class FileIndex:
+    """
+    A persistent (SQLite) index of file metadata: path, size, mtime and inode.
+
+    `refresh` stats every folder under a root but only re-lists folders
+    whose mtime changed since the last refresh, so repeated scans of a
+    mostly static tree cost one stat per folder instead of one per file.
+    Note that changing a file's contents in place does not change its
+    folder's mtime; pass full=True to re-read every folder. Like
+    scan_files, folders named in EXCLUDED_DIR_NAMES are not indexed.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or self.default_path()
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def default_path():
+        return os.path.join(os.path.expanduser('~'), '.filerefactoring', 'file_index.sqlite3')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def refresh(self, folder, recursive=True, full=False):
+        """
+        Brings the index up to date for a folder.
+
+        Returns:
+            A dict with the number of folders 'rescanned' and 'reused'.
+        """
+        folder = os.path.abspath(folder)
+        stats = {'rescanned': 0, 'reused': 0}
+        pending = [(folder, None)]
+        with self.conn:
+            while pending:
+                path, parent = pending.pop()
+                try:
+                    dir_stat = os.stat(path)
+                except OSError:
+                    if path == folder:
+                        raise
+                    self._forget(path)
+                    continue
+                row = self.conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (path,)).fetchone()
+                if not full and row and row[0] == dir_stat.st_mtime_ns:
+                    stats['reused'] += 1
+                    children = [r[0] for r in self.conn.execute("SELECT path FROM dirs WHERE parent = ? ORDER BY path", (path,))]
+                else:
+                    stats['rescanned'] += 1
+                    children = self._rescan(path, parent, dir_stat)
+                if recursive:
+                    pending.extend((child, path) for child in reversed(children))
+        return stats
+
+    def iter_files(self, folder, recursive=True):
+        """Yields an IndexEntry for each indexed file in a folder, ordered by folder and name."""
+        folder = os.path.abspath(folder)
+        if recursive:
+            low, high = self._subtree_bounds(folder)
+            rows = self.conn.execute(
+                "SELECT dir, name, size, mtime_ns, inode FROM files WHERE dir = ? OR (dir >= ? AND dir < ?) ORDER BY dir, name",
+                (folder, low, high))
+        else:
+            rows = self.conn.execute("SELECT dir, name, size, mtime_ns, inode FROM files WHERE dir = ? ORDER BY name", (folder,))
+        for row in rows:
+            yield IndexEntry(*row)
+
+    def _rescan(self, path, parent, dir_stat):
+        files, children = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        files.append((path, entry.name, st.st_size, st.st_mtime_ns, st.st_ino))
+                    elif entry.is_dir(follow_symlinks=False) and entry.name not in EXCLUDED_DIR_NAMES:
+                        children.append(entry.path)
+                except OSError:
+                    continue
+        children.sort()
+        known = {r[0] for r in self.conn.execute("SELECT path FROM dirs WHERE parent = ?", (path,))}
+        for removed in known.difference(children):
+            self._forget(removed)
+        # New subfolders are recorded as never listed (mtime 0), so a later
+        # recursive refresh lists them even if this one did not descend.
+        self.conn.executemany("INSERT OR IGNORE INTO dirs VALUES (?, ?, 0)", ((child, path) for child in children))
+        self.conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        self.conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?)", files)
+        mtime_ns = dir_stat.st_mtime_ns
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            mtime_ns = 0
+        # A folder refreshed as a root keeps the parent it was indexed under.
+        self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, COALESCE(?, (SELECT parent FROM dirs WHERE path = ?)), ?)",
+                          (path, parent, path, mtime_ns))
+        return children
+
+    def _forget(self, path):
+        """Removes a folder and everything below it from the index."""
+        low, high = self._subtree_bounds(path)
+        self.conn.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, low, high))
+        self.conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+    @staticmethod
+    def _subtree_bounds(path):
+        # Every path strictly below `path` sorts between these two keys.
+        prefix = path.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+def scan_with_index(folder, recursive=True, db_path=None, log=None):
+    """Refreshes the index for a folder and returns its files as a list of IndexEntry."""
+    with FileIndex(db_path) as index:
+        stats = index.refresh(folder, recursive)
+        if log:
+            log(f"File index: {stats['rescanned']} folder(s) rescanned, {stats['reused']} unchanged.")
+        return list(index.iter_files(folder, recursive))
@@ -0,0 +1,115 @@
+import os
+import time
+import sqlite3
+
+from core.file_index import RACY_WINDOW_NS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial TEXT,
+    full TEXT,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (dev, ino)
+);
+CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used);
+"""
+
+# Entries kept once a run is over; the least recently used are evicted first.
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+def file_identity(entry):
+    """
+    (st_dev, st_ino, size, mtime_ns) for a ScanEntry-like object. Listings
+    that do not carry device and inode numbers (os.DirEntry on Windows) fall
+    back to a full stat of the file.
+    """
+    st = entry.stat()
+    if not st.st_ino:
+        st = os.stat(entry.path)
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+class HashCache:
+    """
+    A persistent (SQLite) cache of the partial and full content hashes
+    computed by DuplicateFinder.
+
+    Entries are keyed by a file's device and inode; a cached digest is only
+    used while the file still has the size and mtime it was hashed at, and
+    is overwritten when either changes. Files modified within the last
+    couple of seconds are not cached, as they may change again within the
+    same mtime tick. Lookups and updates are kept in memory and written in
+    one transaction on `close`, which also evicts the least recently used
+    entries beyond `max_entries`.
+
+    All methods must be called from the thread that opened the cache.
+    """
+    def __init__(self, db_path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path or self.default_path()
+        self.max_entries = max_entries
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        # identity -> [partial, full] for every file looked up or stored this run.
+        self._touched = {}
+        self._run_stamp = time.time_ns()
+
+    @staticmethod
+    def default_path():
+        return os.path.join(os.path.expanduser('~'), '.filerefactoring', 'hash_cache.sqlite3')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    def get(self, identity, kind):
+        """Returns the cached 'partial' or 'full' digest for a file identity, or None."""
+        digests = self._load(identity)
+        digest = digests[0 if kind == 'partial' else 1]
+        if digest is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return digest
+
+    def put(self, identity, kind, digest):
+        if time.time_ns() - identity[3] < RACY_WINDOW_NS:
+            return
+        self._load(identity)[0 if kind == 'partial' else 1] = digest
+
+    def flush(self):
+        """Writes this run's entries and evicts the least recently used beyond `max_entries`."""
+        rows = [(dev, ino, size, mtime_ns, partial, full, self._run_stamp)
+                for (dev, ino, size, mtime_ns), (partial, full) in self._touched.items()
+                if partial is not None or full is not None]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            excess = self.conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)", (excess,))
+        self._touched.clear()
+
+    def _load(self, identity):
+        digests = self._touched.get(identity)
+        if digests is None:
+            dev, ino, size, mtime_ns = identity
+            row = self.conn.execute(
+                "SELECT partial, full FROM hashes WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                (dev, ino, size, mtime_ns)).fetchone()
+            digests = self._touched[identity] = list(row) if row else [None, None]
+        return digests
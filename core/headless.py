@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import argparse
+import importlib
+import inspect
+
+# Add the project's root directory to the system path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.interfaces import HeadlessActionPlugin, ActionContext
+
+def load_plugin_class(value, plugin_folder="plugins"):
+    """
+    Finds the HeadlessActionPlugin class for an action value (e.g. "organize").
+
+    Plugins live in '<plugin_folder>/<value>_plugin.py', so only that one
+    module is imported and no plugin is instantiated (no Tk root is needed).
+    """
+    module = importlib.import_module(f"{plugin_folder}.{value}_plugin")
+    for _, cls in inspect.getmembers(module, inspect.isclass):
+        if issubclass(cls, HeadlessActionPlugin) and cls is not HeadlessActionPlugin and cls.__module__ == module.__name__:
+            return cls
+    raise LookupError(f"No headless plugin found for action '{value}'.")
+
+def coerce_params(plugin_class, raw_params):
+    """
+    Converts 'key=value' strings to a parameter dict, using the type of each
+    key's default value in `plugin_class.default_params`.
+    """
+    params = {}
+    for item in raw_params:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Parameter '{item}' must be in the form key=value.")
+        if key not in plugin_class.default_params:
+            raise ValueError(f"Unknown parameter '{key}'. Expected one of: {', '.join(plugin_class.default_params)}")
+        default = plugin_class.default_params[key]
+        if isinstance(default, bool):
+            params[key] = value.strip().lower() in ('1', 'true', 'yes', 'on')
+        elif isinstance(default, int):
+            params[key] = int(value)
+        elif isinstance(default, list):
+            params[key] = [part for part in value.split(',') if part]
+        else:
+            params[key] = value
+    return params
+
+def run_action(value, params=None, log=None, plugin_folder="plugins"):
+    """Runs a plugin action without the GUI and returns its ActionResult."""
+    plugin_class = load_plugin_class(value, plugin_folder)
+    return plugin_class.run(params, ActionContext(log=log))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a FileRefactoring action without the GUI.")
+    parser.add_argument("action", help="The action value, e.g. 'organize' or 'filter_sort'.")
+    parser.add_argument("params", nargs="*", help="Action parameters as key=value pairs.")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final JSON summary.")
+    args = parser.parse_args(argv)
+
+    plugin_class = load_plugin_class(args.action)
+    params = coerce_params(plugin_class, args.params)
+    log = (lambda message: None) if args.quiet else print
+    result = plugin_class.run(params, ActionContext(log=log))
+    print(json.dumps(result.to_dict(), indent=2))
+    return 1 if result.error or result.failure_count else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import threading
 from abc import ABC, abstractmethod
 
 class ActionPlugin(ABC):
@@ -69,4 +70,195 @@ class ActionPlugin(ABC):
             - A boolean indicating if validation passed.
             - A message explaining the validation failure, or an empty string.
         """
-        pass
\ No newline at end of file
+        pass
+
+class ActionContext:
+    """
+    Runtime services handed to a plugin while it runs headless.
+
+    The GUI passes its own log method; scripts and servers can rely on
+    the default (print) or supply any other callable. The context also
+    carries progress and cancellation state, so a run on a worker thread
+    can be observed and stopped from the UI thread.
+    """
+    def __init__(self, log=None):
+        self.log = log if log is not None else print
+        self.done = 0
+        self.total = 0
+        self._cancel_event = threading.Event()
+
+    def report_progress(self, done, total=None):
+        """Records how many items have been processed (and optionally of how many)."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def cancel(self):
+        """Requests the running action to stop before its next file."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+
+class ActionResult:
+    """
+    Structured outcome of a headless plugin run.
+
+    Attributes:
+        dry_run: True if no files were actually changed.
+        scanned_count: Number of candidate files the action looked at.
+        success_count: Operations completed (or planned, in a dry run).
+        failure_count: Operations that failed.
+        skipped_count: Candidates the action deliberately left alone.
+        failures: A list of (path, reason) tuples.
+        operations: A list of (old_path, new_path) tuples for each successful
+                    operation. new_path is None for non-moving actions.
+        outputs: Paths of any report files written by the action.
+        data: Action-specific findings for the caller (e.g. duplicate groups).
+        error: The message of a critical error that aborted the run, or None.
+        cancelled: True if the run stopped early because it was cancelled.
+    """
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.scanned_count = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.skipped_count = 0
+        self.failures = []
+        self.operations = []
+        self.outputs = []
+        self.data = {}
+        self.error = None
+        self.cancelled = False
+
+    def add_success(self, old_path, new_path=None):
+        self.success_count += 1
+        self.operations.append((old_path, new_path))
+
+    def add_failure(self, path, reason):
+        self.failure_count += 1
+        self.failures.append((path, str(reason)))
+
+    def add_skip(self):
+        self.skipped_count += 1
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serialisable summary of the run."""
+        return {
+            'dry_run': self.dry_run,
+            'scanned': self.scanned_count,
+            'succeeded': self.success_count,
+            'failed': self.failure_count,
+            'skipped': self.skipped_count,
+            'failures': [list(f) for f in self.failures],
+            'outputs': list(self.outputs),
+            'data': self.data,
+            'error': self.error,
+            'cancelled': self.cancelled,
+        }
+
+
+class HeadlessActionPlugin(ActionPlugin):
+    """
+    An ActionPlugin whose core logic runs without a Tk root.
+
+    Subclasses read their widgets into a plain parameter dict in
+    `get_params`, and do the actual work in the `perform` classmethod,
+    which only sees that dict and an ActionContext. `execute` is then a
+    thin GUI caller, and the same action can be driven from scripts via
+    `run` (see core/headless.py).
+    """
+    # Parameter names and default values accepted by `run`.
+    default_params = {}
+
+    @abstractmethod
+    def get_params(self) -> dict:
+        """Collects the current GUI state into a plain parameter dict."""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def perform(cls, params: dict, context: ActionContext, result: ActionResult) -> None:
+        """
+        Contains the core logic of the action.
+
+        Args:
+            params: The full parameter dict (defaults already applied).
+            context: Runtime services, e.g. `context.log`.
+            result: The ActionResult to fill in.
+        """
+        pass
+
+    @classmethod
+    def finish_plan(cls, params: dict, context: ActionContext, result: ActionResult) -> None:
+        """
+        Runs whatever the action does after its planned moves (e.g. removing
+        emptied folders). Called by `perform` implementations that need it and
+        by the Execute Saved Plan action after it replays a saved dry run.
+        """
+        pass
+
+    @classmethod
+    def run(cls, params=None, context=None) -> ActionResult:
+        """
+        Runs the action headless and returns its ActionResult.
+
+        Missing parameters fall back to `default_params`. Unexpected errors
+        are logged and recorded in `result.error` instead of being raised.
+        """
+        params = {**cls.default_params, **(params or {})}
+        context = context or ActionContext()
+        result = ActionResult(dry_run=bool(params.get('dry_run', False)))
+        try:
+            cls.perform(params, context, result)
+        except Exception as e:
+            result.error = str(e)
+            context.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
+        if result.cancelled:
+            context.log(f"--- Cancelled by user after {result.success_count + result.failure_count} operation(s) ---")
+        return result
+
+    @staticmethod
+    def check_cancelled(context: ActionContext, result: ActionResult) -> bool:
+        """
+        Returns True if the run should stop now, marking the result as cancelled.
+        Plugins call this between files so a cancelled run never stops midway
+        through a move and its change log stays consistent.
+        """
+        if context.cancelled:
+            result.cancelled = True
+            return True
+        return False
+
+    def confirm(self) -> bool:
+        """
+        Called on the GUI thread before the action starts; return False to
+        abort. The default always proceeds.
+        """
+        return True
+
+    def ask_yes_no(self, message: str, title: str, cancel_log: str) -> bool:
+        """
+        Asks a Yes/No question (e.g. from `confirm`). Returns True only if
+        Yes was pressed; otherwise logs `cancel_log` and returns False.
+        """
+        # Imported here so headless runs never load the dialogs.
+        from ttkbootstrap.dialogs import Messagebox
+        from ttkbootstrap.localization import MessageCatalog
+        # yesno returns the (localized) label of the button pressed, or None if the dialog was closed.
+        if Messagebox.yesno(message, title) == MessageCatalog.translate("Yes"):
+            return True
+        self.app.log(cancel_log)
+        return False
+
+    def execute(self) -> None:
+        if not self.confirm():
+            return
+        result = self.run(self.get_params(), ActionContext(log=self.app.log))
+        self.show_result(result)
+
+    def show_result(self, result: ActionResult) -> None:
+        """Presents a finished run to the user. The default does nothing."""
+        pass
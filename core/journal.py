@@ -0,0 +1,423 @@
+import io
+import os
+import csv
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+JOURNAL_FILENAME = 'file_name_change_log.csv'
+JOURNAL_HEADER = ['timestamp', 'old_path', 'new_path', 'status', 'action_type', 'details']
+INDEX_FILENAME = 'runs.json'
+INDEX_VERSION = 1
+LEGACY_RUN_ID = 'legacy'
+
+# Durability levels, from fastest to safest.
+DURABILITY_NONE = 'none'    # Rows are handed to the OS at each flush.
+DURABILITY_BATCH = 'batch'  # Each flushed batch is fsync'ed.
+DURABILITY_OP = 'op'        # Every row is flushed and fsync'ed on its own.
+DURABILITY_LEVELS = (DURABILITY_NONE, DURABILITY_BATCH, DURABILITY_OP)
+
+class JournalWriteError(Exception):
+    """Rows could not be written to the change log or run journal; they are kept pending."""
+
+def journal_dir_for(log_path):
+    """The run journal kept next to a change log: 'file_name_change_log.journal'."""
+    return os.path.splitext(log_path)[0] + '.journal'
+
+def new_run_id():
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+def parse_time_bound(value, end=False):
+    """
+    Parses an ISO date or date-time for a time-range filter. A bare date used
+    as the end of a range covers the whole day. Empty values return None.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    bound = datetime.fromisoformat(str(value).strip())
+    if end and len(str(value).strip()) == 10:
+        bound += timedelta(days=1) - timedelta(microseconds=1)
+    return bound
+
+def _iter_lines_reversed(path, block_size):
+    """Yields (byte offset, raw line) pairs last line first, reading fixed-size blocks from the end."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            buffer = f.read(step) + tail
+            lines = buffer.split(b'\n')
+            # The first piece may be the end of a line that starts in an earlier block.
+            tail = lines.pop(0)
+            end = position + len(buffer)
+            for line in reversed(lines):
+                start = end - len(line)
+                yield start, line
+                end = start - 1
+        yield 0, tail
+
+def read_lines_reversed(path, block_size=64 * 1024):
+    """Yields the non-blank lines of a UTF-8 text file, last line first."""
+    for _, line in _iter_lines_reversed(path, block_size):
+        line = line.rstrip(b'\r')
+        if line.strip():
+            yield line.decode('utf-8')
+
+def read_csv_reversed(path, block_size=64 * 1024):
+    """
+    Yields (byte offset, row dict) for each data row of a CSV file with a
+    header, last row first. Only one row is parsed at a time, so memory use
+    does not depend on the file size. Quoted fields spanning several lines
+    are joined back together.
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        fieldnames = next(csv.reader(f), None)
+    if not fieldnames:
+        return
+    record = None
+    held = None
+    for offset, line in _iter_lines_reversed(path, block_size):
+        record = line if record is None else line + b'\n' + record
+        # An odd number of quotes means this line ends inside a quoted field
+        # that started on an earlier line.
+        if record.count(b'"') % 2:
+            continue
+        text, record = record.decode('utf-8').rstrip('\r'), None
+        if not text.strip():
+            continue
+        if held is not None:
+            yield held
+        held = (offset, dict(zip(fieldnames, next(csv.reader(io.StringIO(text))))))
+    # The last record read (the first in the file) is the header itself.
+
+def _lock(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        # msvcrt locks a byte range from the current position; byte 0 acts
+        # as the mutex while appends still go to the end of the file.
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _merge_ranges(ranges):
+    merged = []
+    for low, high in sorted(ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return merged
+
+class RunJournal:
+    """
+    The indexed, run-scoped journal kept next to a change log.
+
+    Each run (one plugin execution) appends its operations to its own JSON
+    Lines segment, '<run_id>.jsonl': a header line with the run's plugin
+    and parameters, then one object per operation with a per-run sequence
+    number. 'runs.json' indexes the runs by plugin, start/finish time and
+    operation count, and stays small because it is rewritten whenever a
+    run starts or finishes. Sequence ranges that have been rolled back are
+    appended to '<run_id>.reverted'. Rollback picks runs from the index and
+    reads their segments backwards, so memory use does not grow with the
+    size of the journal.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+
+    def exists(self):
+        return os.path.isfile(self.index_path)
+
+    def segment_path(self, run_id):
+        return os.path.join(self.directory, f"{run_id}.jsonl")
+
+    def reverted_path(self, run_id):
+        return os.path.join(self.directory, f"{run_id}.reverted")
+
+    def read_header(self, run):
+        """Returns the header line of a run's segment (run_id, plugin, params, started), or {}."""
+        try:
+            with open(self.segment_path(run['run_id']), 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or '{}')
+        except (OSError, ValueError):
+            return {}
+        return header if 'seq' not in header else {}
+
+    def reverted_ranges(self, run):
+        """Returns the merged [low, high] sequence ranges of a run that have been rolled back."""
+        # Runs indexed before the sidecar file existed kept their ranges in runs.json.
+        ranges = list(run.get('reverted', []))
+        try:
+            with open(self.reverted_path(run['run_id']), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        ranges.append(json.loads(line))
+                    except ValueError:
+                        continue  # A partial last line left by a crash.
+        except OSError:
+            pass
+        return _merge_ranges(ranges)
+
+    def runs(self):
+        """Returns the indexed runs, newest first."""
+        return sorted(self._read_index().values(), key=lambda run: run['started'], reverse=True)
+
+    def select_runs(self, run_id=None, since=None, until=None):
+        """Returns the runs (newest first) that may hold operations matching the filters."""
+        selected = []
+        for run in self.runs():
+            if run_id and run['run_id'] != run_id:
+                continue
+            started = datetime.fromisoformat(run['started'])
+            # An unfinished (e.g. crashed) run may hold operations up to now.
+            last = datetime.fromisoformat(run['last_timestamp']) if run.get('finished') and run.get('last_timestamp') else datetime.max
+            if (until and started > until) or (since and last < since):
+                continue
+            selected.append(run)
+        return selected
+
+    def iter_ops_reversed(self, run, since=None, until=None):
+        """Yields a run's operations last first, skipping rolled-back ones and those outside the time range."""
+        reverted = self.reverted_ranges(run)
+        path = self.segment_path(run['run_id'])
+        if not os.path.exists(path):
+            return
+        for line in read_lines_reversed(path):
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue  # A partial last line left by a crash.
+            if 'seq' not in op:
+                continue  # The segment header.
+            if any(low <= op['seq'] <= high for low, high in reverted):
+                continue
+            if since or until:
+                timestamp = datetime.fromisoformat(op['timestamp'])
+                if (since and timestamp < since) or (until and timestamp > until):
+                    continue
+            op['run_id'] = run['run_id']
+            yield op
+
+    def start_run(self, run_id, plugin, params, started):
+        """Creates the run's segment with its header line and adds the run to the index."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_header(run_id, plugin, params, started)
+        entry = {
+            'run_id': run_id,
+            'plugin': plugin,
+            'started': started,
+            'finished': None,
+            'op_count': 0,
+            'last_timestamp': None,
+        }
+        self._update_index(lambda runs: runs.__setitem__(run_id, entry))
+
+    def finish_run(self, run_id, op_count, last_timestamp):
+        def update(runs):
+            if run_id in runs:
+                runs[run_id].update(finished=datetime.now().isoformat(), op_count=op_count, last_timestamp=last_timestamp)
+        self._update_index(update)
+
+    def mark_reverted(self, run_id, seqs):
+        """Records operations of a run as rolled back by appending their ranges to the run's '.reverted' file."""
+        if not seqs:
+            return
+        ranges = _merge_ranges([seq, seq] for seq in seqs)
+        with open(self.reverted_path(run_id), 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(r) + '\n' for r in ranges))
+
+    def import_csv(self, csv_path):
+        """Copies the rows of a change log written before the journal existed into a 'legacy' run."""
+        if not os.path.isfile(csv_path) or os.path.getsize(csv_path) == 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        seq = 0
+        first = last = None
+        with open(csv_path, 'r', newline='', encoding='utf-8') as infile, \
+                open(self.segment_path(LEGACY_RUN_ID), 'w', encoding='utf-8') as segment:
+            segment.write(json.dumps({'run_id': LEGACY_RUN_ID, 'plugin': LEGACY_RUN_ID, 'params': {}}) + '\n')
+            for row in csv.DictReader(infile):
+                seq += 1
+                first = first or row.get('timestamp')
+                last = row.get('timestamp') or last
+                segment.write(json.dumps({
+                    'seq': seq, 'timestamp': row.get('timestamp'), 'old_path': row.get('old_path'),
+                    'new_path': row.get('new_path'), 'status': row.get('status'),
+                    'action_type': row.get('action_type'), 'details': row.get('details', ''),
+                }) + '\n')
+        if not seq:
+            return
+        entry = {
+            'run_id': LEGACY_RUN_ID, 'plugin': LEGACY_RUN_ID, 'started': first or datetime.now().isoformat(),
+            'finished': last, 'op_count': seq, 'last_timestamp': last,
+        }
+        self._update_index(lambda runs: runs.__setitem__(LEGACY_RUN_ID, entry))
+
+    def _write_header(self, run_id, plugin, params, started):
+        header = {'run_id': run_id, 'plugin': plugin, 'params': json.loads(json.dumps(params or {}, default=str)), 'started': started}
+        with open(self.segment_path(run_id), 'a', encoding='utf-8') as segment:
+            segment.write(json.dumps(header) + '\n')
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return data.get('runs', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _update_index(self, update):
+        """Read-modify-writes runs.json under a lock, replacing it atomically."""
+        with open(os.path.join(self.directory, 'runs.lock'), 'a') as lock_file:
+            _lock(lock_file)
+            try:
+                runs = self._read_index()
+                update(runs)
+                tmp_path = self.index_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': INDEX_VERSION, 'runs': runs}, f, indent=1)
+                os.replace(tmp_path, self.index_path)
+            finally:
+                _unlock(lock_file)
+
+class ChangeJournal:
+    """
+    Appends rows to a plugin change log (`file_name_change_log.csv`), which
+    the Rollback plugin reads to undo an action.
+
+    One journal is held for a whole run. Rows are buffered and written when
+    `batch_size` rows are pending or `flush_interval` seconds have passed
+    since the last write, and on close. Each write takes an exclusive lock
+    on the file, so two runs appending to the same log never interleave
+    partial rows. The file is only created once the first row is written.
+    If a write fails, the rows stay pending and JournalWriteError is
+    raised, so the run stops instead of moving files it cannot record.
+
+    The same rows are also written to the run journal next to the log (see
+    RunJournal), tagged with `run_id`, so a single run or a time range can
+    be rolled back later.
+    """
+    def __init__(self, path, plugin='', params=None, batch_size=100, flush_interval=1.0, durability=DURABILITY_NONE, log=None):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability '{durability}'. Expected one of: {', '.join(DURABILITY_LEVELS)}")
+        self.path = path
+        self.plugin = plugin
+        self.params = params
+        self.batch_size = 1 if durability == DURABILITY_OP else max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.log = log or print
+        self.run_id = new_run_id()
+        self.runs = RunJournal(journal_dir_for(path))
+        self.op_count = 0
+        self._pending = []
+        # How many of the pending rows are already in the CSV log (a failed write is retried from there).
+        self._logged = 0
+        self._file = None
+        self._segment = None
+        self._last_timestamp = None
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record(self, old_path, new_path, status, action_type, details=''):
+        """Queues one row; it is written once the batch is full or the interval has passed."""
+        self.op_count += 1
+        self._pending.append((self.op_count, datetime.now().isoformat(), old_path, new_path, status, action_type, details))
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending rows under the file lock; raises JournalWriteError if they could not be written."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        rows = self._pending
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'a', newline='', encoding='utf-8')
+            _lock(self._file)
+            try:
+                if self._segment is None:
+                    self._open_segment(rows[0][1])
+                writer = csv.writer(self._file)
+                # Checked under the lock so two runs never both write a header.
+                if os.fstat(self._file.fileno()).st_size == 0:
+                    writer.writerow(JOURNAL_HEADER)
+                writer.writerows(row[1:] for row in rows[self._logged:])
+                self._file.flush()
+                self._logged = len(rows)
+                self._write_segment(rows)
+                self._pending, self._logged = [], 0
+                if self.durability != DURABILITY_NONE:
+                    os.fsync(self._file.fileno())
+                    os.fsync(self._segment.fileno())
+            finally:
+                _unlock(self._file)
+        except Exception as e:
+            message = f"Could not write to log file '{self.path}'. Reason: {e}"
+            self.log(f"[ERROR] {message}")
+            raise JournalWriteError(message) from e
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            # Whatever could not be written is listed, so the changes can still be undone by hand.
+            for _, _, old_path, new_path, status, _, _ in self._pending:
+                self.log(f"[ERROR] Not recorded in the change log: '{old_path}' -> '{new_path}' ({status})")
+            self._pending, self._logged = [], 0
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+                try:
+                    self.runs.finish_run(self.run_id, self.op_count, self._last_timestamp)
+                except OSError as e:
+                    self.log(f"[ERROR] Could not update the run journal. Reason: {e}")
+                self.log(f"Journal run ID: {self.run_id}")
+
+    def _open_segment(self, started):
+        # A change log that predates the journal is imported first, so the
+        # journal always holds everything the log does.
+        if not self.runs.exists():
+            self.runs.import_csv(self.path)
+        self.runs.start_run(self.run_id, self.plugin, self.params, started)
+        self._segment = open(self.runs.segment_path(self.run_id), 'a', encoding='utf-8')
+
+    def _write_segment(self, rows):
+        # One write per batch, so a failed write is unlikely to leave part of it behind.
+        self._segment.write(''.join(json.dumps({
+            'seq': seq, 'timestamp': timestamp, 'old_path': old_path, 'new_path': new_path,
+            'status': status, 'action_type': action_type, 'details': details,
+        }) + '\n' for seq, timestamp, old_path, new_path, status, action_type, details in rows))
+        self._segment.flush()
+        self._last_timestamp = rows[-1][1]
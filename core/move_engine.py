@@ -0,0 +1,200 @@
+import io
+import os
+import sys
+import errno
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Bytes handed to the kernel per copy_file_range/sendfile call.
+COPY_CHUNK = 8 * 1024 * 1024
+
+# copy_file_range/sendfile errors that mean "not supported here", so the next method is tried.
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+# Linux ioctl that makes one file share another's data blocks (btrfs, XFS, bcachefs, ...).
+FICLONE = 0x40049409
+LINK_AUTO = 'auto'
+LINK_REFLINK = 'reflink'
+LINK_HARDLINK = 'hardlink'
+LINK_MODES = (LINK_AUTO, LINK_REFLINK, LINK_HARDLINK)
+
+def move_file(src, dst):
+    """
+    Moves one file, creating the target's folder if needed.
+
+    A same-device move is a plain `os.rename`. Across devices the contents
+    are copied in the kernel where possible (`copy_file_range`, then
+    `sendfile`), the copy's size is checked against the source, and only
+    then is the source removed. Unlike `shutil.move`, a cross-device move
+    never replaces an existing target.
+    """
+    parent = os.path.dirname(dst)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent, exist_ok=True)
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        copy_across(src, dst)
+
+def copy_across(src, dst):
+    """Copies `src` to a new file `dst` on another device, verifies it, then removes `src`."""
+    if os.path.islink(src) or not os.path.isfile(src):
+        # Symlinks and folders keep shutil's handling.
+        shutil.move(src, dst)
+        return
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            _copy_contents(fsrc, fdst, size)
+            fdst.flush()
+            copied = os.fstat(fdst.fileno()).st_size
+        if copied != size:
+            raise OSError(errno.EIO, f"Copy is {copied} bytes but the source is {size} bytes", dst)
+        shutil.copystat(src, dst)
+    except BaseException:
+        # Never leave a partial copy behind; `dst` did not exist before (opened with 'x').
+        if os.path.lexists(dst):
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+        raise
+    os.remove(src)
+
+def _copy_contents(fsrc, fdst, size):
+    """Copies `size` bytes between two open files, preferring in-kernel copies."""
+    copied = 0
+    # Kernel copies need real descriptors, i.e. the buffered files open() returns.
+    kernel_copy = isinstance(fsrc, io.BufferedReader) and isinstance(fdst, io.BufferedWriter)
+    if kernel_copy and hasattr(os, 'copy_file_range'):
+        # Lets the filesystem clone or copy server-side (NFS 4.2, SMB, btrfs, XFS).
+        try:
+            while copied < size:
+                sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(COPY_CHUNK, size - copied))
+                if not sent:
+                    break
+                copied += sent
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED:
+                raise
+    if kernel_copy and not copied and size and hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        try:
+            while copied < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), copied, min(COPY_CHUNK, size - copied))
+                if not sent:
+                    break
+                copied += sent
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED:
+                raise
+        # sendfile with an explicit offset leaves both positions untouched.
+        fsrc.seek(copied)
+        fdst.seek(copied)
+    if copied < size:
+        shutil.copyfileobj(fsrc, fdst, COPY_CHUNK)
+
+class DeviceMap:
+    """
+    Answers "would moving src to dst cross a device?" from `st_dev`, with
+    one stat per folder. A target folder that does not exist yet belongs
+    to the device of its nearest existing parent.
+    """
+    def __init__(self):
+        self._devices = {}
+
+    def device(self, folder):
+        folder = os.path.abspath(folder)
+        device = self._devices.get(folder)
+        if device is None:
+            try:
+                device = os.stat(folder).st_dev
+            except OSError:
+                parent = os.path.dirname(folder)
+                device = self.device(parent) if parent != folder else -1
+            self._devices[folder] = device
+        return device
+
+    def crosses_device(self, src, dst):
+        return self.device(os.path.dirname(os.path.abspath(src))) != self.device(os.path.dirname(os.path.abspath(dst)))
+
+def link_duplicate(original, duplicate, mode=LINK_AUTO):
+    """
+    Replaces `duplicate` with a link to `original`'s contents and returns
+    the kind of link made.
+
+    A reflink (copy-on-write clone) keeps the duplicate a separate file
+    with its own times and permissions, so later edits to either file do
+    not affect the other; 'auto' tries one first and falls back to a
+    hardlink where the filesystem cannot clone. The link is made under a
+    temporary name and renamed over the duplicate, so the duplicate is
+    never missing.
+    """
+    tmp = os.path.join(os.path.dirname(duplicate), f".{os.path.basename(duplicate)}.dedupe-tmp")
+    try:
+        kind = None
+        if mode in (LINK_AUTO, LINK_REFLINK):
+            try:
+                _reflink(original, tmp)
+                shutil.copystat(duplicate, tmp)
+                kind = LINK_REFLINK
+            except OSError as e:
+                if mode == LINK_REFLINK or e.errno not in _UNSUPPORTED | {errno.ENOTTY}:
+                    raise
+                _discard(tmp)
+        if kind is None:
+            os.link(original, tmp)
+            kind = LINK_HARDLINK
+        os.replace(tmp, duplicate)
+    except BaseException:
+        _discard(tmp)
+        raise
+    return kind
+
+def split_link(original, duplicate):
+    """
+    Undoes `link_duplicate` for a hardlink: gives `duplicate` its own copy
+    of the contents again. Returns False if it has no link to split (a
+    reflink, or a file already split).
+    """
+    try:
+        shared = os.path.samefile(original, duplicate)
+    except FileNotFoundError:
+        if not os.path.exists(duplicate):
+            raise
+        shared = False
+    if not shared:
+        return False
+    tmp = os.path.join(os.path.dirname(duplicate), f".{os.path.basename(duplicate)}.dedupe-tmp")
+    try:
+        with open(original, 'rb') as fsrc, open(tmp, 'xb') as fdst:
+            _copy_contents(fsrc, fdst, os.fstat(fsrc.fileno()).st_size)
+        shutil.copystat(original, tmp)
+        os.replace(tmp, duplicate)
+    except BaseException:
+        _discard(tmp)
+        raise
+    return True
+
+def _discard(path):
+    """Removes a temporary file left by a failed link or split, if any."""
+    if os.path.lexists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _reflink(src, dst):
+    """Creates `dst` as a copy-on-write clone of `src` (FICLONE), or raises OSError if unsupported."""
+    if fcntl is None or not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform", dst)
+    with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+        # The ioctl needs real descriptors, i.e. the buffered files open() returns.
+        if not (isinstance(fsrc, io.BufferedReader) and isinstance(fdst, io.BufferedWriter)):
+            raise OSError(errno.EOPNOTSUPP, "Reflinks need real file descriptors", dst)
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
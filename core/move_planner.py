@@ -0,0 +1,331 @@
+import os
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from core.move_engine import DeviceMap, move_file
+
+DUPLICATE_TARGET = "Another file is already planned to move to this target."
+DUPLICATE_SOURCE = "This file is already planned to move elsewhere."
+TARGET_EXISTS = "The target already exists."
+TARGET_NOT_VACATED = "The target is occupied by a file whose own move was rejected."
+
+# Moves logged line by line in a dry run whose plan is being saved.
+PREVIEW_LOG_LIMIT = 1000
+
+class MoveBlocked(Exception):
+    """A step was not attempted because an earlier step it depends on failed."""
+
+# Returned for a step that is skipped without being reported.
+_SKIPPED = object()
+
+class MoveStep:
+    """
+    One rename in an ordered plan.
+
+    Most steps are a whole intended move (`origin` -> `target`). A move that
+    is part of a cycle (A->B, B->A) is split into two steps through a
+    temporary name next to the source; only the last step has `final` set.
+    """
+    __slots__ = ('src', 'dst', 'origin', 'target', 'final', 'group_start')
+
+    def __init__(self, src, dst, origin, target, final=True, group_start=True):
+        self.src = src
+        self.dst = dst
+        self.origin = origin
+        self.target = target
+        self.final = final
+        # Cancellation is only honoured before a step that starts a group, so
+        # a cycle is never left half-rotated.
+        self.group_start = group_start
+
+    def __repr__(self):
+        return f"MoveStep({self.src!r} -> {self.dst!r})"
+
+class MovePlan:
+    """
+    A validated, ordered batch of renames produced by `plan_moves`.
+
+    Attributes:
+        steps: MoveSteps in a safe execution order: every target is free (or
+               vacated by an earlier step) when its step runs.
+        conflicts: (source, target, reason) for intended moves that were
+                   rejected and will not be attempted.
+    """
+    def __init__(self):
+        self.steps = []
+        self.conflicts = []
+
+    @property
+    def moves(self):
+        """The accepted moves as (origin, target) pairs, in execution order."""
+        return [(step.origin, step.target) for step in self.steps if step.final]
+
+    def run(self, on_done, mover=None, should_stop=None, workers=1):
+        """
+        Executes the steps in order, calling `on_done(step, error)` after each
+        one (`error` is None on success). When a step fails, steps that needed
+        its source to be vacated are reported with MoveBlocked instead of
+        being attempted, so nothing is ever overwritten.
+
+        With more than one worker, same-device renames still run in order on
+        the calling thread while cross-device moves (full copies) run on a
+        pool of `workers` threads. A step waits only for earlier steps that
+        touch one of its paths, and `on_done` is still called in plan order.
+
+        Args:
+            on_done: Callback for each finished or blocked step.
+            mover: Function (src, dst) that moves one file; defaults to `move_file`.
+            should_stop: Optional callable checked before each group of steps.
+            workers: Number of threads for cross-device moves.
+        """
+        mover = mover or move_file
+        # Paths still occupied because their move failed, and temporary
+        # names that were never written because the step into them failed.
+        stuck, missing = set(), set()
+
+        def attempt(step):
+            if _key(step.src) in missing:
+                # The failure was already reported for the step that created it.
+                return _SKIPPED
+            if _key(step.dst) in stuck:
+                stuck.add(_key(step.src))
+                missing.add(_key(step.dst))
+                return MoveBlocked(f"'{step.dst}' was not vacated because an earlier move failed.")
+            try:
+                mover(step.src, step.dst)
+            except Exception as e:
+                stuck.add(_key(step.src))
+                missing.add(_key(step.dst))
+                return e
+            return None
+
+        if workers <= 1:
+            for step in self.steps:
+                if step.group_start and should_stop and should_stop():
+                    return
+                error = attempt(step)
+                if error is not _SKIPPED:
+                    on_done(step, error)
+            return
+
+        devices = DeviceMap()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="move")
+        # The newest scheduled step touching each path, and all steps not yet reported, in plan order.
+        last_use = {}
+        pending = deque()
+
+        def report(block=False):
+            while pending and (block or pending[0][1].done()):
+                step, future = pending.popleft()
+                error = future.result()
+                if error is not _SKIPPED:
+                    on_done(step, error)
+
+        def after(dependencies, step):
+            wait(dependencies)
+            return attempt(step)
+
+        try:
+            for step in self.steps:
+                if step.group_start and should_stop and should_stop():
+                    break
+                keys = (_key(step.src), _key(step.dst))
+                dependencies = [last_use[key] for key in keys if key in last_use]
+                if devices.crosses_device(step.src, step.dst):
+                    # The pool's queue is FIFO, so a dependency is always picked up first.
+                    future = executor.submit(after, dependencies, step)
+                else:
+                    wait(dependencies)
+                    future = Future()
+                    future.set_result(attempt(step))
+                pending.append((step, future))
+                for key in keys:
+                    last_use[key] = future
+                report()
+                while len(pending) > workers * 4:
+                    wait([pending[0][1]])
+                    report()
+            while pending:
+                report(block=True)
+        finally:
+            executor.shutdown(wait=True)
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+class FolderListings:
+    """
+    Answers "does this path exist?" from one cached `os.scandir` listing per
+    folder instead of a stat per file. Share one instance between checks on
+    the same folders (e.g. pass it to `plan_moves` as `existing`).
+    """
+    def __init__(self):
+        self._names = {}
+
+    def __contains__(self, path):
+        folder, name = os.path.split(_key(path))
+        names = self._names.get(folder)
+        if names is None:
+            try:
+                with os.scandir(folder) as entries:
+                    names = {os.path.normcase(entry.name) for entry in entries}
+            except OSError:
+                names = set()
+            self._names[folder] = names
+        return name in names
+
+def plan_moves(moves, existing=None):
+    """
+    Turns intended (source, target) moves into a MovePlan.
+
+    Runs in O(n) using hash maps: moves to the same target or from the same
+    source are rejected after the first, as are moves onto a file that
+    exists and is not itself moved away by the plan. Rejections cascade: a
+    move onto the source of a rejected move is rejected too. The remaining
+    moves are ordered so each target is vacated before it is written, and
+    cycles are broken with a temporary name.
+
+    Args:
+        moves: Iterable of (source, target) paths. Moves onto themselves are dropped.
+        existing: Optional container answering `path in existing` for files
+                  already on disk; by default each target folder is listed once.
+    """
+    existing = FolderListings() if existing is None else existing
+    plan = MovePlan()
+    accepted = []
+    by_src, by_dst = {}, {}
+    for src, dst in moves:
+        src_key, dst_key = _key(src), _key(dst)
+        if src == dst:
+            continue
+        if dst_key in by_dst:
+            plan.conflicts.append((src, dst, DUPLICATE_TARGET))
+            continue
+        if src_key in by_src:
+            plan.conflicts.append((src, dst, DUPLICATE_SOURCE))
+            continue
+        move = [src, dst, src_key, dst_key]
+        by_src[src_key] = move
+        by_dst[dst_key] = move
+        accepted.append(move)
+
+    # A target may exist only if the plan moves that file away first (or it
+    # is the same file, e.g. a case-only rename on Windows).
+    rejected = []
+    for move in accepted:
+        src, dst, src_key, dst_key = move
+        if dst_key != src_key and dst_key not in by_src and dst in existing:
+            rejected.append((move, TARGET_EXISTS))
+    while rejected:
+        move, reason = rejected.pop()
+        src, dst, src_key, dst_key = move
+        if by_src.get(src_key) is not move:
+            continue
+        del by_src[src_key]
+        del by_dst[dst_key]
+        plan.conflicts.append((src, dst, reason))
+        # Whoever wanted this source's slot can no longer have it.
+        waiting = by_dst.get(src_key)
+        if waiting is not None and waiting is not move:
+            rejected.append((waiting, TARGET_NOT_VACATED))
+
+    emitted = set()
+    def emit_chain(move):
+        # Moves wanting this move's source can run right after it.
+        while move is not None and id(move) not in emitted:
+            emitted.add(id(move))
+            plan.steps.append(MoveStep(move[0], move[1], move[0], move[1]))
+            move = by_dst.get(move[2])
+
+    live = [move for move in accepted if by_src.get(move[2]) is move]
+    for move in live:
+        blocker = by_src.get(move[3])
+        if blocker is None or blocker is move:
+            emit_chain(move)
+
+    # What is left forms cycles; rotate each through a temporary name.
+    for move in live:
+        if id(move) in emitted:
+            continue
+        src, dst = move[0], move[1]
+        temp = _temporary_name(src, existing)
+        plan.steps.append(MoveStep(src, temp, src, dst, final=False, group_start=True))
+        emitted.add(id(move))
+        waiting = by_dst.get(move[2])
+        while waiting is not None and id(waiting) not in emitted:
+            emitted.add(id(waiting))
+            plan.steps.append(MoveStep(waiting[0], waiting[1], waiting[0], waiting[1], group_start=False))
+            waiting = by_dst.get(waiting[2])
+        plan.steps.append(MoveStep(temp, dst, src, dst, group_start=False))
+    return plan
+
+def _temporary_name(path, existing):
+    while True:
+        temp = f"{path}.~move-{uuid.uuid4().hex[:8]}"
+        if temp not in existing:
+            return temp
+
+def execute_plan(plan, journal, action_type, context, result, success_message=None, should_stop=None, workers=1):
+    """
+    Reports a plan's conflicts and runs it, recording every executed step in
+    the change journal and every completed move on `result`.
+
+    Args:
+        journal: The run's ChangeJournal.
+        action_type: The action type written to the journal.
+        success_message: Optional function (origin, target) -> log line.
+        should_stop: Optional cancellation check, e.g. `lambda: cls.check_cancelled(context, result)`.
+        workers: Threads for cross-device moves (see `MovePlan.run`).
+    """
+    log = context.log
+    report_conflicts(plan, log, result)
+    total = len(plan.steps)
+    done = 0
+
+    def on_done(step, error):
+        nonlocal done
+        done += 1
+        context.report_progress(done, total)
+        if error is None:
+            journal.record(step.src, step.dst, 'success', action_type)
+            if step.final:
+                if success_message:
+                    log(success_message(step.origin, step.target))
+                result.add_success(step.origin, step.target)
+            return
+        if not isinstance(error, MoveBlocked):
+            journal.record(step.src, step.dst, f'failure - {error}', action_type)
+        if step.src != step.origin:
+            log(f"FAILURE: '{os.path.basename(step.origin)}' was left at the temporary name '{step.src}'. Reason: {error}")
+        else:
+            log(f"FAILURE: Could not move '{os.path.basename(step.origin)}' to '{step.target}'. Reason: {error}")
+        result.add_failure(step.origin, error)
+
+    plan.run(on_done, should_stop=should_stop, workers=workers)
+
+def report_conflicts(plan, log, result):
+    for src, dst, reason in plan.conflicts:
+        log(f"CONFLICT: Not moving '{os.path.basename(src)}' to '{dst}'. {reason}")
+        result.add_failure(src, reason)
+
+def preview_plan(plan, log, result, message, saved_plan=None):
+    """
+    Dry-run counterpart of `execute_plan`: reports conflicts and logs
+    `message(origin, target)` per move. With a `core.saved_plan.PlanWriter`,
+    the moves and conflicts are also written to the plan file and only the
+    first PREVIEW_LOG_LIMIT moves are logged.
+    """
+    report_conflicts(plan, log, result)
+    moves = plan.moves
+    if saved_plan is not None:
+        for src, dst, reason in plan.conflicts:
+            saved_plan.add_conflict(src, dst, reason)
+    for index, (origin, target) in enumerate(moves):
+        if saved_plan is None or index < PREVIEW_LOG_LIMIT:
+            log(message(origin, target))
+        if saved_plan is not None:
+            saved_plan.add_move(origin, target)
+        result.add_success(origin, target)
+    if saved_plan is not None and len(moves) > PREVIEW_LOG_LIMIT:
+        log(f"... and {len(moves) - PREVIEW_LOG_LIMIT} more moves (see the saved plan).")
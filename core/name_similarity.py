@@ -0,0 +1,158 @@
+import os
+import re
+import random
+import hashlib
+
+# Default Jaccard similarity (0-100) of two names' trigram sets for them to count as near-duplicates.
+DEFAULT_SIMILARITY = 75
+# Candidates taken from each LSH bucket a name falls in; bounds the work for very common name families.
+MAX_BUCKET_PEERS = 50
+
+_SEPARATORS = re.compile(r'[\W_]+')
+_DIGIT_RUNS = re.compile(r'\d+')
+# Markers that copies of a file pick up: "x (1)", "x - Copy", "x_copy2", "Copy of x".
+_COPY_MARKERS = re.compile(r'^copy of\s+|[\s_-]*\(\d+\)$|[\s_-]*(?<![^\W_])copy(?:[\s_-]*\d+)?$')
+
+def normalize_name(filename):
+    """
+    The comparable form of a filename's stem: case-folded, with copy
+    markers removed and runs of punctuation turned into single spaces, so
+    'Report-Final (1).pdf' and 'report_final - Copy.pdf' both become
+    'report final'.
+    """
+    stem = os.path.splitext(filename)[0].casefold().strip()
+    while True:
+        stripped = _COPY_MARKERS.sub('', stem).strip()
+        if stripped == stem:
+            break
+        stem = stripped
+    return _SEPARATORS.sub(' ', stem).strip()
+
+def trigrams(text):
+    """The set of three-character substrings of a normalized name, padded at both ends."""
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(max(len(padded) - 2, 1)))
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def numbers(text):
+    """
+    The values of a name's digit runs, in order. Names with different
+    numbers (dates, sequence or version numbers) name different files, so
+    'img 20240101 120000' and 'img 20240101 120001' are never matched.
+    """
+    return tuple(int(run) for run in _DIGIT_RUNS.findall(text))
+
+class MinHashLSH:
+    """
+    Finds candidate pairs of similar sets in near-linear time with MinHash
+    locality-sensitive hashing.
+
+    Each set gets a signature of BANDS * ROWS minimum hash values; two sets
+    agree on any one value with probability equal to their Jaccard
+    similarity. Sets are bucketed by each band of ROWS values, and only sets
+    sharing a bucket become candidates. With 8 bands of 4 rows, a pair at
+    75% similarity shares a bucket about 95% of the time, and a pair at 30%
+    about 6% of the time.
+    """
+    BANDS = 8
+    ROWS = 4
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, seed=0):
+        rng = random.Random(seed)
+        self._coefficients = [(rng.randrange(1, self._PRIME), rng.randrange(self._PRIME)) for _ in range(self.BANDS * self.ROWS)]
+        self._token_hashes = {}
+        self._buckets = {}
+
+    def _hashes(self, token):
+        hashes = self._token_hashes.get(token)
+        if hashes is None:
+            x = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+            hashes = self._token_hashes[token] = tuple(((a * x + b) % self._PRIME) & 0xFFFFFFFF for a, b in self._coefficients)
+        return hashes
+
+    def signature(self, tokens):
+        hashes = [self._hashes(token) for token in tokens]
+        return hashes[0] if len(hashes) == 1 else tuple(map(min, *hashes))
+
+    def _bucket_keys(self, tokens, namespace):
+        signature = self.signature(tokens)
+        return [(namespace, band, signature[band * self.ROWS:(band + 1) * self.ROWS]) for band in range(self.BANDS)]
+
+    def add(self, key, tokens, namespace=None):
+        for bucket_key in self._bucket_keys(tokens, namespace):
+            self._buckets.setdefault(bucket_key, []).append(key)
+
+    def query(self, tokens, namespace=None):
+        """
+        Returns the keys added under `namespace` that share one of the set's
+        buckets (most recent first, at most MAX_BUCKET_PEERS per bucket).
+        """
+        candidates = []
+        for bucket_key in self._bucket_keys(tokens, namespace):
+            candidates.extend(reversed(self._buckets.get(bucket_key, [])[-MAX_BUCKET_PEERS:]))
+        return candidates
+
+def find_similar_names(entries, similarity=DEFAULT_SIMILARITY, log=None):
+    """
+    Groups files whose names are near-duplicates of each other.
+
+    Names are normalized, and files with the same normalized name and
+    extension form a group outright. Each distinct normalized name, most
+    common first, then joins the group whose representative (the name that
+    started it) it is most similar to, if the exact trigram similarity reaches
+    `similarity` percent, and otherwise becomes the representative of a new
+    group. Representatives are found through MinHash LSH, and only names
+    with the same extension and the same numbers are compared. Comparing
+    with the representative rather than any member keeps long runs of
+    similar names (e.g. camera files) from chaining into one group.
+
+    Returns:
+        {label: [paths]} for every group of two or more files, most similar
+        groups first. The label names the group's representative with its
+        extension, and its weakest match.
+    """
+    log = log or (lambda message: None)
+    threshold = similarity / 100
+    by_name = {}
+    for entry in entries:
+        extension = os.path.normcase(os.path.splitext(entry.name)[1])
+        by_name.setdefault((extension, normalize_name(entry.name)), []).append(entry.path)
+    keys = sorted(by_name, key=lambda key: -len(by_name[key]))
+    log(f"Name check: {sum(len(paths) for paths in by_name.values())} file(s) reduce to {len(keys)} distinct normalized name(s).")
+
+    groups = {}
+    weakest = {}
+    lsh = MinHashLSH()
+    representative_tokens = {}
+    compared = 0
+    for i, (extension, name) in enumerate(keys):
+        tokens = trigrams(name)
+        namespace = (extension, numbers(name))
+        best, best_score = None, threshold
+        for j in dict.fromkeys(lsh.query(tokens, namespace)):
+            compared += 1
+            score = jaccard(tokens, representative_tokens[j])
+            if score > best_score or (best is None and score == best_score):
+                best, best_score = j, score
+        if best is None:
+            groups[i] = [keys[i]]
+            representative_tokens[i] = tokens
+            lsh.add(i, tokens, namespace)
+        else:
+            groups[best].append(keys[i])
+            weakest[best] = min(best_score, weakest.get(best, 1.0))
+    log(f"Name check: {compared} candidate pair(s) scored.")
+
+    result = []
+    for representative, members in groups.items():
+        paths = sorted(path for key in members for path in by_name[key])
+        if len(paths) < 2:
+            continue
+        score = weakest.get(representative, 1.0)
+        extension, name = keys[representative]
+        result.append((score, f"{name or '(no name)'}{extension} ({round(score * 100)}% similar)", paths))
+    result.sort(key=lambda item: (-item[0], item[1]))
+    return {label: paths for _, label, paths in result}
@@ -1,20 +1,63 @@
 import os
+import json
 import importlib
 import inspect
 from core.interfaces import ActionPlugin
 
+class PluginHandle:
+    """
+    A discovered plugin that may not have been imported yet.
+
+    The name, value and rollback flag come from the manifest cache, so the
+    GUI can list the plugin without importing its module. `load()` imports
+    the module and instantiates the plugin on first use.
+    """
+    def __init__(self, module_name, entry, app_context, instance=None):
+        self.module_name = module_name
+        self.class_name = entry['class_name']
+        self._entry = entry
+        self._app_context = app_context
+        self._instance = instance
+
+    def get_name(self) -> str:
+        return self._entry['name']
+
+    def get_value(self) -> str:
+        return self._entry['value']
+
+    def is_rollbackable(self) -> bool:
+        return self._entry['rollbackable']
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self) -> ActionPlugin:
+        """Imports the plugin's module (if needed) and returns the plugin instance."""
+        if self._instance is None:
+            module = importlib.import_module(self.module_name)
+            cls = getattr(module, self.class_name, None)
+            if cls is None:
+                raise LookupError(f"Plugin class '{self.class_name}' not found in '{self.module_name}'.")
+            self._instance = cls(self._app_context)
+        return self._instance
+
 class PluginManager:
     """
     Handles the discovery, loading, and management of action plugins.
     """
+    MANIFEST_FILENAME = ".plugin_manifest.json"
+    MANIFEST_VERSION = 1
+
     def __init__(self, plugin_folder="plugins"):
         self.plugin_folder = plugin_folder
         self.plugins = []
+        self.manifest_path = os.path.join(plugin_folder, self.MANIFEST_FILENAME)
 
     def discover_plugins(self, app_context):
         """
         Scans the plugin folder, imports modules, and instantiates plugins.
-        
+
         Args:
             app_context: The main application instance, passed to plugins
                          to give them access to the app's state and methods.
@@ -23,25 +66,109 @@ class PluginManager:
             print(f"Plugin folder '{self.plugin_folder}' not found.")
             return
 
-        for filename in os.listdir(self.plugin_folder):
-            if filename.endswith(".py") and not filename.startswith("__"):
-                module_name = f"{self.plugin_folder}.{filename[:-3]}"
-                try:
-                    module = importlib.import_module(module_name)
-                    for name, cls in inspect.getmembers(module, inspect.isclass):
-                        if issubclass(cls, ActionPlugin) and cls is not ActionPlugin:
-                            # This will now correctly raise a TypeError if a plugin is incomplete,
-                            # allowing the test suite to catch it as expected.
-                            plugin_instance = cls(app_context)
-                            self.plugins.append(plugin_instance)
-                except Exception as e:
-                    print(f"Error processing plugin from {filename}: {e}")
-                    # Re-raise the error so that the test expecting it can catch it.
-                    if isinstance(e, TypeError):
-                        raise
-        
+        for filename in self._plugin_filenames():
+            for plugin_instance in self._import_plugins(filename, app_context):
+                self.plugins.append(plugin_instance)
+
+    def discover_plugin_handles(self, app_context):
+        """
+        Like discover_plugins, but fills `self.plugins` with PluginHandle objects.
+
+        Plugin files whose path, modification time and size match the manifest
+        cache are not imported; only new or changed files are imported, and
+        the manifest is rewritten if anything changed.
+        """
+        if not os.path.exists(self.plugin_folder):
+            print(f"Plugin folder '{self.plugin_folder}' not found.")
+            return
+
+        manifest = self._read_manifest()
+        new_manifest = {}
+        failed = set()
+        for filename in self._plugin_filenames():
+            module_name = self._module_name(filename)
+            try:
+                stat = os.stat(os.path.join(self.plugin_folder, filename))
+            except OSError:
+                continue
+            cached = manifest.get(filename)
+            if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                new_manifest[filename] = cached
+                for entry in cached['plugins']:
+                    self.plugins.append(PluginHandle(module_name, entry, app_context))
+                continue
+            # New or stale entry: import the module once to refresh it.
+            entries = []
+            for plugin_instance in self._import_plugins(filename, app_context, failed):
+                entry = {
+                    'class_name': type(plugin_instance).__name__,
+                    'name': plugin_instance.get_name(),
+                    'value': plugin_instance.get_value(),
+                    'rollbackable': bool(plugin_instance.is_rollbackable()),
+                }
+                entries.append(entry)
+                self.plugins.append(PluginHandle(module_name, entry, app_context, instance=plugin_instance))
+            if filename in failed:
+                # Not cached, so a file that failed to import (e.g. a missing
+                # optional dependency) is retried on the next start.
+                continue
+            new_manifest[filename] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'plugins': entries}
+        if new_manifest != manifest:
+            self._write_manifest(new_manifest)
+
     def get_all_plugins(self):
         """
-        Returns a list of all loaded plugin instances.
+        Returns a list of all loaded plugin instances (or PluginHandles after
+        discover_plugin_handles).
         """
         return self.plugins
+
+    def _plugin_filenames(self):
+        return sorted(f for f in os.listdir(self.plugin_folder) if f.endswith(".py") and not f.startswith("__"))
+
+    def _module_name(self, filename):
+        return f"{self.plugin_folder}.{filename[:-3]}"
+
+    def _import_plugins(self, filename, app_context, failed=None):
+        """
+        Imports one plugin module and returns instances of the plugin classes
+        it defines. If the import fails, `filename` is added to `failed`.
+        """
+        instances = []
+        try:
+            module = importlib.import_module(self._module_name(filename))
+            for name, cls in inspect.getmembers(module, inspect.isclass):
+                if issubclass(cls, ActionPlugin) and not inspect.isabstract(cls) and cls.__module__ == module.__name__:
+                    instances.append(cls(app_context))
+                elif issubclass(cls, ActionPlugin) and cls.__module__ == module.__name__:
+                    # This will correctly raise a TypeError if a plugin is incomplete,
+                    # allowing the test suite to catch it as expected.
+                    cls(app_context)
+        except Exception as e:
+            print(f"Error processing plugin from {filename}: {e}")
+            if failed is not None:
+                failed.add(filename)
+            # Re-raise the error so that the test expecting it can catch it.
+            if isinstance(e, TypeError):
+                raise
+        return instances
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.MANIFEST_VERSION:
+                return data.get('files', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _write_manifest(self, files):
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.MANIFEST_VERSION, 'files': files}, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            # A read-only install simply runs without the cache.
+            print(f"Could not write plugin manifest '{self.manifest_path}': {e}")
@@ -0,0 +1,73 @@
+import os
+import re
+import json
+
+RULE_SET_VERSION = 1
+TARGETS = ('name', 'ext')
+
+def make_rule(find, replace_with='', use_regex=False, target='name'):
+    """A find/replace rule as a plain dict, the form used in parameters and rule set files."""
+    return {'find': find, 'replace_with': replace_with, 'use_regex': bool(use_regex), 'target': target}
+
+def describe_rule(rule):
+    kind = "regex" if rule.get('use_regex') else "text"
+    where = "extension" if rule.get('target') == 'ext' else "name"
+    return f"{kind} '{rule['find']}' -> '{rule.get('replace_with', '')}' in {where}"
+
+class RulePipeline:
+    """
+    An ordered list of find/replace rules, compiled once and applied to a
+    filename in a single pass.
+
+    Name rules run in order on the part before the extension, extension
+    rules on the extension without its dot; because the two parts never
+    overlap, each file needs one split and one rename however many rules
+    there are.
+    """
+    def __init__(self, rules):
+        self.name_rules = []
+        self.ext_rules = []
+        for index, rule in enumerate(rules, 1):
+            find = rule.get('find', '')
+            if not find:
+                raise ValueError(f"Rule {index} has nothing to find.")
+            target = rule.get('target', 'name')
+            if target not in TARGETS:
+                raise ValueError(f"Rule {index} has an unknown target '{target}'.")
+            replace_with = rule.get('replace_with', '')
+            if rule.get('use_regex'):
+                try:
+                    pattern = re.compile(find)
+                except re.error as e:
+                    raise ValueError(f"Invalid Regex pattern in rule {index}: {e}") from None
+                apply = lambda text, pattern=pattern, replace_with=replace_with: pattern.sub(replace_with, text)
+            else:
+                apply = lambda text, find=find, replace_with=replace_with: text.replace(find, replace_with)
+            (self.ext_rules if target == 'ext' else self.name_rules).append(apply)
+
+    def __len__(self):
+        return len(self.name_rules) + len(self.ext_rules)
+
+    def apply(self, filename):
+        """Returns the filename after all rules have been applied."""
+        name, ext = os.path.splitext(filename)
+        for apply in self.name_rules:
+            name = apply(name)
+        if self.ext_rules:
+            ext = ext[1:] if ext.startswith('.') else ext
+            for apply in self.ext_rules:
+                ext = apply(ext)
+            ext = f".{ext}" if ext else ""
+        return name + ext
+
+def load_rule_set(path):
+    """Reads the rules saved by `save_rule_set`."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get('version') != RULE_SET_VERSION or not isinstance(data.get('rules'), list):
+        raise ValueError(f"'{path}' is not a rule set file.")
+    return [make_rule(r.get('find', ''), r.get('replace_with', ''), r.get('use_regex', False), r.get('target', 'name')) for r in data['rules']]
+
+def save_rule_set(path, rules):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': RULE_SET_VERSION, 'rules': list(rules)}, f, indent=2)
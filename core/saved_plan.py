@@ -0,0 +1,144 @@
+import os
+import json
+from datetime import datetime
+
+from core.journal import new_run_id, read_lines_reversed
+
+PLAN_VERSION = 1
+PLAN_SUFFIX = '.plan.jsonl'
+# Plans saved to the default folder beyond this many (oldest first) are deleted.
+KEEP_PLANS = 20
+
+def default_plan_dir():
+    return os.path.join(os.path.expanduser('~'), '.filerefactoring', 'plans')
+
+def list_plans(directory=None):
+    """Returns the paths of the saved plans in `directory` (default: `default_plan_dir()`), newest first."""
+    directory = directory or default_plan_dir()
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(PLAN_SUFFIX)]
+    except OSError:
+        return []
+    paths = [os.path.join(directory, name) for name in names]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+def fingerprint(path):
+    """(size, mtime_ns) of a file, or None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class PlanFileError(Exception):
+    """A saved plan is missing, incomplete or from an unsupported version."""
+
+class PlanWriter:
+    """
+    Streams a dry run's planned moves to a JSON Lines plan file.
+
+    The first line is a header (action, change log path, parameters), then
+    one line per move with the source's size and mtime as a fingerprint,
+    one per conflict, and a closing summary. The file is written under a
+    temporary name and only renamed into place once complete, so a failed
+    dry run never leaves a plan that looks runnable.
+
+    Usage:
+        with PlanWriter(params['plan_file'], 'organize', log_path, params, log=log) as saved_plan:
+            preview_plan(plan, log, result, message, saved_plan)
+    """
+    def __init__(self, path, action, log_path, params=None, log=None, result=None):
+        self._prune = not path
+        self.path = path or os.path.join(default_plan_dir(), f"{action}-{new_run_id()}{PLAN_SUFFIX}")
+        self.action = action
+        self.log_path = os.path.abspath(log_path)
+        self.params = params or {}
+        self.log = log
+        self.result = result
+        self.move_count = 0
+        self.conflict_count = 0
+        self.total_bytes = 0
+        self._file = None
+
+    def __enter__(self):
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        self._file = open(self.path + '.tmp', 'w', encoding='utf-8')
+        self._write({
+            'type': 'header',
+            'version': PLAN_VERSION,
+            'action': self.action,
+            'log_path': self.log_path,
+            'params': json.loads(json.dumps(self.params, default=str)),
+            'created': datetime.now().isoformat(timespec='seconds'),
+        })
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._file.close()
+            os.remove(self.path + '.tmp')
+            return False
+        self._write({'type': 'summary', 'moves': self.move_count, 'conflicts': self.conflict_count, 'bytes': self.total_bytes})
+        self._file.close()
+        os.replace(self.path + '.tmp', self.path)
+        if self.log:
+            self.log(f"Plan saved to '{self.path}' ({self.move_count} moves). Run it with the Execute Saved Plan action.")
+        if self.result is not None:
+            self.result.outputs.append(self.path)
+        if self._prune:
+            for old_path in list_plans(os.path.dirname(self.path))[KEEP_PLANS:]:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return False
+
+    def add_move(self, src, dst):
+        size, mtime_ns = fingerprint(src) or (None, None)
+        self.move_count += 1
+        self.total_bytes += size or 0
+        self._write({'type': 'move', 'src': os.path.abspath(src), 'dst': os.path.abspath(dst), 'size': size, 'mtime_ns': mtime_ns})
+
+    def add_conflict(self, src, dst, reason):
+        self.conflict_count += 1
+        self._write({'type': 'conflict', 'src': os.path.abspath(src), 'dst': os.path.abspath(dst), 'reason': reason})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+
+class SavedPlan:
+    """
+    A plan file written by PlanWriter. The header and summary are read when
+    it is opened; the moves are streamed by `moves()`.
+    """
+    def __init__(self, path):
+        self.path = path
+        if not os.path.isfile(path):
+            raise PlanFileError(f"Plan file '{path}' does not exist.")
+        with open(path, encoding='utf-8') as f:
+            self.header = self._parse(f.readline())
+        if self.header.get('type') != 'header' or self.header.get('version') != PLAN_VERSION:
+            raise PlanFileError(f"'{path}' is not a plan file this version can run.")
+        self.summary = self._parse(next(read_lines_reversed(path), ''))
+        if self.summary.get('type') != 'summary':
+            raise PlanFileError(f"Plan file '{path}' is incomplete.")
+
+    @property
+    def action(self):
+        return self.header['action']
+
+    def moves(self):
+        """Yields (src, dst, size, mtime_ns) for each planned move, in plan order."""
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                record = self._parse(line)
+                if record.get('type') == 'move':
+                    yield record['src'], record['dst'], record['size'], record['mtime_ns']
+
+    def _parse(self, line):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise PlanFileError(f"Plan file '{self.path}' is damaged.") from None
+        return record if isinstance(record, dict) else {}
@@ -0,0 +1,125 @@
+from collections import deque
+
+class TermMatcher:
+    """
+    Finds which of many search terms occur in a string, case-insensitively,
+    in one pass over the string (an Aho-Corasick automaton).
+
+    The automaton is built once from the terms; each query then costs time
+    proportional to the length of the string (plus the matches returned),
+    not to the number of terms. Terms keep their list position as their
+    priority: `first_match` returns the earliest listed term that occurs.
+    """
+    def __init__(self, terms):
+        self.terms = list(terms)
+        # Per node: transitions, failure link, own term indices, the nearest
+        # failure ancestor with terms, and the best (lowest) term index
+        # matched on reaching it.
+        self._goto = [{}]
+        self._fail = [0]
+        self._terms_at = [[]]
+        self._output_link = [0]
+        self._best = [None]
+        for index, term in enumerate(self.terms):
+            folded = term.casefold()
+            if not folded:
+                continue
+            node = 0
+            for char in folded:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terms_at.append([])
+                    self._output_link.append(0)
+                    self._best.append(None)
+                node = next_node
+            self._terms_at[node].append(index)
+        self._link()
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._best[node] = min(self._terms_at[node], default=None)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                if fail == child:
+                    fail = 0
+                self._fail[child] = fail
+                self._output_link[child] = fail if self._terms_at[fail] else self._output_link[fail]
+                candidates = [best for best in (min(self._terms_at[child], default=None), self._best[fail]) if best is not None]
+                self._best[child] = min(candidates, default=None)
+                queue.append(child)
+
+    def _walk(self, text):
+        """Yields the automaton state after each character of the case-folded text."""
+        goto, fail = self._goto, self._fail
+        node = 0
+        for char in text.casefold():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            yield node
+
+    def first_match(self, text):
+        """Returns the index of the highest-priority term found in `text`, or None."""
+        best = None
+        best_at = self._best
+        for node in self._walk(text):
+            found = best_at[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+    def find_all(self, text):
+        """Returns the indices of every term found in `text`, in priority order."""
+        found = set()
+        for node in self._walk(text):
+            while node:
+                found.update(self._terms_at[node])
+                node = self._output_link[node]
+        return sorted(found)
+
+class PrefixTrie:
+    """
+    Maps keys to values and finds the longest key that a string starts with,
+    in time proportional to the length of the string (case-sensitive).
+    """
+    _VALUE = object()
+
+    def __init__(self, mapping=()):
+        self._root = {}
+        self._size = 0
+        for key, value in (mapping.items() if hasattr(mapping, 'items') else mapping):
+            self[key] = value
+
+    def __setitem__(self, key, value):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if self._VALUE not in node:
+            self._size += 1
+        node[self._VALUE] = (key, value)
+
+    def __len__(self):
+        return self._size
+
+    def longest_prefix(self, text):
+        """Returns (key, value) for the longest key that `text` starts with, or None."""
+        node = self._root
+        match = node.get(self._VALUE)
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(self._VALUE, match)
+        return match
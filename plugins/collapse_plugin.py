@@ -0,0 +1,132 @@
+import os
+import tkinter as tk
+from tkinter import filedialog
+import ttkbootstrap as ttk
+from ttkbootstrap.dialogs import Messagebox
+
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import plan_moves, execute_plan, preview_plan
+from core.saved_plan import PlanWriter
+from core.scanner import scan_files
+
+class CollapsePlugin(HeadlessActionPlugin):
+    """
+    A plugin to move all files from all subdirectories into their
+    top-level parent folder.
+    """
+    default_params = {
+        'collapse_folder': '',
+        'prepend_path': True,
+        'dry_run': False,
+        'journal_durability': 'none',
+        'move_workers': 1,
+        'plan_file': '',
+        'scan_workers': 1,
+    }
+
+    def __init__(self, app_context):
+        self.app = app_context
+        self.collapse_folder_var = tk.StringVar()
+        self.prepend_path_var = tk.BooleanVar(value=True)
+        self.dry_run_var = tk.BooleanVar(value=False)
+
+    def get_name(self) -> str:
+        return "Collapse"
+
+    def get_value(self) -> str:
+        return "collapse"
+
+    def is_rollbackable(self) -> bool:
+        return True
+
+    def create_gui(self, master) -> None:
+        """Creates the UI for the Collapse action."""
+        frame = ttk.LabelFrame(master, text="Collapse Options", padding=10)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        frame.columnconfigure(1, weight=1)
+        ttk.Checkbutton(frame, text="Dry Run (Simulate changes)", variable=self.dry_run_var, bootstyle="round-toggle").grid(row=0, column=0, columnspan=3, sticky='w', padx=5, pady=(0, 10))
+        ttk.Label(frame, text="Parent Folder:").grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(frame, textvariable=self.collapse_folder_var).grid(row=1, column=1, sticky="ew", padx=5)
+        ttk.Button(frame, text="Browse...", command=self._browse_folder, bootstyle="outline").grid(row=1, column=2, padx=5)
+        ttk.Checkbutton(frame, text="Prepend folder path to filename to avoid conflicts", variable=self.prepend_path_var, bootstyle="round-toggle").grid(row=2, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+
+    def validate(self) -> tuple[bool, str]:
+        """Validates the inputs for the action."""
+        if not self.collapse_folder_var.get() or not os.path.isdir(self.collapse_folder_var.get()):
+            return False, "A valid Parent Folder is required."
+        return True, ""
+
+    def get_params(self) -> dict:
+        return {
+            'collapse_folder': self.collapse_folder_var.get(),
+            'prepend_path': self.prepend_path_var.get(),
+            'dry_run': self.dry_run_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        """Moves every file below the parent folder up into it, then removes empty subfolders."""
+        parent_folder = params['collapse_folder']
+        prepend_path = params['prepend_path']
+        is_dry_run = params['dry_run']
+        log = context.log
+        log(f"--- Starting Collapse Action {'(Dry Run)' if is_dry_run else ''} ---")
+        moves = []
+        for entry in scan_files(parent_folder, workers=params['scan_workers']):
+            if entry.root == parent_folder:
+                continue
+            new_filename = entry.name
+            if prepend_path:
+                safe_sub_path = os.path.relpath(entry.root, parent_folder).replace(os.sep, '_')
+                new_filename = f"{safe_sub_path}_{entry.name}"
+            moves.append((entry.path, os.path.join(parent_folder, new_filename)))
+        result.scanned_count = len(moves)
+        if not moves:
+            log("No files found in subdirectories to collapse.")
+            return
+
+        # Name clashes in the parent folder (or between subfolders) are rejected before anything moves.
+        plan = plan_moves(moves)
+        log_path = os.path.join(parent_folder, 'file_name_change_log.csv')
+        if is_dry_run:
+            with PlanWriter(params['plan_file'], 'collapse', log_path, params, log=log, result=result) as saved_plan:
+                preview_plan(plan, log, result,
+                             lambda old, new: f"DRY RUN: Would move '{os.path.relpath(old, parent_folder)}' to '{os.path.basename(new)}'",
+                             saved_plan)
+        else:
+            with ChangeJournal(log_path, 'collapse', params, durability=params['journal_durability'], log=log) as journal:
+                execute_plan(plan, journal, 'collapse', context, result, should_stop=lambda: cls.check_cancelled(context, result),
+                             workers=params['move_workers'])
+            if not result.cancelled:
+                cls.finish_plan(params, context, result)
+        log(f"\n--- Collapse Complete ---")
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        elif not result.scanned_count:
+            Messagebox.show_info("No Files Found", "No files were found in any subdirectories.")
+        else:
+            Messagebox.show_info("Collapse Complete", f"Files moved: {result.success_count}\nFailures: {result.failure_count}")
+
+    @classmethod
+    def finish_plan(cls, params, context, result) -> None:
+        """Removes the subfolders the collapse left empty."""
+        cls._remove_empty_folders(params['collapse_folder'], context.log)
+
+    @staticmethod
+    def _remove_empty_folders(parent_folder, log):
+        for root, dirs, _ in os.walk(parent_folder, topdown=False):
+            for name in dirs:
+                dir_path = os.path.join(root, name)
+                try:
+                    if not os.listdir(dir_path):
+                        os.rmdir(dir_path)
+                except OSError as e:
+                    log(f"Could not remove directory '{dir_path}': {e}")
+
+    def _browse_folder(self):
+        path = filedialog.askdirectory(title="Select Parent Folder")
+        if path:
+            self.collapse_folder_var.set(path)
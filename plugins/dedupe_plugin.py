@@ -0,0 +1,202 @@
+import os
+import stat
+import filecmp
+import tkinter as tk
+from tkinter import filedialog
+import ttkbootstrap as ttk
+from ttkbootstrap.dialogs import Messagebox
+
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.scanner import scan_files
+from core.duplicate_finder import DuplicateFinder, METHOD_SIZE_HASH
+from core.hash_cache import HashCache
+from core.move_engine import link_duplicate, LINK_MODES, LINK_AUTO
+
+class DedupePlugin(HeadlessActionPlugin):
+    """
+    A plugin to reclaim the space taken by duplicate files by replacing
+    each duplicate with a reflink (where the filesystem supports it) or a
+    hardlink to one kept copy. Every file stays at its path, and Rollback
+    gives hardlinked files their own copy again.
+    """
+    ACTION_TYPE = 'link_duplicate'
+
+    default_params = {
+        'source_folder': '',
+        'recursive': True,
+        'link_mode': LINK_AUTO,
+        'dry_run': False,
+        'journal_durability': 'none',
+        'scan_workers': 1,
+        'hash_workers': 4,
+        'use_hash_cache': False,
+        'hash_cache_path': '',
+    }
+
+    def __init__(self, app_context):
+        self.app = app_context
+        self.source_folder_var = tk.StringVar()
+        self.recursive_var = tk.BooleanVar(value=True)
+        self.link_mode_var = tk.StringVar(value=LINK_AUTO)
+        self.dry_run_var = tk.BooleanVar(value=False)
+
+    def get_name(self) -> str:
+        return "Deduplicate (Link)"
+
+    def get_value(self) -> str:
+        return "dedupe"
+
+    def is_rollbackable(self) -> bool:
+        return True
+
+    def create_gui(self, master) -> None:
+        """Creates the UI for the Deduplicate action."""
+        frame = ttk.LabelFrame(master, text="Deduplicate Options", padding=10)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        frame.columnconfigure(1, weight=1)
+        ttk.Checkbutton(frame, text="Dry Run (Simulate changes)", variable=self.dry_run_var, bootstyle="round-toggle").grid(row=0, column=0, columnspan=3, sticky='w', padx=5, pady=(0, 10))
+        ttk.Label(frame, text="Source Folder:").grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(frame, textvariable=self.source_folder_var).grid(row=1, column=1, sticky="ew", padx=5)
+        ttk.Button(frame, text="Browse...", command=self._browse_folder, bootstyle="outline").grid(row=1, column=2, padx=5)
+        ttk.Checkbutton(frame, text="Include Subfolders (Recursive)", variable=self.recursive_var, bootstyle="round-toggle").grid(row=2, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        mode_frame = ttk.Frame(frame)
+        mode_frame.grid(row=3, column=0, columnspan=3, sticky="w", padx=5, pady=(10,5))
+        ttk.Label(mode_frame, text="Link Type:").pack(side="left")
+        ttk.Radiobutton(mode_frame, text="Reflink if Possible", variable=self.link_mode_var, value="auto", bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Radiobutton(mode_frame, text="Reflink Only", variable=self.link_mode_var, value="reflink", bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Radiobutton(mode_frame, text="Hardlink", variable=self.link_mode_var, value="hardlink", bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Label(frame, text="Hardlinked files share one copy: editing one changes them all.", wraplength=300).grid(row=4, column=0, columnspan=3, sticky="w", padx=5, pady=10)
+
+    def validate(self) -> tuple[bool, str]:
+        """Validates the inputs for the action."""
+        if not self.source_folder_var.get() or not os.path.isdir(self.source_folder_var.get()):
+            return False, "A valid Source Folder is required."
+        if self.link_mode_var.get() not in LINK_MODES:
+            return False, "Please select a link type."
+        return True, ""
+
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'recursive': self.recursive_var.get(),
+            'link_mode': self.link_mode_var.get(),
+            'dry_run': self.dry_run_var.get(),
+        }
+
+    def confirm(self) -> bool:
+        """Asks the user to confirm before files are replaced by links."""
+        if self.dry_run_var.get():
+            return True
+        return self.ask_yes_no(
+            "Duplicate files will be replaced by links to a single copy.\n\n"
+            "Are you sure you want to continue?",
+            "Confirm Deduplicate",
+            "Deduplicate cancelled by user."
+        )
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        """
+        Finds files with identical content, then links every duplicate to the
+        first copy of its group on the same device. Each duplicate is compared
+        byte for byte with that copy right before it is replaced.
+        """
+        source_folder = params['source_folder']
+        is_dry_run = params['dry_run']
+        log = context.log
+        log(f"--- Starting Deduplicate Action {'(Dry Run)' if is_dry_run else ''} ---")
+        # Empty files have nothing to reclaim.
+        entries = [entry for entry in scan_files(source_folder, params['recursive'], workers=params['scan_workers']) if entry.size]
+        result.scanned_count = len(entries)
+
+        def on_error(path, error):
+            log(f"ERROR reading '{path}': {error}")
+            result.add_failure(path, error)
+
+        cache = HashCache(params['hash_cache_path'] or None) if params['use_hash_cache'] else None
+        try:
+            finder = DuplicateFinder(workers=params['hash_workers'], log=log, on_error=on_error, cache=cache,
+                                     should_stop=lambda: cls.check_cancelled(context, result))
+            groups = finder.find(entries, METHOD_SIZE_HASH)
+        finally:
+            if cache is not None:
+                cache.close()
+        if result.cancelled:
+            return
+        links = cls._plan_links(groups.values(), log, result)
+        if not links:
+            log("No duplicates to link.")
+            return
+
+        reclaimed = 0
+        log_path = os.path.join(source_folder, 'file_name_change_log.csv')
+        if is_dry_run:
+            for keep, duplicate, size in links:
+                log(f"DRY RUN: Would link '{os.path.relpath(duplicate, source_folder)}' to '{os.path.relpath(keep, source_folder)}'")
+                result.add_success(duplicate, keep)
+                reclaimed += size
+        else:
+            with ChangeJournal(log_path, 'dedupe', params, durability=params['journal_durability'], log=log) as journal:
+                for done, (keep, duplicate, size) in enumerate(links, 1):
+                    if cls.check_cancelled(context, result):
+                        break
+                    context.report_progress(done, len(links))
+                    try:
+                        if not filecmp.cmp(keep, duplicate, shallow=False):
+                            raise ValueError("Contents changed since the scan.")
+                        kind = link_duplicate(keep, duplicate, params['link_mode'])
+                    except (OSError, ValueError) as e:
+                        log(f"ERROR linking '{duplicate}': {e}")
+                        journal.record(duplicate, keep, f'failure - {e}', cls.ACTION_TYPE)
+                        result.add_failure(duplicate, e)
+                        continue
+                    journal.record(duplicate, keep, 'success', cls.ACTION_TYPE, kind)
+                    log(f"SUCCESS: Linked '{os.path.relpath(duplicate, source_folder)}' to '{os.path.relpath(keep, source_folder)}' ({kind})")
+                    result.add_success(duplicate, keep)
+                    reclaimed += size
+        result.data['reclaimed_bytes'] = reclaimed
+        log(f"\n--- Deduplicate Complete: {reclaimed} bytes {'would be ' if is_dry_run else ''}reclaimed ---")
+
+    @staticmethod
+    def _plan_links(groups, log, result):
+        """
+        Returns (kept path, duplicate path, size) for each file to link. The
+        first path of a group on each device is kept; symlinks and files
+        already linked to the kept copy are skipped.
+        """
+        links = []
+        for paths in groups:
+            kept = {}
+            for path in paths:
+                try:
+                    st = os.lstat(path)
+                except OSError as e:
+                    result.add_failure(path, e)
+                    continue
+                if stat.S_ISLNK(st.st_mode):
+                    result.add_skip()
+                    continue
+                keep = kept.setdefault(st.st_dev, (path, st.st_ino))
+                if keep[0] == path:
+                    continue
+                if keep[1] == st.st_ino:
+                    log(f"SKIPPING: '{path}' is already linked to '{keep[0]}'.")
+                    result.add_skip()
+                    continue
+                links.append((keep[0], path, st.st_size))
+        return links
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        elif not result.success_count and not result.failure_count:
+            Messagebox.show_info("No duplicate files were found to link.", "No Duplicates Found")
+        else:
+            reclaimed_mb = result.data.get('reclaimed_bytes', 0) / (1024 * 1024)
+            Messagebox.show_info(f"Files linked: {result.success_count}\nFailures: {result.failure_count}\nSpace reclaimed: {reclaimed_mb:.1f} MB", "Deduplicate Complete")
+
+    def _browse_folder(self):
+        path = filedialog.askdirectory(title="Select Source Folder")
+        if path:
+            self.source_folder_var.set(path)
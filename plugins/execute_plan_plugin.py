@@ -0,0 +1,128 @@
+import os
+import tkinter as tk
+from tkinter import filedialog
+import ttkbootstrap as ttk
+from ttkbootstrap.dialogs import Messagebox
+
+from core.headless import load_plugin_class
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import plan_moves, execute_plan
+from core.saved_plan import SavedPlan, PlanFileError, fingerprint, list_plans, default_plan_dir
+
+class ExecutePlanPlugin(HeadlessActionPlugin):
+    """
+    A plugin to run a plan saved by a dry run (Organize, Rename, Replace,
+    Collapse, Search & Organize or Rename Prefix) without scanning or
+    recomputing anything. Each file is only checked against the size and
+    modification time it had when the plan was made.
+    """
+    CHANGED = "The file changed or disappeared since the plan was made."
+
+    default_params = {
+        'plan_file': '',
+        'journal_durability': 'none',
+        'move_workers': 1,
+    }
+
+    def __init__(self, app_context):
+        self.app = app_context
+        self.plan_file_var = tk.StringVar()
+
+    def get_name(self) -> str:
+        return "Execute Saved Plan"
+
+    def get_value(self) -> str:
+        return "execute_plan"
+
+    def is_rollbackable(self) -> bool:
+        return True
+
+    def create_gui(self, master) -> None:
+        """Creates the UI for the Execute Saved Plan action."""
+        frame = ttk.LabelFrame(master, text="Execute Saved Plan Options", padding=10)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        frame.columnconfigure(1, weight=1)
+        ttk.Label(frame, text="Plan File:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        plan_combo = ttk.Combobox(frame, textvariable=self.plan_file_var)
+        plan_combo.configure(postcommand=lambda: plan_combo.configure(values=list_plans()))
+        plan_combo.grid(row=0, column=1, sticky="ew", padx=5)
+        ttk.Button(frame, text="Browse...", command=self._browse_plan, bootstyle="outline").grid(row=0, column=2, padx=5)
+        ttk.Label(frame, text="Every dry run saves its plan. Files changed since the dry run are skipped.", wraplength=300).grid(row=1, column=0, columnspan=3, sticky="w", padx=5, pady=10)
+
+    def validate(self) -> tuple[bool, str]:
+        """Validates the inputs for the action."""
+        try:
+            SavedPlan(self.plan_file_var.get())
+        except PlanFileError as e:
+            return False, str(e)
+        return True, ""
+
+    def get_params(self) -> dict:
+        return {'plan_file': self.plan_file_var.get()}
+
+    def confirm(self) -> bool:
+        """Shows what the plan will do and asks the user to confirm."""
+        saved = SavedPlan(self.plan_file_var.get())
+        return self.ask_yes_no(
+            f"Run the saved {saved.action} plan from {saved.header['created']}?\n\n"
+            f"Moves: {saved.summary['moves']}\nChange log: {saved.header['log_path']}",
+            "Confirm Saved Plan",
+            "Saved plan cancelled by user."
+        )
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        """Re-checks each planned file's fingerprint, then runs the plan's moves."""
+        log = context.log
+        try:
+            saved = SavedPlan(params['plan_file'])
+        except PlanFileError as e:
+            log(f"[ERROR] {e}")
+            result.error = str(e)
+            return
+        header, summary = saved.header, saved.summary
+        log(f"--- Executing Saved {header['action']} Plan ({summary['moves']} moves, made {header['created']}) ---")
+        if summary['conflicts']:
+            log(f"{summary['conflicts']} move(s) were already rejected when the plan was made.")
+
+        moves = []
+        for src, dst, size, mtime_ns in saved.moves():
+            result.scanned_count += 1
+            if fingerprint(src) != (size, mtime_ns):
+                log(f"SKIPPING: '{src}'. {cls.CHANGED}")
+                result.add_failure(src, cls.CHANGED)
+                continue
+            moves.append((src, dst))
+
+        # Targets are checked again: something may have been created there since.
+        plan = plan_moves(moves)
+        with ChangeJournal(header['log_path'], header['action'], header['params'], durability=params['journal_durability'], log=log) as journal:
+            execute_plan(plan, journal, header['action'], context, result,
+                         lambda old, new: f"SUCCESS: Moved '{old}' to '{new}'",
+                         lambda: cls.check_cancelled(context, result), workers=params['move_workers'])
+        if not result.cancelled:
+            plugin_class = cls._plugin_class(header['action'])
+            if plugin_class is not None:
+                plugin_class.finish_plan({**plugin_class.default_params, **header['params']}, context, result)
+        log(f"\n--- Saved Plan Complete ---")
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(result.error, "Error")
+        else:
+            Messagebox.show_info(f"Files moved: {result.success_count}\nFailed or changed since the plan: {result.failure_count}", "Saved Plan Complete")
+
+    @staticmethod
+    def _plugin_class(action):
+        """The plugin that made the plan, for its `finish_plan` step; None if it cannot be loaded."""
+        try:
+            return load_plugin_class(action)
+        except (ImportError, LookupError):
+            return None
+
+    def _browse_plan(self):
+        path = filedialog.askopenfilename(title="Select Saved Plan", initialdir=default_plan_dir(),
+                                          filetypes=[("Saved Plans", "*.jsonl"), ("All Files", "*.*")])
+        if path:
+            self.plan_file_var.set(path)
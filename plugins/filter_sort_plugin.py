@@ -8,13 +8,31 @@ import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 from ttkbootstrap.widgets import DateEntry
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.scanner import scan_files
+from core.file_index import scan_with_index
 
-class FilterSortPlugin(ActionPlugin):
+class FilterSortPlugin(HeadlessActionPlugin):
     """
     A plugin to find and list files based on multiple criteria (name, size, date)
     and sort the results into a CSV report.
     """
+    # 'filter_date' is a date or a 'YYYY-MM-DD' string; None disables the date filter.
+    default_params = {
+        'source_folder': '',
+        'recursive': True,
+        'filter_name': '*.*',
+        'filter_size_op': '>',
+        'filter_size_kb': 0,
+        'filter_date_op': 'after',
+        'filter_date': None,
+        'sort_by': 'name',
+        'sort_order': 'asc',
+        'use_index': False,
+        'index_path': '',
+        'scan_workers': 1,
+    }
+
     def __init__(self, app_context):
         self.app = app_context
         
@@ -27,6 +45,7 @@ class FilterSortPlugin(ActionPlugin):
         self.filter_date_op_var = tk.StringVar(value="after")
         self.sort_by_var = tk.StringVar(value="name")
         self.sort_order_var = tk.StringVar(value="asc")
+        self.use_index_var = tk.BooleanVar(value=False)
 
     def get_name(self) -> str:
         return "Filter & Sort"
@@ -69,6 +88,7 @@ class FilterSortPlugin(ActionPlugin):
         ttk.Label(sort_group, text="Order:").grid(row=0, column=2, sticky="w", padx=5, pady=2)
         sort_order_combo = ttk.Combobox(sort_group, textvariable=self.sort_order_var, values=["asc", "desc"], width=10, state="readonly")
         sort_order_combo.grid(row=0, column=3, sticky="w", padx=5, pady=2)
+        ttk.Checkbutton(frame, text="Use file index (fast repeat scans of the same folder)", variable=self.use_index_var, bootstyle="round-toggle").grid(row=4, column=0, columnspan=3, sticky="w", padx=5, pady=5)
 
     def validate(self) -> tuple[bool, str]:
         if not self.source_folder_var.get() or not os.path.isdir(self.source_folder_var.get()): return False, "A valid Source Folder is required."
@@ -76,64 +96,83 @@ class FilterSortPlugin(ActionPlugin):
         except tk.TclError: return False, "File size must be a valid number."
         return True, ""
 
-    def execute(self) -> None:
-        self.app.log("--- Starting Filter & Sort Action ---")
-        try:
-            files_to_process = self._collect_files()
-            filtered_files = self._apply_filters(files_to_process)
-            sorted_files = self._sort_files(filtered_files)
-            if not sorted_files:
-                self.app.log("No files matched the specified criteria.")
-                Messagebox.show_info("No Results", "No files were found matching your filter criteria.")
-                return
-            self._write_report(sorted_files)
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'recursive': self.recursive_var.get(),
+            'filter_name': self.filter_name_var.get(),
+            'filter_size_op': self.filter_size_op_var.get(),
+            'filter_size_kb': self.filter_size_var.get(),
+            'filter_date_op': self.filter_date_op_var.get(),
+            'filter_date': self.filter_date_entry.entry.get_date(),
+            'sort_by': self.sort_by_var.get(),
+            'sort_order': self.sort_order_var.get(),
+            'use_index': self.use_index_var.get(),
+        }
 
-    def _collect_files(self):
-        source_folder = self.source_folder_var.get()
-        is_recursive = self.recursive_var.get()
-        file_list = []
-        iterator = os.walk(source_folder) if is_recursive else [(source_folder, [], os.listdir(source_folder))]
-        for root, _, files in iterator:
-            for name in files:
-                path = os.path.join(root, name)
-                if os.path.isfile(path):
-                    try:
-                        stat = os.stat(path)
-                        file_list.append({'path': path, 'name': name, 'size': stat.st_size, 'mtime': stat.st_mtime})
-                    except OSError: continue
-        return file_list
-        
-    def _apply_filters(self, files):
-        name_pattern = self.filter_name_var.get()
-        size_op = self.filter_size_op_var.get()
-        size_bytes = self.filter_size_var.get() * 1024
-        date_op = self.filter_date_op_var.get()
-        filter_date = self.filter_date_entry.entry.get_date()
-        filter_timestamp = datetime.combine(filter_date, datetime.min.time()).timestamp()
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        log = context.log
+        log("--- Starting Filter & Sort Action ---")
+        if params['use_index']:
+            files_to_process = scan_with_index(params['source_folder'], params['recursive'], params['index_path'] or None, log)
+        else:
+            files_to_process = list(scan_files(params['source_folder'], params['recursive'], workers=params['scan_workers'],
+                                               ordered=False, prefetch_stat=True))
+        result.scanned_count = len(files_to_process)
+        if cls.check_cancelled(context, result):
+            return
+        filtered_files = cls._apply_filters(files_to_process, params)
+        sorted_files = cls._sort_files(filtered_files, params['sort_by'], params['sort_order'])
+        if not sorted_files:
+            log("No files matched the specified criteria.")
+            return
+        result.success_count = len(sorted_files)
+        result.outputs.append(cls._write_report(sorted_files, params['source_folder'], log))
+
+    def show_result(self, result) -> None:
+        if result.error:
+            return
+        if not result.outputs:
+            Messagebox.show_info("No Results", "No files were found matching your filter criteria.")
+        else:
+            Messagebox.show_info("Report Generated", f"Filtered results have been saved as:\n{os.path.basename(result.outputs[0])}")
+
+    @staticmethod
+    def _apply_filters(files, params):
+        name_pattern = params['filter_name']
+        size_op = params['filter_size_op']
+        size_bytes = int(params['filter_size_kb']) * 1024
+        date_op = params['filter_date_op']
+        filter_date = params['filter_date']
+        if isinstance(filter_date, str):
+            filter_date = datetime.strptime(filter_date, "%Y-%m-%d").date()
+        filter_timestamp = datetime.combine(filter_date, datetime.min.time()).timestamp() if filter_date else None
         results = []
         for file_info in files:
-            if not fnmatch.fnmatch(file_info['name'], name_pattern): continue
+            if not fnmatch.fnmatch(file_info.name, name_pattern): continue
+            try:
+                file_size, file_mtime = file_info.size, file_info.mtime
+            except OSError: continue
             if size_bytes > 0:
-                if size_op == '>' and not file_info['size'] > size_bytes: continue
-                if size_op == '<' and not file_info['size'] < size_bytes: continue
-                if size_op == '==' and not file_info['size'] == size_bytes: continue
-            if date_op == 'after' and not file_info['mtime'] > filter_timestamp: continue
-            if date_op == 'before' and not file_info['mtime'] < filter_timestamp: continue
+                if size_op == '>' and not file_size > size_bytes: continue
+                if size_op == '<' and not file_size < size_bytes: continue
+                if size_op == '==' and not file_size == size_bytes: continue
+            if filter_timestamp is not None:
+                if date_op == 'after' and not file_mtime > filter_timestamp: continue
+                if date_op == 'before' and not file_mtime < filter_timestamp: continue
             results.append(file_info)
         return results
 
-    def _sort_files(self, files):
-        sort_key = self.sort_by_var.get()
-        sort_order = self.sort_order_var.get()
-        if sort_key == 'name': key_func = lambda x: x['name']
-        elif sort_key == 'size': key_func = lambda x: x['size']
-        else: key_func = lambda x: x['mtime']
+    @staticmethod
+    def _sort_files(files, sort_key, sort_order):
+        if sort_key == 'name': key_func = lambda x: x.name
+        elif sort_key == 'size': key_func = lambda x: x.size
+        else: key_func = lambda x: x.mtime
         return sorted(files, key=key_func, reverse=(sort_order == 'desc'))
 
-    def _write_report(self, files):
-        source_folder = self.source_folder_var.get()
+    @staticmethod
+    def _write_report(files, source_folder, log):
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         output_filename = f"filtered_results_{timestamp}.csv"
         output_path = os.path.join(source_folder, output_filename)
@@ -141,9 +180,9 @@ class FilterSortPlugin(ActionPlugin):
             writer = csv.writer(f)
             writer.writerow(['filename', 'full_path', 'size_kb', 'modified_date'])
             for file_info in files:
-                writer.writerow([file_info['name'], file_info['path'], f"{file_info['size'] / 1024:.2f}", datetime.fromtimestamp(file_info['mtime']).strftime('%Y-%m-%d %H:%M:%S')])
-        self.app.log(f"Successfully generated filter/sort report: {output_filename}")
-        Messagebox.show_info("Report Generated", f"Filtered results have been saved as:\n{output_filename}")
+                writer.writerow([file_info.name, file_info.path, f"{file_info.size / 1024:.2f}", datetime.fromtimestamp(file_info.mtime).strftime('%Y-%m-%d %H:%M:%S')])
+        log(f"Successfully generated filter/sort report: {output_filename}")
+        return output_path
 
     def _browse_folder(self):
         path = filedialog.askdirectory(title="Select Source Folder")
@@ -0,0 +1,221 @@
+import os
+import csv
+import tkinter as tk
+from tkinter import filedialog
+import ttkbootstrap as ttk
+from ttkbootstrap.dialogs import Messagebox
+
+from core.interfaces import HeadlessActionPlugin
+from core.scanner import scan_files
+from core.duplicate_finder import DuplicateFinder, METHODS, METHOD_SIZE_HASH
+from core.hash_cache import HashCache
+from core.corpus_index import CorpusIndex
+from core.name_similarity import find_similar_names, DEFAULT_SIMILARITY
+
+class FindDuplicatesPlugin(HeadlessActionPlugin):
+    """
+    A plugin to find duplicate files in a folder, either by size and name,
+    by size and content hash or by similar names, or to find which files in
+    a folder are already in an indexed reference folder (e.g. an archive).
+    Nothing is changed; the groups found are shown in a window and can be
+    exported as CSV.
+    """
+    METHOD_KNOWN = 'known'
+    METHOD_FUZZY_NAME = 'fuzzy_name'
+
+    default_params = {
+        'source_folder': '',
+        'recursive': True,
+        'method': METHOD_SIZE_HASH,
+        'scan_workers': 1,
+        'hash_workers': 4,
+        'use_hash_cache': False,
+        'hash_cache_path': '',
+        'reference_folder': '',
+        'refresh_reference': False,
+        'corpus_index_path': '',
+        'name_similarity': DEFAULT_SIMILARITY,
+    }
+
+    def __init__(self, app_context):
+        self.app = app_context
+
+        # UI Variables
+        self.source_folder_var = tk.StringVar()
+        self.recursive_var = tk.BooleanVar(value=True)
+        self.method_var = tk.StringVar(value=METHOD_SIZE_HASH)
+        self.use_hash_cache_var = tk.BooleanVar(value=False)
+        self.reference_folder_var = tk.StringVar()
+        self.refresh_reference_var = tk.BooleanVar(value=False)
+        self.name_similarity_var = tk.IntVar(value=DEFAULT_SIMILARITY)
+
+    def get_name(self) -> str:
+        return "Find Duplicates"
+
+    def get_value(self) -> str:
+        return "find_duplicates"
+
+    def is_rollbackable(self) -> bool:
+        return False
+
+    def create_gui(self, master) -> None:
+        """Creates the UI for the Find Duplicates action."""
+        frame = ttk.LabelFrame(master, text="Find Duplicates Options", padding=10)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        frame.columnconfigure(1, weight=1)
+        ttk.Label(frame, text="Source Folder:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(frame, textvariable=self.source_folder_var).grid(row=0, column=1, sticky="ew", padx=5)
+        ttk.Button(frame, text="Browse...", command=self._browse_folder, bootstyle="outline").grid(row=0, column=2, padx=5)
+        ttk.Checkbutton(frame, text="Include Subfolders (Recursive)", variable=self.recursive_var, bootstyle="round-toggle").grid(row=1, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        method_frame = ttk.Frame(frame)
+        method_frame.grid(row=2, column=0, columnspan=3, sticky="w", padx=5, pady=(10,5))
+        ttk.Label(method_frame, text="Match By:").pack(side="left")
+        ttk.Radiobutton(method_frame, text="Size & Name", variable=self.method_var, value="size_name", bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Radiobutton(method_frame, text="Size & Content Hash", variable=self.method_var, value="size_hash", bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Radiobutton(method_frame, text="Already in Reference Folder", variable=self.method_var, value=self.METHOD_KNOWN, bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Radiobutton(method_frame, text="Similar Names", variable=self.method_var, value=self.METHOD_FUZZY_NAME, bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Checkbutton(frame, text="Remember file hashes (fast repeat scans of unchanged files)", variable=self.use_hash_cache_var, bootstyle="round-toggle").grid(row=3, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        ttk.Label(frame, text="Reference Folder:").grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(frame, textvariable=self.reference_folder_var).grid(row=4, column=1, sticky="ew", padx=5)
+        ttk.Button(frame, text="Browse...", command=self._browse_reference, bootstyle="outline").grid(row=4, column=2, padx=5)
+        ttk.Checkbutton(frame, text="Re-index the reference folder before checking", variable=self.refresh_reference_var, bootstyle="round-toggle").grid(row=5, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        ttk.Label(frame, text="Name similarity (%):").grid(row=6, column=0, sticky="w", padx=5, pady=5)
+        ttk.Spinbox(frame, from_=50, to=100, textvariable=self.name_similarity_var, width=5).grid(row=6, column=1, sticky="w", padx=5)
+
+    def validate(self) -> tuple[bool, str]:
+        """Validates the inputs for the action."""
+        if not self.source_folder_var.get() or not os.path.isdir(self.source_folder_var.get()):
+            return False, "A valid Source Folder is required."
+        if self.method_var.get() not in METHODS + (self.METHOD_KNOWN, self.METHOD_FUZZY_NAME):
+            return False, "Please select a duplicate detection method."
+        if self.method_var.get() == self.METHOD_KNOWN and not os.path.isdir(self.reference_folder_var.get()):
+            return False, "A valid Reference Folder is required."
+        if self.method_var.get() == self.METHOD_FUZZY_NAME:
+            try:
+                similarity = self.name_similarity_var.get()
+            except tk.TclError:
+                similarity = None
+            if similarity is None or not 1 <= similarity <= 100:
+                return False, "Name similarity must be a whole number from 1 to 100."
+        return True, ""
+
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'recursive': self.recursive_var.get(),
+            'method': self.method_var.get(),
+            'use_hash_cache': self.use_hash_cache_var.get(),
+            'reference_folder': self.reference_folder_var.get(),
+            'refresh_reference': self.refresh_reference_var.get(),
+            'name_similarity': self.name_similarity_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        """
+        Groups the files under the source folder that are duplicates of each
+        other. Same-size files are compared by a hash of their first and last
+        blocks, and only files that still match are hashed in full.
+        """
+        log = context.log
+        log("--- Starting Find Duplicates Action ---")
+        entries = list(scan_files(params['source_folder'], params['recursive'], workers=params['scan_workers']))
+        result.scanned_count = len(entries)
+        if cls.check_cancelled(context, result):
+            return
+
+        def on_error(path, error):
+            log(f"ERROR reading '{path}': {error}")
+            result.add_failure(path, error)
+
+        should_stop = lambda: cls.check_cancelled(context, result)
+        if params['method'] == cls.METHOD_KNOWN:
+            groups = cls._find_known(params, entries, log, on_error, should_stop)
+        elif params['method'] == cls.METHOD_FUZZY_NAME:
+            groups = find_similar_names(entries, params['name_similarity'], log=log)
+        else:
+            cache = HashCache(params['hash_cache_path'] or None) if params['use_hash_cache'] else None
+            try:
+                finder = DuplicateFinder(workers=params['hash_workers'], log=log, on_error=on_error, cache=cache,
+                                         should_stop=should_stop)
+                groups = finder.find(entries, params['method'])
+            finally:
+                if cache is not None:
+                    cache.close()
+        if result.cancelled:
+            return
+        result.data['duplicates'] = groups
+        result.success_count = sum(len(paths) for paths in groups.values())
+        context.report_progress(result.scanned_count, result.scanned_count)
+        log(f"Found {len(groups)} duplicate group(s) covering {result.success_count} file(s).")
+        log("\n--- Find Duplicates Complete ---")
+
+    @staticmethod
+    def _find_known(params, entries, log, on_error, should_stop):
+        """
+        Checks the scanned files against the reference folder's corpus index,
+        indexing the reference folder first if asked to or if it never was.
+        """
+        reference_folder = params['reference_folder']
+        if not reference_folder:
+            raise ValueError("A reference folder is required to check for files already in it.")
+        with CorpusIndex(params['corpus_index_path'] or None) as index:
+            if params['refresh_reference'] or not index.has_root(reference_folder):
+                log(f"Indexing reference folder '{reference_folder}'...")
+                stats = index.refresh(reference_folder, workers=params['hash_workers'], scan_workers=params['scan_workers'],
+                                      should_stop=should_stop, on_error=on_error)
+                log(f"Reference index: {stats['hashed']} file(s) hashed, {stats['reused']} unchanged, {stats['removed']} removed.")
+            return index.find_known(reference_folder, entries, workers=params['hash_workers'], should_stop=should_stop,
+                                    on_error=on_error, log=log)
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        elif result.cancelled:
+            return
+        elif not result.data.get('duplicates'):
+            Messagebox.show_info("No duplicate files were found.", "No Duplicates Found")
+        else:
+            self._show_results_window(result.data['duplicates'])
+
+    def _show_results_window(self, groups):
+        """Lists each duplicate group and its files, with an option to export them as CSV."""
+        window = ttk.Toplevel(title="Duplicate Files")
+        window.geometry("800x500")
+        tree = ttk.Treeview(window, columns=("path",), show="tree headings")
+        tree.heading("#0", text="Group")
+        tree.heading("path", text="File")
+        tree.column("#0", width=220, stretch=False)
+        for index, (key, paths) in enumerate(groups.items(), 1):
+            group = tree.insert("", tk.END, text=f"Group {index} ({len(paths)} files)", open=True)
+            for path in paths:
+                tree.insert(group, tk.END, values=(path,))
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        button_frame = ttk.Frame(window, padding=5)
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Button(button_frame, text="Export CSV...", command=lambda: self._export_csv(groups), bootstyle="outline").pack(side=tk.RIGHT, padx=5)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+
+    def _export_csv(self, groups):
+        path = filedialog.asksaveasfilename(title="Export Duplicates", defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+        if not path:
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['group', 'key', 'path'])
+            for index, (key, paths) in enumerate(groups.items(), 1):
+                for file_path in paths:
+                    writer.writerow([index, key, file_path])
+        self.app.log(f"Duplicate list exported to '{path}'.")
+
+    def _browse_reference(self):
+        path = filedialog.askdirectory(title="Select Reference Folder")
+        if path:
+            self.reference_folder_var.set(path)
+
+    def _browse_folder(self):
+        path = filedialog.askdirectory(title="Select Source Folder")
+        if path:
+            self.source_folder_var.set(path)
@@ -6,13 +6,26 @@ from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.scanner import scan_files
+from core.file_index import scan_with_index
 
-class ListFilesPlugin(ActionPlugin):
+class ListFilesPlugin(HeadlessActionPlugin):
     """
     A plugin to generate a .txt or .csv report of files in a directory,
     with various formatting options.
     """
+    default_params = {
+        'source_folder': '',
+        'recursive': True,
+        'prepend_path': False,
+        'full_path': False,
+        'output_format': 'txt',
+        'use_index': False,
+        'index_path': '',
+        'scan_workers': 1,
+    }
+
     def __init__(self, app_context):
         self.app = app_context
         
@@ -22,6 +35,7 @@ class ListFilesPlugin(ActionPlugin):
         self.prepend_path_var = tk.BooleanVar(value=False)
         self.full_path_var = tk.BooleanVar(value=False)
         self.output_format_var = tk.StringVar(value="txt")
+        self.use_index_var = tk.BooleanVar(value=False)
 
     def get_name(self) -> str:
         return "List Files"
@@ -47,55 +61,70 @@ class ListFilesPlugin(ActionPlugin):
         ttk.Label(format_frame, text="Output Format:").pack(side="left")
         ttk.Radiobutton(format_frame, text="Plain Text (.txt)", variable=self.output_format_var, value="txt", bootstyle="toolbutton").pack(side="left", padx=5)
         ttk.Radiobutton(format_frame, text="CSV (.csv)", variable=self.output_format_var, value="csv", bootstyle="toolbutton").pack(side="left", padx=5)
+        ttk.Checkbutton(frame, text="Use file index (fast repeat scans of the same folder)", variable=self.use_index_var, bootstyle="round-toggle").grid(row=5, column=0, columnspan=3, sticky="w", padx=5, pady=5)
 
     def validate(self) -> tuple[bool, str]:
         if not self.source_folder_var.get() or not os.path.isdir(self.source_folder_var.get()):
             return False, "A valid Source Folder is required."
         return True, ""
 
-    def execute(self) -> None:
-        source_folder = self.source_folder_var.get()
-        is_recursive = self.recursive_var.get()
-        prepend_path = self.prepend_path_var.get()
-        full_path = self.full_path_var.get()
-        output_format = self.output_format_var.get()
-        self.app.log("--- Starting List Files Action ---")
-        try:
-            file_list = []
-            if is_recursive:
-                for root, _, files in os.walk(source_folder):
-                    for filename in files:
-                        file_list.append((os.path.join(root, filename), root))
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'recursive': self.recursive_var.get(),
+            'prepend_path': self.prepend_path_var.get(),
+            'full_path': self.full_path_var.get(),
+            'output_format': self.output_format_var.get(),
+            'use_index': self.use_index_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        source_folder = params['source_folder']
+        is_recursive = params['recursive']
+        prepend_path = params['prepend_path']
+        full_path = params['full_path']
+        output_format = params['output_format']
+        log = context.log
+        log("--- Starting List Files Action ---")
+        if params['use_index']:
+            file_list = scan_with_index(source_folder, is_recursive, params['index_path'] or None, log)
+        else:
+            file_list = list(scan_files(source_folder, is_recursive, workers=params['scan_workers'],
+                                        prefetch_stat=output_format == 'csv'))
+        result.scanned_count = len(file_list)
+        if cls.check_cancelled(context, result):
+            return
+        if not file_list:
+            log("No files found to list.")
+            return
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output_filename = f"file_list_{timestamp}.{output_format}"
+        output_path = os.path.join(source_folder, output_filename)
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            if output_format == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(['filename', 'subfolder', 'full_path', 'size_bytes', 'modified_date'])
+                for entry in file_list:
+                    row = cls._format_file_info(entry.path, entry.root, source_folder, prepend_path, full_path)
+                    writer.writerow([row, os.path.relpath(entry.root, source_folder), entry.path, entry.size, datetime.fromtimestamp(entry.mtime).isoformat()])
             else:
-                for filename in os.listdir(source_folder):
-                    path = os.path.join(source_folder, filename)
-                    if os.path.isfile(path):
-                        file_list.append((path, source_folder))
-            if not file_list:
-                self.app.log("No files found to list.")
-                Messagebox.show_info("No Files", "No files were found in the source directory.")
-                return
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            output_filename = f"file_list_{timestamp}.{output_format}"
-            output_path = os.path.join(source_folder, output_filename)
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                if output_format == 'csv':
-                    writer = csv.writer(f)
-                    writer.writerow(['filename', 'subfolder', 'full_path', 'size_bytes', 'modified_date'])
-                    for filepath, root in file_list:
-                        stat = os.stat(filepath)
-                        row = self._format_file_info(filepath, root, source_folder, prepend_path, full_path)
-                        writer.writerow([row, os.path.relpath(root, source_folder), filepath, stat.st_size, datetime.fromtimestamp(stat.st_mtime).isoformat()])
-                else:
-                    for filepath, root in file_list:
-                        f.write(self._format_file_info(filepath, root, source_folder, prepend_path, full_path) + '\n')
-            self.app.log(f"Successfully generated file list: {output_filename}")
-            Messagebox.show_info("List Generated", f"File list has been saved as:\n{output_filename}")
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-            Messagebox.show_error(f"An unexpected error occurred: {e}", "Critical Error")
+                for entry in file_list:
+                    f.write(cls._format_file_info(entry.path, entry.root, source_folder, prepend_path, full_path) + '\n')
+        result.success_count = len(file_list)
+        result.outputs.append(output_path)
+        log(f"Successfully generated file list: {output_filename}")
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        elif not result.outputs:
+            Messagebox.show_info("No Files", "No files were found in the source directory.")
+        else:
+            Messagebox.show_info("List Generated", f"File list has been saved as:\n{os.path.basename(result.outputs[0])}")
             
-    def _format_file_info(self, filepath, root, source_folder, prepend, full):
+    @staticmethod
+    def _format_file_info(filepath, root, source_folder, prepend, full):
         filename = os.path.basename(filepath)
         if full:
             return filepath
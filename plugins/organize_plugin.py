@@ -1,19 +1,32 @@
 import os
-import csv
-import shutil
 import tkinter as tk
 from tkinter import filedialog
-from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import plan_moves, execute_plan, preview_plan
+from core.saved_plan import PlanWriter
+from core.scanner import scan_files
 
-class OrganizePlugin(ActionPlugin):
+class OrganizePlugin(HeadlessActionPlugin):
     """
     A plugin for organizing files into a folder structure
     based on a delimiter in their names.
     """
+    default_params = {
+        'source_folder': '',
+        'output_folder': '',
+        'delimiter': '-',
+        'recursive': True,
+        'dry_run': False,
+        'journal_durability': 'none',
+        'move_workers': 1,
+        'plan_file': '',
+        'scan_workers': 1,
+    }
+
     def __init__(self, app_context):
         self.app = app_context
         self.source_folder_var = tk.StringVar()
@@ -55,76 +68,61 @@ class OrganizePlugin(ActionPlugin):
             return False, "A Delimiter is required."
         return True, ""
 
-    def execute(self) -> None:
-        source_folder = self.source_folder_var.get()
-        output_folder = self.output_folder_var.get()
-        delimiter = self.delimiter_var.get()
-        is_recursive = self.recursive_var.get()
-        is_dry_run = self.dry_run_var.get()
-        self.app.log(f"--- Starting Organize Action {'(Dry Run)' if is_dry_run else ''} ---")
-        try:
-            files_to_process = self._collect_files(source_folder, is_recursive)
-            if not files_to_process:
-                self.app.log("No files found to organize.")
-                Messagebox.show_info("No Files", "No files were found in the source directory.")
-                return
-            log_path = os.path.join(source_folder, 'file_name_change_log.csv')
-            success_count, failure_count = 0, 0
-            for filepath in files_to_process:
-                filename = os.path.basename(filepath)
-                name_parts = os.path.splitext(filename)[0].split(delimiter)
-                if len(name_parts) > 1:
-                    dest_subdirs = name_parts[:-1]
-                    new_filename = name_parts[-1] + os.path.splitext(filename)[1]
-                    dest_dir_path = os.path.join(output_folder, *dest_subdirs)
-                    dest_file_path = os.path.join(dest_dir_path, new_filename)
-                    if is_dry_run:
-                        self.app.log(f"DRY RUN: Would move '{filename}' to '{os.path.relpath(dest_file_path, output_folder)}'")
-                        success_count += 1
-                    else:
-                        try:
-                            os.makedirs(dest_dir_path, exist_ok=True)
-                            shutil.move(filepath, dest_file_path)
-                            self.app.log(f"SUCCESS: Moved '{filename}' to '{os.path.relpath(dest_dir_path, output_folder)}'")
-                            self._log_action(log_path, filepath, dest_file_path, 'success', 'organize')
-                            success_count += 1
-                        except Exception as e:
-                            self.app.log(f"FAILURE moving '{filename}'. Reason: {e}")
-                            self._log_action(log_path, filepath, dest_file_path, f'failure - {e}', 'organize')
-                            failure_count += 1
-                else:
-                    self.app.log(f"SKIPPING '{filename}': No delimiter found.")
-            self.app.log(f"\n--- Organize Complete ---")
-            self.app.log(f"Successful: {success_count} | Failed: {failure_count}")
-            Messagebox.show_info("Organize Complete", f"Moved: {success_count}\nFailed/Skipped: {failure_count}")
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-            Messagebox.show_error(f"An unexpected error occurred: {e}", "Critical Error")
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'output_folder': self.output_folder_var.get(),
+            'delimiter': self.delimiter_var.get(),
+            'recursive': self.recursive_var.get(),
+            'dry_run': self.dry_run_var.get(),
+        }
 
-    def _collect_files(self, source_folder, is_recursive):
-        file_list = []
-        if is_recursive:
-            for root, _, files in os.walk(source_folder):
-                for name in files:
-                    file_list.append(os.path.join(root, name))
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        source_folder = params['source_folder']
+        output_folder = params['output_folder'] or source_folder
+        delimiter = params['delimiter']
+        is_dry_run = params['dry_run']
+        log = context.log
+        log(f"--- Starting Organize Action {'(Dry Run)' if is_dry_run else ''} ---")
+        files_to_process = [entry.path for entry in scan_files(source_folder, params['recursive'], workers=params['scan_workers'])]
+        result.scanned_count = len(files_to_process)
+        if not files_to_process:
+            log("No files found to organize.")
+            return
+        moves = []
+        for filepath in files_to_process:
+            filename = os.path.basename(filepath)
+            name_parts = os.path.splitext(filename)[0].split(delimiter)
+            if len(name_parts) > 1:
+                new_filename = name_parts[-1] + os.path.splitext(filename)[1]
+                moves.append((filepath, os.path.join(output_folder, *name_parts[:-1], new_filename)))
+            else:
+                log(f"SKIPPING '{filename}': No delimiter found.")
+                result.add_skip()
+        # Collisions are found for the whole batch before anything moves.
+        plan = plan_moves(moves)
+        log_path = os.path.join(source_folder, 'file_name_change_log.csv')
+        if is_dry_run:
+            with PlanWriter(params['plan_file'], 'organize', log_path, params, log=log, result=result) as saved_plan:
+                preview_plan(plan, log, result,
+                             lambda old, new: f"DRY RUN: Would move '{os.path.basename(old)}' to '{os.path.relpath(new, output_folder)}'",
+                             saved_plan)
         else:
-            for name in os.listdir(source_folder):
-                path = os.path.join(source_folder, name)
-                if os.path.isfile(path):
-                    file_list.append(path)
-        return file_list
+            with ChangeJournal(log_path, 'organize', params, durability=params['journal_durability'], log=log) as journal:
+                execute_plan(plan, journal, 'organize', context, result,
+                             lambda old, new: f"SUCCESS: Moved '{os.path.basename(old)}' to '{os.path.relpath(os.path.dirname(new), output_folder)}'",
+                             lambda: cls.check_cancelled(context, result), workers=params['move_workers'])
+        log(f"\n--- Organize Complete ---")
+        log(f"Successful: {result.success_count} | Failed: {result.failure_count}")
 
-    def _log_action(self, log_path, old_path, new_path, status, action_type):
-        if self.dry_run_var.get(): return
-        file_exists = os.path.exists(log_path)
-        try:
-            with open(log_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(['timestamp', 'old_path', 'new_path', 'status', 'action_type', 'details'])
-                writer.writerow([datetime.now().isoformat(), old_path, new_path, status, action_type, ''])
-        except Exception as e:
-            self.app.log(f"[ERROR] Could not write to log file '{log_path}'. Reason: {e}")
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        elif not result.scanned_count:
+            Messagebox.show_info("No Files", "No files were found in the source directory.")
+        else:
+            Messagebox.show_info("Organize Complete", f"Moved: {result.success_count}\nFailed/Skipped: {result.failure_count}")
 
     def _browse_folder(self, string_var):
         path = filedialog.askdirectory(title="Select Folder")
@@ -1,21 +1,41 @@
 import os
 import csv
-import shutil
 import tkinter as tk
 from tkinter import filedialog
-from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import FolderListings, plan_moves, execute_plan, preview_plan
+from core.saved_plan import PlanWriter
+from core.scanner import scan_files
+
+class RenamePlugin(HeadlessActionPlugin):
+    """
+    A plugin for bulk renaming files based on a CSV mapping. In recursive
+    mode the original names are looked up anywhere below the source folder
+    and each file is renamed in the folder where it was found.
+    """
+
+    CSV_ERROR = "Could not read or process the CSV file."
+
+    default_params = {
+        'source_folder': '',
+        'csv_path': '',
+        'recursive': False,
+        'dry_run': False,
+        'journal_durability': 'none',
+        'move_workers': 1,
+        'plan_file': '',
+        'scan_workers': 1,
+    }
 
-class RenamePlugin(ActionPlugin):
-    """A plugin for bulk renaming files based on a CSV mapping."""
-    
     def __init__(self, app_context):
         self.app = app_context
         self.source_folder_var = tk.StringVar()
         self.csv_path_var = tk.StringVar()
+        self.recursive_var = tk.BooleanVar(value=False)
         self.dry_run_var = tk.BooleanVar(value=False)
 
     def get_name(self) -> str:
@@ -38,6 +58,7 @@ class RenamePlugin(ActionPlugin):
         ttk.Label(frame, text="CSV File:").grid(row=2, column=0, sticky="w", padx=5, pady=5)
         ttk.Entry(frame, textvariable=self.csv_path_var).grid(row=2, column=1, sticky="ew", padx=5)
         ttk.Button(frame, text="Browse...", command=self._browse_csv, bootstyle="outline").grid(row=2, column=2, padx=5)
+        ttk.Checkbutton(frame, text="Find original names in subfolders too", variable=self.recursive_var, bootstyle="round-toggle").grid(row=3, column=0, columnspan=3, sticky='w', padx=5, pady=5)
     
     def validate(self) -> tuple[bool, str]:
         source_folder = self.source_folder_var.get()
@@ -48,70 +69,107 @@ class RenamePlugin(ActionPlugin):
             return False, "A valid CSV File is required."
         return True, ""
 
-    def execute(self) -> None:
-        source_folder = self.source_folder_var.get()
-        csv_path = self.csv_path_var.get()
-        is_dry_run = self.dry_run_var.get()
-        self.app.log(f"--- Starting Rename Action {'(Dry Run)' if is_dry_run else ''} ---")
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'csv_path': self.csv_path_var.get(),
+            'recursive': self.recursive_var.get(),
+            'dry_run': self.dry_run_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        source_folder = params['source_folder']
+        csv_path = params['csv_path']
+        is_dry_run = params['dry_run']
+        log = context.log
+        log(f"--- Starting Rename Action {'(Dry Run)' if is_dry_run else ''} ---")
+        # One listing of the source folder answers every "does it exist?" and is reused for the targets.
+        listings = FolderListings()
+        name_index = cls._build_name_index(source_folder, params['scan_workers']) if params['recursive'] else None
+        moves = []
         try:
-            file_mapping = self._read_csv_mapping(csv_path)
-            if not file_mapping:
-                Messagebox.show_error("Could not read or process the CSV file.", "CSV Error")
-                return
-            log_path = os.path.join(source_folder, 'file_name_change_log.csv')
-            success_count, failure_count = 0, 0
-            for index, row in enumerate(file_mapping):
-                original_name = row.get('original_filename') or row.get('original_file_name')
-                new_name = row.get('new_filename') or row.get('new_file_name')
+            for row_number, original_name, new_name in cls._read_csv_mapping(csv_path):
+                result.scanned_count += 1
                 if not original_name or not new_name:
-                    self.app.log(f"SKIPPING row {index+2}: Missing original or new filename.")
-                    failure_count += 1
+                    log(f"SKIPPING row {row_number}: Missing original or new filename.")
+                    result.add_failure(f"row {row_number}", "Missing original or new filename.")
                     continue
-                original_path = os.path.join(source_folder, original_name)
-                if os.path.exists(original_path):
-                    new_path = os.path.join(source_folder, new_name)
-                    if is_dry_run:
-                        self.app.log(f"DRY RUN: Would rename '{original_name}' to '{new_name}'")
-                        success_count += 1
+                if name_index is not None and os.path.basename(original_name) == original_name:
+                    paths = name_index.get(os.path.normcase(original_name), ())
+                    if len(paths) > 1:
+                        log(f"AMBIGUOUS: '{original_name}' exists in {len(paths)} folders; it was not renamed.")
+                        result.add_failure(original_name, f"Ambiguous name: found in {len(paths)} folders.")
+                    elif paths:
+                        moves.append((paths[0], os.path.join(os.path.dirname(paths[0]), new_name)))
                     else:
-                        try:
-                            shutil.move(original_path, new_path)
-                            self.app.log(f"SUCCESS: Renamed '{original_name}' to '{new_name}'")
-                            self._log_action(log_path, original_path, new_path, 'success', 'rename')
-                            success_count += 1
-                        except Exception as e:
-                            self.app.log(f"FAILURE: Renaming '{original_name}'. Reason: {e}")
-                            self._log_action(log_path, original_path, new_path, f'failure - {e}', 'rename')
-                            failure_count += 1
+                        result.add_failure(os.path.join(source_folder, original_name), "File not found.")
+                    continue
+                original_path = os.path.join(source_folder, original_name)
+                if original_path in listings:
+                    moves.append((original_path, os.path.join(source_folder, new_name)))
                 else:
-                    failure_count += 1
-            self.app.log(f"\n--- Rename Complete ---")
-            Messagebox.show_info("Rename Complete", f"Successful: {success_count}\nFailed: {failure_count}")
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-            Messagebox.show_error(f"An unexpected error occurred: {e}", "Critical Error")
-
-    def _read_csv_mapping(self, csv_path):
-        try:
-            with open(csv_path, mode='r', encoding='utf-8-sig') as infile:
-                reader = csv.DictReader(infile)
-                reader.fieldnames = [name.lower().replace(' ', '_') for name in reader.fieldnames]
-                return list(reader)
-        except Exception as e:
-            self.app.log(f"Error reading CSV file: {e}")
-            return None
-
-    def _log_action(self, log_path, old_path, new_path, status, action_type):
-        if self.dry_run_var.get(): return
-        file_exists = os.path.exists(log_path)
-        try:
-            with open(log_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(['timestamp', 'old_path', 'new_path', 'status', 'action_type', 'details'])
-                writer.writerow([datetime.now().isoformat(), old_path, new_path, status, action_type, ''])
-        except Exception as e:
-            self.app.log(f"[ERROR] Could not write to log file '{log_path}'. Reason: {e}")
+                    result.add_failure(original_path, "File not found.")
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            log(f"Error reading CSV file: {e}")
+            result.error = cls.CSV_ERROR
+            return
+        if not result.scanned_count:
+            result.error = cls.CSV_ERROR
+            return
+        # Duplicate targets, clashes and swaps are resolved for the whole mapping before anything moves.
+        plan = plan_moves(moves, existing=listings)
+        log_path = os.path.join(source_folder, 'file_name_change_log.csv')
+        if is_dry_run:
+            with PlanWriter(params['plan_file'], 'rename', log_path, params, log=log, result=result) as saved_plan:
+                preview_plan(plan, log, result,
+                             lambda old, new: f"DRY RUN: Would rename '{os.path.relpath(old, source_folder)}' to '{os.path.relpath(new, source_folder)}'",
+                             saved_plan)
+        else:
+            with ChangeJournal(log_path, 'rename', params, durability=params['journal_durability'], log=log) as journal:
+                execute_plan(plan, journal, 'rename', context, result,
+                             lambda old, new: f"SUCCESS: Renamed '{os.path.relpath(old, source_folder)}' to '{os.path.relpath(new, source_folder)}'",
+                             lambda: cls.check_cancelled(context, result), workers=params['move_workers'])
+        log(f"\n--- Rename Complete ---")
+
+    def show_result(self, result) -> None:
+        if result.error == self.CSV_ERROR:
+            Messagebox.show_error(result.error, "CSV Error")
+        elif result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        else:
+            Messagebox.show_info("Rename Complete", f"Successful: {result.success_count}\nFailed: {result.failure_count}")
+
+    @staticmethod
+    def _build_name_index(source_folder, scan_workers):
+        """Maps each file name below `source_folder` to the list of paths where it occurs, from one scan."""
+        name_index = {}
+        for entry in scan_files(source_folder, recursive=True, workers=scan_workers):
+            name_index.setdefault(os.path.normcase(entry.name), []).append(entry.path)
+        return name_index
+
+    @staticmethod
+    def _read_csv_mapping(csv_path):
+        """
+        Streams (row number, original name, new name) from the mapping CSV,
+        one row at a time, so memory does not grow with the file. Names are
+        None when their column is missing or empty.
+        """
+        with open(csv_path, mode='r', newline='', encoding='utf-8-sig') as infile:
+            reader = csv.reader(infile)
+            header = [name.lower().replace(' ', '_') for name in next(reader, [])]
+            def column(*names):
+                return next((header.index(name) for name in names if name in header), None)
+            original_column = column('original_filename', 'original_file_name')
+            new_column = column('new_filename', 'new_file_name')
+            data_rows = 0
+            for row in reader:
+                if not row:
+                    continue
+                data_rows += 1
+                original_name = row[original_column] if original_column is not None and original_column < len(row) else None
+                new_name = row[new_column] if new_column is not None and new_column < len(row) else None
+                yield data_rows + 1, original_name or None, new_name or None
 
     def _browse_source_folder(self):
         path = filedialog.askdirectory(title="Select Source Folder")
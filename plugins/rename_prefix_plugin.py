@@ -1,20 +1,33 @@
 import os
 import csv
-import shutil
 import tkinter as tk
 from tkinter import filedialog
-from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import plan_moves, execute_plan, preview_plan
+from core.saved_plan import PlanWriter
+from core.scanner import scan_files
+from core.term_matcher import PrefixTrie
 
-class RenamePrefixPlugin(ActionPlugin):
+class RenamePrefixPlugin(HeadlessActionPlugin):
     """
     A plugin to rename files by prepending a prefix based on a CSV mapping.
     The CSV should contain two columns: base_filename,prefix
+    When several base names match a file, the longest one decides its prefix.
     """
-    
+
+    default_params = {
+        'target_directory': '',
+        'csv_path': '',
+        'dry_run': False,
+        'journal_durability': 'none',
+        'move_workers': 1,
+        'plan_file': '',
+    }
+
     def __init__(self, app_context):
         """
         Initializes the RenamePrefixPlugin.
@@ -78,61 +91,75 @@ class RenamePrefixPlugin(ActionPlugin):
             
         return True, ""
 
-    def execute(self) -> None:
+    def get_params(self) -> dict:
+        """Collects the current GUI state into a plain parameter dict."""
+        return {
+            'target_directory': self.target_directory_var.get(),
+            'csv_path': self.csv_path_var.get(),
+            'dry_run': self.dry_run_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
         """Executes the core file renaming process."""
-        target_directory = self.target_directory_var.get()
-        csv_path = self.csv_path_var.get()
-        is_dry_run = self.dry_run_var.get()
+        target_directory = params['target_directory']
+        csv_path = params['csv_path']
+        is_dry_run = params['dry_run']
+        log = context.log
 
-        self.app.log(f"--- Starting Rename Prefix Action {'(Dry Run)' if is_dry_run else ''} ---")
+        log(f"--- Starting Rename Prefix Action {'(Dry Run)' if is_dry_run else ''} ---")
 
-        try:
-            prefix_map = self._read_prefix_map(csv_path)
-            if not prefix_map:
-                self.app.log("[ERROR] Could not read or process prefix map from CSV.")
-                return
-
-            log_path = os.path.join(target_directory, 'file_name_change_log.csv')
-            success_count, failure_count = 0, 0
-
-            for filename in os.listdir(target_directory):
-                file_path = os.path.join(target_directory, filename)
-                if os.path.isfile(file_path):
-                    name_part, ext_part = os.path.splitext(filename)
-                    
-                    # Find the matching prefix key
-                    for base_key, prefix in prefix_map.items():
-                        if name_part.startswith(base_key):
-                            if name_part.startswith(prefix + '_'): # Avoid re-prefixing
-                                self.app.log(f"SKIPPING: '{filename}' already seems to have a prefix.")
-                                break
-
-                            new_name = f"{prefix}_{filename}"
-                            new_path = os.path.join(target_directory, new_name)
-                            
-                            if is_dry_run:
-                                self.app.log(f"DRY RUN: Would rename '{filename}' to '{new_name}'")
-                                success_count += 1
-                            else:
-                                try:
-                                    shutil.move(file_path, new_path)
-                                    self.app.log(f"SUCCESS: Renamed '{filename}' to '{new_name}'")
-                                    self._log_action(log_path, file_path, new_path, 'success', 'rename_prefix')
-                                    success_count += 1
-                                except Exception as e:
-                                    self.app.log(f"FAILURE: Renaming '{filename}'. Reason: {e}")
-                                    self._log_action(log_path, file_path, new_path, f'failure - {e}', 'rename_prefix')
-                                    failure_count += 1
-                            break # Move to the next file after finding a match
+        prefix_map = cls._read_prefix_map(csv_path, log)
+        if not prefix_map:
+            log("[ERROR] Could not read or process prefix map from CSV.")
+            result.error = "Could not read or process prefix map from CSV."
+            return
+
+        # Built once, so each file costs one walk along its name whatever the size of the map.
+        prefix_trie = PrefixTrie(prefix_map)
+        files = list(scan_files(target_directory, recursive=False))
+        result.scanned_count = len(files)
+        moves = []
+        for entry in files:
+            filename, file_path = entry.name, entry.path
+            name_part, ext_part = os.path.splitext(filename)
             
-            self.app.log(f"\n--- Rename Prefix Complete ---")
-            Messagebox.show_info("Complete", f"Files prefixed: {success_count}\nFailed or skipped: {failure_count}")
+            # Find the longest matching prefix key
+            match = prefix_trie.longest_prefix(name_part)
+            if match is None:
+                continue
+            base_key, prefix = match
+            if name_part.startswith(prefix + '_'): # Avoid re-prefixing
+                log(f"SKIPPING: '{filename}' already seems to have a prefix.")
+                result.add_skip()
+                continue
+
+            moves.append((file_path, os.path.join(target_directory, f"{prefix}_{filename}")))
+
+        plan = plan_moves(moves)
+        log_path = os.path.join(target_directory, 'file_name_change_log.csv')
+        if is_dry_run:
+            with PlanWriter(params['plan_file'], 'rename_prefix', log_path, params, log=log, result=result) as saved_plan:
+                preview_plan(plan, log, result,
+                             lambda old, new: f"DRY RUN: Would rename '{os.path.basename(old)}' to '{os.path.basename(new)}'",
+                             saved_plan)
+        else:
+            with ChangeJournal(log_path, 'rename_prefix', params, durability=params['journal_durability'], log=log) as journal:
+                execute_plan(plan, journal, 'rename_prefix', context, result,
+                             lambda old, new: f"SUCCESS: Renamed '{os.path.basename(old)}' to '{os.path.basename(new)}'",
+                             lambda: cls.check_cancelled(context, result), workers=params['move_workers'])
+        
+        log(f"\n--- Rename Prefix Complete ---")
 
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-            Messagebox.show_error(f"An unexpected error occurred: {e}", "Critical Error")
+    def show_result(self, result) -> None:
+        """Shows a summary dialog for a finished run."""
+        if result.error:
+            Messagebox.show_error(result.error, "Error")
+        else:
+            Messagebox.show_info("Complete", f"Files prefixed: {result.success_count}\nFailed or skipped: {result.failure_count}")
 
-    def _read_prefix_map(self, csv_path):
+    @staticmethod
+    def _read_prefix_map(csv_path, log):
         """Reads the prefix mapping from a CSV file."""
         prefix_map = {}
         try:
@@ -144,25 +171,10 @@ class RenamePrefixPlugin(ActionPlugin):
                         if base_filename and prefix:
                             prefix_map[base_filename] = prefix
         except Exception as e:
-            self.app.log(f"Error reading prefix CSV: {e}")
+            log(f"Error reading prefix CSV: {e}")
             return None
         return prefix_map
 
-    def _log_action(self, log_path, old_path, new_path, status, action_type):
-        """Logs a file operation to the rollback log file."""
-        if self.dry_run_var.get():
-            return
-        
-        file_exists = os.path.exists(log_path)
-        try:
-            with open(log_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(['timestamp', 'old_path', 'new_path', 'status', 'action_type', 'details'])
-                writer.writerow([datetime.now().isoformat(), old_path, new_path, status, action_type, ''])
-        except Exception as e:
-            self.app.log(f"[ERROR] Could not write to log file '{log_path}'. Reason: {e}")
-
     def _browse_folder(self):
         """Opens a dialog to select the target directory."""
         path = filedialog.askdirectory(title="Select Target Directory")
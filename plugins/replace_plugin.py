@@ -1,20 +1,39 @@
 import os
-import csv
-import re
-import shutil
 import tkinter as tk
 from tkinter import filedialog
-from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import plan_moves, execute_plan, preview_plan
+from core.rename_rules import RulePipeline, make_rule, describe_rule, load_rule_set, save_rule_set
+from core.saved_plan import PlanWriter
+from core.scanner import scan_files
 
-class ReplacePlugin(ActionPlugin):
+class ReplacePlugin(HeadlessActionPlugin):
     """
     A plugin to find and replace a string in filenames or extensions,
-    with optional support for regular expressions.
+    with optional support for regular expressions. Several rules can be
+    listed (and saved as a rule set); they are applied in order in a single
+    pass, so each file is renamed at most once.
     """
+    default_params = {
+        'source_folder': '',
+        'find': '',
+        'replace_with': '',
+        'recursive': True,
+        'use_regex': False,
+        'target': 'name',
+        'rules': [],
+        'rules_file': '',
+        'dry_run': False,
+        'journal_durability': 'none',
+        'move_workers': 1,
+        'plan_file': '',
+        'scan_workers': 1,
+    }
+
     def __init__(self, app_context):
         self.app = app_context
         
@@ -26,6 +45,7 @@ class ReplacePlugin(ActionPlugin):
         self.replace_with_var = tk.StringVar()
         self.target_var = tk.StringVar(value="name")
         self.dry_run_var = tk.BooleanVar(value=False)
+        self.rules = []
 
     def get_name(self) -> str:
         return "Replace"
@@ -56,87 +76,149 @@ class ReplacePlugin(ActionPlugin):
         ttk.Radiobutton(target_frame, text="File Name", variable=self.target_var, value="name", bootstyle="toolbutton").pack(side="left", padx=5)
         ttk.Radiobutton(target_frame, text="Extension only", variable=self.target_var, value="ext", bootstyle="toolbutton").pack(side="left", padx=5)
 
+        rules_frame = ttk.LabelFrame(frame, text="Rule List (applied in order, in one pass)", padding=5)
+        rules_frame.grid(row=6, column=0, columnspan=3, sticky="nsew", padx=5, pady=(10, 0))
+        rules_frame.columnconfigure(0, weight=1)
+        self.rules_listbox = tk.Listbox(rules_frame, height=6)
+        self.rules_listbox.grid(row=0, column=0, rowspan=6, sticky="nsew", padx=(0, 5))
+        ttk.Button(rules_frame, text="Add Rule", command=self._add_rule, bootstyle="outline").grid(row=0, column=1, sticky="ew", pady=1)
+        ttk.Button(rules_frame, text="Remove", command=self._remove_rule, bootstyle="outline").grid(row=1, column=1, sticky="ew", pady=1)
+        ttk.Button(rules_frame, text="Move Up", command=lambda: self._move_rule(-1), bootstyle="outline").grid(row=2, column=1, sticky="ew", pady=1)
+        ttk.Button(rules_frame, text="Move Down", command=lambda: self._move_rule(1), bootstyle="outline").grid(row=3, column=1, sticky="ew", pady=1)
+        ttk.Button(rules_frame, text="Load...", command=self._load_rules, bootstyle="outline").grid(row=4, column=1, sticky="ew", pady=1)
+        ttk.Button(rules_frame, text="Save...", command=self._save_rules, bootstyle="outline").grid(row=5, column=1, sticky="ew", pady=1)
+        ttk.Label(rules_frame, text="\"Add Rule\" adds the fields above. When the list has rules, they are used instead of the fields.", wraplength=300).grid(row=6, column=0, columnspan=2, sticky="w", pady=(5, 0))
+        self._refresh_rules()
+
     def validate(self) -> tuple[bool, str]:
         if not self.source_folder_var.get() or not os.path.isdir(self.source_folder_var.get()):
             return False, "A valid Source Folder is required."
-        if not self.find_var.get():
+        if not self.rules and not self.find_var.get():
             return False, "The 'Find this text' field cannot be empty."
-        if self.use_regex_var.get():
-            try:
-                re.compile(self.find_var.get())
-            except re.error as e:
-                return False, f"Invalid Regex pattern: {e}"
+        try:
+            RulePipeline(self._collect_rules({**self.default_params, **self.get_params()}))
+        except ValueError as e:
+            return False, str(e)
         return True, ""
 
-    def execute(self) -> None:
-        source_folder = self.source_folder_var.get()
-        find_str = self.find_var.get()
-        replace_str = self.replace_with_var.get()
-        is_recursive = self.recursive_var.get()
-        use_regex = self.use_regex_var.get()
-        target = self.target_var.get()
-        is_dry_run = self.dry_run_var.get()
-        self.app.log(f"--- Starting Replace Action {'(Dry Run)' if is_dry_run else ''} ---")
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'find': self.find_var.get(),
+            'replace_with': self.replace_with_var.get(),
+            'recursive': self.recursive_var.get(),
+            'use_regex': self.use_regex_var.get(),
+            'target': self.target_var.get(),
+            'rules': list(self.rules),
+            'dry_run': self.dry_run_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        source_folder = params['source_folder']
+        is_dry_run = params['dry_run']
+        log = context.log
+        log(f"--- Starting Replace Action {'(Dry Run)' if is_dry_run else ''} ---")
         try:
-            files_to_process = self._collect_files(source_folder, is_recursive)
-            log_path = os.path.join(source_folder, 'file_name_change_log.csv')
-            success_count, failure_count, skipped_count = 0, 0, 0
-            for filepath in files_to_process:
-                original_filename = os.path.basename(filepath)
-                name, ext = os.path.splitext(original_filename)
-                new_name, new_ext = name, ext
-                if target == 'name':
-                    if use_regex: new_name = re.sub(find_str, replace_str, name)
-                    else: new_name = name.replace(find_str, replace_str)
-                elif target == 'ext':
-                    ext_no_dot = ext[1:] if ext.startswith('.') else ext
-                    if use_regex: new_ext_no_dot = re.sub(find_str, replace_str, ext_no_dot)
-                    else: new_ext_no_dot = ext_no_dot.replace(find_str, replace_str)
-                    new_ext = f".{new_ext_no_dot}" if new_ext_no_dot else ""
-                new_filename = new_name + new_ext
-                if new_filename == original_filename:
-                    skipped_count += 1
-                    continue
-                source_path = os.path.join(os.path.dirname(filepath), original_filename)
-                dest_path = os.path.join(os.path.dirname(filepath), new_filename)
-                if is_dry_run:
-                    self.app.log(f"DRY RUN: Would rename '{original_filename}' to '{new_filename}'")
-                    success_count += 1
-                else:
-                    try:
-                        shutil.move(source_path, dest_path)
-                        self._log_action(log_path, source_path, dest_path, 'success', 'replace')
-                        success_count += 1
-                    except Exception as e:
-                        self.app.log(f"FAILURE renaming '{original_filename}': {e}")
-                        self._log_action(log_path, source_path, dest_path, f'failure - {e}', 'replace')
-                        failure_count += 1
-            self.app.log(f"\n--- Replace Complete ---")
-            Messagebox.show_info("Replace Complete", f"Files renamed: {success_count}\nFailures: {failure_count}\nUnchanged: {skipped_count}")
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-
-    def _collect_files(self, source_folder, is_recursive):
-        file_list = []
-        if is_recursive:
-            for root, _, files in os.walk(source_folder):
-                for name in files: file_list.append(os.path.join(root, name))
+            pipeline = RulePipeline(cls._collect_rules(params))
+        except (OSError, ValueError) as e:
+            log(f"[ERROR] {e}")
+            result.error = str(e)
+            return
+        if not len(pipeline):
+            log("[ERROR] There are no rules to apply.")
+            result.error = "There are no rules to apply."
+            return
+        log(f"Applying {len(pipeline)} rule(s) in one pass.")
+        files_to_process = list(scan_files(source_folder, params['recursive'], workers=params['scan_workers']))
+        result.scanned_count = len(files_to_process)
+        moves = []
+        for entry in files_to_process:
+            original_filename = entry.name
+            new_filename = pipeline.apply(original_filename)
+            if new_filename == original_filename:
+                result.add_skip()
+                continue
+            moves.append((entry.path, os.path.join(entry.root, new_filename)))
+        # Two files renamed to the same name, or onto an existing file, are caught here rather than mid-run.
+        plan = plan_moves(moves)
+        log_path = os.path.join(source_folder, 'file_name_change_log.csv')
+        if is_dry_run:
+            with PlanWriter(params['plan_file'], 'replace', log_path, params, log=log, result=result) as saved_plan:
+                preview_plan(plan, log, result,
+                             lambda old, new: f"DRY RUN: Would rename '{os.path.basename(old)}' to '{os.path.basename(new)}'",
+                             saved_plan)
         else:
-            for name in os.listdir(source_folder):
-                path = os.path.join(source_folder, name)
-                if os.path.isfile(path): file_list.append(path)
-        return file_list
-
-    def _log_action(self, log_path, old_path, new_path, status, action_type):
-        if self.dry_run_var.get(): return
-        file_exists = os.path.exists(log_path)
+            with ChangeJournal(log_path, 'replace', params, durability=params['journal_durability'], log=log) as journal:
+                execute_plan(plan, journal, 'replace', context, result, should_stop=lambda: cls.check_cancelled(context, result),
+                             workers=params['move_workers'])
+        log(f"\n--- Replace Complete ---")
+
+    def show_result(self, result) -> None:
+        if not result.error:
+            Messagebox.show_info("Replace Complete", f"Files renamed: {result.success_count}\nFailures: {result.failure_count}\nUnchanged: {result.skipped_count}")
+
+    @staticmethod
+    def _collect_rules(params):
+        """
+        The rules to apply, in order: a saved rule set (`rules_file`), then
+        `rules`. Without either, the single find/replace fields form one rule.
+        """
+        rules = load_rule_set(params['rules_file']) if params['rules_file'] else []
+        rules += params['rules']
+        if not rules and params['find']:
+            rules = [make_rule(params['find'], params['replace_with'], params['use_regex'], params['target'])]
+        return rules
+
+    def _refresh_rules(self):
+        self.rules_listbox.delete(0, tk.END)
+        for index, rule in enumerate(self.rules, 1):
+            self.rules_listbox.insert(tk.END, f"{index}. {describe_rule(rule)}")
+
+    def _add_rule(self):
+        rule = make_rule(self.find_var.get(), self.replace_with_var.get(), self.use_regex_var.get(), self.target_var.get())
+        try:
+            RulePipeline([rule])
+        except ValueError as e:
+            Messagebox.show_error(str(e), "Invalid Rule")
+            return
+        self.rules.append(rule)
+        self.find_var.set("")
+        self.replace_with_var.set("")
+        self._refresh_rules()
+
+    def _remove_rule(self):
+        for index in reversed(self.rules_listbox.curselection()):
+            del self.rules[index]
+        self._refresh_rules()
+
+    def _move_rule(self, offset):
+        selection = self.rules_listbox.curselection()
+        if not selection:
+            return
+        index = selection[0]
+        new_index = index + offset
+        if 0 <= new_index < len(self.rules):
+            self.rules[index], self.rules[new_index] = self.rules[new_index], self.rules[index]
+            self._refresh_rules()
+            self.rules_listbox.selection_set(new_index)
+
+    def _load_rules(self):
+        path = filedialog.askopenfilename(title="Load Rule Set", filetypes=[("Rule Sets", "*.json"), ("All Files", "*.*")])
+        if not path:
+            return
         try:
-            with open(log_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if not file_exists: writer.writerow(['timestamp', 'old_path', 'new_path', 'status', 'action_type', 'details'])
-                writer.writerow([datetime.now().isoformat(), old_path, new_path, status, action_type, ''])
-        except Exception as e:
-            self.app.log(f"[ERROR] Could not write to log file '{log_path}'. Reason: {e}")
+            self.rules = load_rule_set(path)
+        except (OSError, ValueError) as e:
+            Messagebox.show_error(f"Could not load the rule set: {e}", "Error")
+            return
+        self._refresh_rules()
+
+    def _save_rules(self):
+        path = filedialog.asksaveasfilename(title="Save Rule Set", defaultextension=".json", filetypes=[("Rule Sets", "*.json")])
+        if path:
+            save_rule_set(path, self.rules)
+            self.app.log(f"Saved {len(self.rules)} rule(s) to '{path}'.")
 
     def _browse_folder(self):
         path = filedialog.askdirectory(title="Select Source Folder")
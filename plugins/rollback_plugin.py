@@ -1,21 +1,48 @@
 import os
-import csv
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.journal import RunJournal, journal_dir_for, parse_time_bound
+from core.move_engine import move_file, split_link
 
-class RollbackPlugin(ActionPlugin):
+class RollbackConflict(Exception):
+    """A file's original path is occupied, so moving it back would overwrite something."""
+
+class RollbackPlugin(HeadlessActionPlugin):
     """
     A plugin to roll back file operations using a change log file.
+
+    When the run journal next to the log exists, a single run ('run_id') or
+    a time range ('since'/'until', ISO dates or date-times) can be rolled
+    back; otherwise the whole log is, after importing it into a journal so
+    a cancelled rollback resumes where it stopped.
     """
+    ALL_RUNS = "All runs"
+    # Operations of a run are marked as rolled back in the journal in batches of this size.
+    MARK_BATCH_SIZE = 500
+
+    default_params = {
+        'source_folder': '',
+        'log_file': 'file_name_change_log.csv',
+        'run_id': '',
+        'since': '',
+        'until': '',
+        'workers': 1,
+    }
+
     def __init__(self, app_context):
         self.app = app_context
         self.source_folder_var = tk.StringVar()
+        self.run_var = tk.StringVar(value=self.ALL_RUNS)
+        self.since_var = tk.StringVar()
+        self.until_var = tk.StringVar()
+        self.workers_var = tk.IntVar(value=1)
         self.log_file = "file_name_change_log.csv"
 
     def get_name(self) -> str:
@@ -40,6 +67,19 @@ class RollbackPlugin(ActionPlugin):
         
         ttk.Label(frame, text=f"This action will look for '{self.log_file}' in the selected folder and revert the changes.", wraplength=300).grid(row=1, column=0, columnspan=3, pady=10)
 
+        # Scope (needs the run journal)
+        ttk.Label(frame, text="Run:").grid(row=2, column=0, sticky="w", padx=5, pady=5)
+        run_combo = ttk.Combobox(frame, textvariable=self.run_var, state="readonly")
+        run_combo.configure(postcommand=lambda: self._refresh_runs(run_combo))
+        run_combo.grid(row=2, column=1, columnspan=2, sticky="ew", padx=5)
+        ttk.Label(frame, text="From (YYYY-MM-DD [HH:MM]):").grid(row=3, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(frame, textvariable=self.since_var).grid(row=3, column=1, columnspan=2, sticky="ew", padx=5)
+        ttk.Label(frame, text="To (YYYY-MM-DD [HH:MM]):").grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(frame, textvariable=self.until_var).grid(row=4, column=1, columnspan=2, sticky="ew", padx=5)
+        ttk.Label(frame, text="Parallel moves:").grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        ttk.Spinbox(frame, from_=1, to=64, textvariable=self.workers_var, width=5).grid(row=5, column=1, sticky="w", padx=5)
+        ttk.Label(frame, text="Use 8-32 on network drives. Rollback stops at the first file whose original path is occupied.", wraplength=300).grid(row=6, column=0, columnspan=3, sticky="w", padx=5)
+
     def validate(self) -> tuple[bool, str]:
         """Validates the inputs for the action."""
         source_folder = self.source_folder_var.get()
@@ -47,78 +87,259 @@ class RollbackPlugin(ActionPlugin):
             return False, "A valid folder is required."
         
         log_path = os.path.join(source_folder, self.log_file)
-        if not os.path.isfile(log_path):
+        if not os.path.isfile(log_path) and not RunJournal(journal_dir_for(log_path)).exists():
             return False, f"The log file '{self.log_file}' was not found in the selected folder."
+        try:
+            parse_time_bound(self.since_var.get())
+            parse_time_bound(self.until_var.get(), end=True)
+        except ValueError:
+            return False, "Dates must be in the form YYYY-MM-DD or YYYY-MM-DD HH:MM."
         return True, ""
 
-    def execute(self) -> None:
-        """Executes the rollback process."""
-        source_folder = self.source_folder_var.get()
-        log_path = os.path.join(source_folder, self.log_file)
+    def get_params(self) -> dict:
+        run = self.run_var.get()
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'run_id': '' if run == self.ALL_RUNS else run.split(' ')[0],
+            'since': self.since_var.get(),
+            'until': self.until_var.get(),
+            'workers': self.workers_var.get(),
+        }
+
+    def confirm(self) -> bool:
+        """Asks the user to confirm before anything is rolled back."""
+        log_path = os.path.join(self.source_folder_var.get(), self.log_file)
+        params = self.get_params()
+        scope = f"run {params['run_id']}" if params['run_id'] else "all runs"
+        if params['since'] or params['until']:
+            scope += f" between {params['since'] or 'the start'} and {params['until'] or 'now'}"
         
-        if not Messagebox.yesno(
-            f"Are you sure you want to roll back the changes recorded in '{log_path}'?\n\nThis cannot be undone.",
-            "Confirm Rollback"
-        ):
-            self.app.log("Rollback cancelled by user.")
+        return self.ask_yes_no(
+            f"Are you sure you want to roll back the changes ({scope}) recorded in '{log_path}'?\n\nThis cannot be undone.",
+            "Confirm Rollback",
+            "Rollback cancelled by user."
+        )
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        """Reverts the operations recorded in the change log, last action first."""
+        log = context.log
+        log_path = os.path.join(params['source_folder'], params['log_file'])
+        journal = RunJournal(journal_dir_for(log_path))
+        run_id = params['run_id'] or None
+        since = parse_time_bound(params['since'])
+        until = parse_time_bound(params['until'], end=True)
+        scoped = bool(run_id or since or until)
+
+        log(f"--- Starting Rollback Action ---")
+        started = time.perf_counter()
+        if not journal.exists():
+            if scoped:
+                result.error = "Rolling back a single run or a time range needs the run journal, which was not found."
+                log(f"[ERROR] {result.error}")
+                return
+            # Reverted operations are marked in the journal, which a bare change log cannot record.
+            log(f"Importing log file into a run journal: {log_path}")
+            journal.import_csv(log_path)
+        if journal.exists():
+            log(f"Reading run journal: {journal.directory}")
+            cls._rollback_journal(journal, run_id, since, until, params['workers'], context, result)
+        elapsed = time.perf_counter() - started
+        log(f"Moved back {result.success_count} file(s) in {elapsed:.1f}s ({result.success_count / max(elapsed, 1e-6):.0f} files/s, {params['workers']} worker(s)).")
+        if result.error:
+            return
+
+        if result.cancelled:
+            log(f"Rollback was cancelled; '{params['log_file']}' was left in place.")
             return
 
-        self.app.log(f"--- Starting Rollback Action ---")
-        self.app.log(f"Reading log file: {log_path}")
+        if scoped:
+            log(f"Rolled-back operations were marked in the run journal; '{params['log_file']}' was left in place.")
+        else:
+            # Rename the log file (and journal) to prevent re-running the rollback
+            suffix = f".rolled_back_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            for path in (log_path, journal.directory):
+                if os.path.exists(path):
+                    os.rename(path, path + suffix)
+                    result.outputs.append(path + suffix)
+                    log(f"Renamed {os.path.basename(path)} to: {os.path.basename(path + suffix)}")
 
-        try:
-            with open(log_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                # Read all rows and reverse them to process last action first
-                log_entries = list(reader)
-                log_entries.reverse()
-
-            success_count, failure_count = 0, 0
-            for row in log_entries:
-                if row.get('status') != 'success':
-                    continue
-                
-                old_path = row.get('old_path')
-                new_path = row.get('new_path')
-                action_type = row.get('action_type')
-
-                if action_type == 'delete_duplicate':
-                    self.app.log(f"SKIPPING rollback for deleted file: '{old_path}'. This action cannot be undone.")
-                    failure_count += 1
+        log(f"\n--- Rollback Complete ---")
+        log(f"Reverted: {result.success_count} | Failed/Skipped: {result.failure_count}")
+
+    @classmethod
+    def _rollback_journal(cls, journal, run_id, since, until, workers, context, result):
+        """Reverts the matching runs, newest first, reading each run's operations backwards."""
+        runs = journal.select_runs(run_id, since, until)
+        if run_id and not runs:
+            result.error = f"Run '{run_id}' was not found in the run journal."
+            context.log(f"[ERROR] {result.error}")
+            return
+        total = sum(run['op_count'] for run in runs)
+        done = 0
+        for run in runs:
+            context.log(f"Rolling back run {run['run_id']} ({run['plugin']}, started {run['started']})")
+            reverted = []
+            def on_reverted(op):
+                reverted.append(op['seq'])
+                if len(reverted) >= cls.MARK_BATCH_SIZE:
+                    journal.mark_reverted(run['run_id'], reverted)
+                    reverted.clear()
+            ops = ((op, done + index, total) for index, op in enumerate(journal.iter_ops_reversed(run, since, until)))
+            cls._revert_rows(ops, workers, context, result, on_reverted)
+            journal.mark_reverted(run['run_id'], reverted)
+            done += run['op_count']
+            if result.cancelled or result.error:
+                break
+
+    @classmethod
+    def _revert_rows(cls, rows, workers, context, result, on_reverted=None):
+        """
+        Reverts (row, done, total) items in order. With more than one worker,
+        independent moves run concurrently: a row waits only for earlier
+        (i.e. later-logged) rows that touch one of its paths, so chains like
+        A->B, B->C are still undone as C->B before B->A. Either way the
+        rollback stops on the first conflict (a target that already exists)
+        rather than overwriting it.
+        """
+        log = context.log
+        if workers <= 1:
+            for row, done, total in rows:
+                if cls.check_cancelled(context, result):
+                    break
+                context.report_progress(done, total)
+                paths = cls._prepare(row, log, result)
+                if not paths:
                     continue
+                error = cls._revert(row, *paths, True)
+                if isinstance(error, RollbackConflict):
+                    result.error = str(error)
+                    log(f"[ERROR] {error} Rollback stopped.")
+                if cls._record(*paths, error, log, result) and on_reverted:
+                    on_reverted(row)
+                if result.error:
+                    break
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rollback")
+        # The newest scheduled move touching each path; entries are removed once it finishes.
+        last_use = {}
+        running = {}
 
-                if not old_path or not new_path:
-                    self.app.log(f"SKIPPING invalid log entry: {row}")
-                    failure_count += 1
+        def collect(finished):
+            for future in finished:
+                row, paths = running.pop(future)
+                error = future.result()
+                for path in paths:
+                    if last_use.get(path) is future:
+                        del last_use[path]
+                if isinstance(error, RollbackConflict):
+                    result.error = str(error)
+                    log(f"[ERROR] {error} Rollback stopped.")
+                if cls._record(*paths, error, log, result) and on_reverted:
+                    on_reverted(row)
+
+        try:
+            for row, done, total in rows:
+                if cls.check_cancelled(context, result) or result.error:
+                    break
+                context.report_progress(done, total)
+                paths = cls._prepare(row, log, result)
+                if not paths:
                     continue
+                dependencies = [last_use[path] for path in paths if path in last_use]
+                if dependencies:
+                    finished, _ = wait(dependencies)
+                    collect(finished & running.keys())
+                    if result.error:
+                        break
+                if len(running) >= workers * 4:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                future = executor.submit(cls._revert, row, *paths, True)
+                running[future] = (row, paths)
+                for path in paths:
+                    last_use[path] = future
+            collect(wait(running)[0])
+        finally:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _prepare(row, log, result):
+        """Returns (old_path, new_path) for a row that should be moved back, or None if it is skipped."""
+        if row.get('status') != 'success':
+            return None
+        result.scanned_count += 1
+        
+        old_path = row.get('old_path')
+        new_path = row.get('new_path')
+        action_type = row.get('action_type')
 
-                # Ensure parent directory of the old path exists
-                old_parent_dir = os.path.dirname(old_path)
-                if not os.path.exists(old_parent_dir):
-                    os.makedirs(old_parent_dir, exist_ok=True)
-                
-                try:
-                    shutil.move(new_path, old_path)
-                    self.app.log(f"SUCCESS: Rolled back '{os.path.basename(new_path)}' to '{os.path.basename(old_path)}'")
-                    success_count += 1
-                except Exception as e:
-                    self.app.log(f"FAILURE rolling back '{new_path}': {e}")
-                    failure_count += 1
-            
-            # Rename the log file to prevent re-running the rollback
-            rolled_back_log_path = log_path + f".rolled_back_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            os.rename(log_path, rolled_back_log_path)
-            self.app.log(f"Renamed log file to: {os.path.basename(rolled_back_log_path)}")
-
-            self.app.log(f"\n--- Rollback Complete ---")
-            self.app.log(f"Reverted: {success_count} | Failed/Skipped: {failure_count}")
-            Messagebox.show_info("Rollback Complete", f"Operations reverted: {success_count}\nFailures/Skipped: {failure_count}")
+        if action_type == 'delete_duplicate':
+            log(f"SKIPPING rollback for deleted file: '{old_path}'. This action cannot be undone.")
+            result.add_failure(old_path, "Deleted files cannot be restored.")
+            return None
 
+        if not old_path or not new_path:
+            log(f"SKIPPING invalid log entry: {row}")
+            result.add_failure(old_path or new_path, "Invalid log entry.")
+            return None
+        return old_path, new_path
+
+    @classmethod
+    def _revert(cls, row, old_path, new_path, check_conflict=False):
+        """Undoes one logged operation. Returns None, or the exception on failure."""
+        if row.get('action_type') == 'link_duplicate':
+            # old_path was replaced by a link to new_path; give it its own copy back.
+            try:
+                split_link(new_path, old_path)
+                return None
+            except Exception as e:
+                return e
+        return cls._try_move_back(old_path, new_path, check_conflict)
+
+    @staticmethod
+    def _try_move_back(old_path, new_path, check_conflict=False):
+        """Moves a file back to its logged original path. Returns None, or the exception on failure."""
+        try:
+            # A case-only rename on a case-insensitive filesystem finds the file itself at old_path.
+            if check_conflict and os.path.lexists(old_path) and os.path.normcase(old_path) != os.path.normcase(new_path):
+                raise RollbackConflict(f"Conflict: '{old_path}' already exists.")
+            # Ensure parent directory of the old path exists
+            old_parent_dir = os.path.dirname(old_path)
+            if not os.path.exists(old_parent_dir):
+                os.makedirs(old_parent_dir, exist_ok=True)
+            move_file(new_path, old_path)
+            return None
         except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-            Messagebox.show_error(f"An unexpected error occurred: {e}", "Critical Error")
+            return e
+
+    @staticmethod
+    def _record(old_path, new_path, error, log, result):
+        """Logs and records the outcome of one move; returns True if it was rolled back."""
+        if error is None:
+            log(f"SUCCESS: Rolled back '{os.path.basename(new_path)}' to '{os.path.basename(old_path)}'")
+            result.add_success(new_path, old_path)
+            return True
+        log(f"FAILURE rolling back '{new_path}': {error}")
+        result.add_failure(new_path, error)
+        return False
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        else:
+            Messagebox.show_info("Rollback Complete", f"Operations reverted: {result.success_count}\nFailures/Skipped: {result.failure_count}")
+
+    def _refresh_runs(self, combo):
+        """Fills the run list from the journal in the selected folder."""
+        journal = RunJournal(journal_dir_for(os.path.join(self.source_folder_var.get(), self.log_file)))
+        values = [self.ALL_RUNS]
+        for run in journal.runs():
+            values.append(f"{run['run_id']}  {run['plugin']}, {run['op_count']} operation(s), started {run['started'][:19]}")
+        combo.configure(values=values)
 
     def _browse_folder(self):
         path = filedialog.askdirectory(title="Select Folder Containing Log File")
         if path:
-            self.source_folder_var.set(path)
\ No newline at end of file
+            self.source_folder_var.set(path)
@@ -1,19 +1,34 @@
 import os
 import csv
-import shutil
 import tkinter as tk
 from tkinter import filedialog, scrolledtext
-from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs import Messagebox
 
-from core.interfaces import ActionPlugin
+from core.interfaces import HeadlessActionPlugin
+from core.journal import ChangeJournal
+from core.move_planner import plan_moves, execute_plan, preview_plan
+from core.saved_plan import PlanWriter
+from core.term_matcher import TermMatcher
+from core.scanner import scan_files
 
-class SearchOrganizePlugin(ActionPlugin):
+class SearchOrganizePlugin(HeadlessActionPlugin):
     """
     A plugin to find files containing specific search terms and
-    move them into folders named after those terms.
+    move them into folders named after those terms. A file matching
+    several terms goes to the folder of the term listed first.
     """
+    default_params = {
+        'source_folder': '',
+        'output_folder': '',
+        'search_terms': [],
+        'search_terms_file': '',
+        'dry_run': False,
+        'journal_durability': 'none',
+        'move_workers': 1,
+        'plan_file': '',
+    }
+
     def __init__(self, app_context):
         self.app = app_context
         self.source_folder_var = tk.StringVar()
@@ -57,85 +72,81 @@ class SearchOrganizePlugin(ActionPlugin):
             return False, "At least one search term is required, either in the text box or from a file."
         return True, ""
 
-    def execute(self) -> None:
-        source_folder = self.source_folder_var.get()
-        output_folder = self.output_folder_var.get()
-        search_terms = self._get_search_terms()
-        is_dry_run = self.dry_run_var.get()
-        self.app.log(f"--- Starting Search & Organize {'(Dry Run)' if is_dry_run else ''} ---")
-        try:
-            log_path = os.path.join(source_folder, 'file_name_change_log.csv')
-            
-            moved_files = set()
-            all_files = [f for f in os.listdir(source_folder) if os.path.isfile(os.path.join(source_folder, f))]
-            
-            success_count, failure_count = 0, 0
-            for term in search_terms:
-                files_to_move_for_this_term = []
-                for filename in all_files:
-                    if filename not in moved_files and term.lower() in filename.lower():
-                        files_to_move_for_this_term.append(filename)
-
-                if not files_to_move_for_this_term:
-                    continue
-
-                dest_dir = os.path.join(output_folder, term)
-                if not is_dry_run:
-                    os.makedirs(dest_dir, exist_ok=True)
-                
-                for filename in files_to_move_for_this_term:
-                    source_path = os.path.join(source_folder, filename)
-                    dest_path = os.path.join(dest_dir, filename)
-                    if is_dry_run:
-                        self.app.log(f"  - DRY RUN: Would move '{filename}' to folder '{term}'")
-                        success_count += 1
-                    else:
-                        try:
-                            shutil.move(source_path, dest_path)
-                            self._log_action(log_path, source_path, dest_path, 'success', 'search_organize')
-                            success_count += 1
-                        except Exception as e:
-                            self.app.log(f"  - FAILURE moving '{filename}': {e}")
-                            self._log_action(log_path, source_path, dest_path, f'failure - {e}', 'search_organize')
-                            failure_count += 1
-                    moved_files.add(filename)
-
-            self.app.log(f"\n--- Search & Organize Complete ---")
-            Messagebox.show_info("Complete", f"Files moved successfully: {success_count}\nFailures: {failure_count}")
-        except Exception as e:
-            self.app.log(f"[CRITICAL ERROR] An unexpected error occurred: {e}")
-            Messagebox.show_error(f"An unexpected error occurred: {e}", "Critical Error")
+    def get_params(self) -> dict:
+        return {
+            'source_folder': self.source_folder_var.get(),
+            'output_folder': self.output_folder_var.get(),
+            'search_terms': self._get_search_terms(),
+            'dry_run': self.dry_run_var.get(),
+        }
+
+    @classmethod
+    def perform(cls, params, context, result) -> None:
+        source_folder = params['source_folder']
+        output_folder = params['output_folder'] or source_folder
+        search_terms = params['search_terms']
+        if not search_terms and params['search_terms_file']:
+            search_terms = cls._read_search_terms_file(params['search_terms_file'], context.log)
+        search_terms = list(dict.fromkeys(term for term in search_terms if term))
+        is_dry_run = params['dry_run']
+        log = context.log
+        log(f"--- Starting Search & Organize {'(Dry Run)' if is_dry_run else ''} ---")
+        all_files = [entry.name for entry in scan_files(source_folder, recursive=False)]
+        result.scanned_count = len(all_files)
+
+        # Built once; each filename is then scanned a single time for all terms.
+        matcher = TermMatcher(search_terms)
+        moves = []
+        for filename in all_files:
+            index = matcher.first_match(filename)
+            if index is not None:
+                moves.append((os.path.join(source_folder, filename), os.path.join(output_folder, search_terms[index], filename)))
+
+        plan = plan_moves(moves)
+        log_path = os.path.join(source_folder, 'file_name_change_log.csv')
+        if is_dry_run:
+            with PlanWriter(params['plan_file'], 'search_organize', log_path, params, log=log, result=result) as saved_plan:
+                preview_plan(plan, log, result,
+                             lambda old, new: f"  - DRY RUN: Would move '{os.path.basename(old)}' to folder '{os.path.basename(os.path.dirname(new))}'",
+                             saved_plan)
+        else:
+            with ChangeJournal(log_path, 'search_organize', params, durability=params['journal_durability'], log=log) as journal:
+                execute_plan(plan, journal, 'search_organize', context, result, should_stop=lambda: cls.check_cancelled(context, result),
+                             workers=params['move_workers'])
+
+        log(f"\n--- Search & Organize Complete ---")
+
+    def show_result(self, result) -> None:
+        if result.error:
+            Messagebox.show_error(f"An unexpected error occurred: {result.error}", "Critical Error")
+        else:
+            Messagebox.show_info("Complete", f"Files moved successfully: {result.success_count}\nFailures: {result.failure_count}")
 
     def _get_search_terms(self):
         terms = []
         filepath = self.search_terms_file_var.get()
         if filepath and os.path.isfile(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    if filepath.lower().endswith('.csv'):
-                        reader = csv.reader(f)
-                        for row in reader:
-                            if row: terms.append(row[0].strip())
-                    else:
-                        terms = [line.strip() for line in f if line.strip()]
-            except Exception as e:
-                self.app.log(f"Error reading search terms from file: {e}")
+            terms = self._read_search_terms_file(filepath, self.app.log)
         else:
             text_content = self.search_terms_text.get("1.0", tk.END)
             terms = [line.strip() for line in text_content.splitlines() if line.strip()]
-        return list(set(terms))
+        # Keep the listed order: it decides which term wins when a file matches several.
+        return list(dict.fromkeys(terms))
 
-    def _log_action(self, log_path, old_path, new_path, status, action_type):
-        if self.dry_run_var.get(): return
-        file_exists = os.path.exists(log_path)
+    @staticmethod
+    def _read_search_terms_file(filepath, log):
+        terms = []
         try:
-            with open(log_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(['timestamp', 'old_path', 'new_path', 'status', 'action_type', 'details'])
-                writer.writerow([datetime.now().isoformat(), old_path, new_path, status, action_type, ''])
+            with open(filepath, 'r', encoding='utf-8') as f:
+                if filepath.lower().endswith('.csv'):
+                    reader = csv.reader(f)
+                    for row in reader:
+                        if row: terms.append(row[0].strip())
+                else:
+                    terms = [line.strip() for line in f if line.strip()]
         except Exception as e:
-            self.app.log(f"[ERROR] Could not write to log file '{log_path}'. Reason: {e}")
+            log(f"Error reading search terms from file: {e}")
+        return list(dict.fromkeys(terms))
 
     def _browse_folder(self, string_var):
         path = filedialog.askdirectory(title="Select Folder")
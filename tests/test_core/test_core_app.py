@@ -7,7 +7,7 @@ from pyfakefs.fake_filesystem_unittest import TestCase
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from core.app import FileRefactoringGUI
+from core.app import FileRefactoringGUI, BufferedLog
 from core.plugin_manager import PluginManager
 
 @patch('ttkbootstrap.dialogs.Messagebox')
@@ -31,6 +31,35 @@ class TestCoreApp(TestCase):
         with self.assertRaises(TypeError):
             manager.discover_plugins(mock_app)
 
+    def test_manifest_cache_skips_imports(self, mock_messagebox):
+        """Plugins listed in an up-to-date manifest are not imported; changed files are."""
+        plugin_path = f"{self.plugins_dir}/cached_plugin.py"
+        self.fs.create_file(plugin_path, contents="# plugin")
+        stat = os.stat(plugin_path)
+        entry = {'class_name': 'CachedPlugin', 'name': 'Cached', 'value': 'cached', 'rollbackable': True}
+        manager = PluginManager(plugin_folder=self.plugins_dir)
+        manager._write_manifest({'cached_plugin.py': {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'plugins': [entry]}})
+
+        with patch('core.plugin_manager.importlib.import_module') as mock_import:
+            manager.discover_plugin_handles(MagicMock())
+        mock_import.assert_not_called()
+        handle = manager.get_all_plugins()[0]
+        self.assertEqual((handle.get_name(), handle.get_value(), handle.is_rollbackable()), ("Cached", "cached", True))
+        self.assertFalse(handle.is_loaded)
+
+        with open(plugin_path, 'a') as f:
+            f.write("\n# changed")
+        manager = PluginManager(plugin_folder=self.plugins_dir)
+        with patch('core.plugin_manager.importlib.import_module', side_effect=ImportError("changed")) as mock_import:
+            manager.discover_plugin_handles(MagicMock())
+        mock_import.assert_called_once_with("plugins.cached_plugin")
+        # A failed import is not cached, so the next start tries again.
+        self.assertNotIn('cached_plugin.py', manager._read_manifest())
+        manager = PluginManager(plugin_folder=self.plugins_dir)
+        with patch('core.plugin_manager.importlib.import_module', side_effect=ImportError("still missing")) as mock_import:
+            manager.discover_plugin_handles(MagicMock())
+        mock_import.assert_called_once_with("plugins.cached_plugin")
+
     @patch('core.app.TestCenterWindow')
     def test_ui_action_switching(self, mock_test_center, mock_messagebox):
         """Integration test to ensure the GUI correctly switches between plugin frames."""
@@ -64,3 +93,30 @@ class TestCoreApp(TestCase):
         
         mock_frame2.pack.assert_called_once()
         mock_frame1.pack_forget.assert_called_once()
+
+    def test_buffered_log_batches_and_caps_lines(self, mock_messagebox):
+        """The log sink inserts once per flush, keeps the newest lines and writes everything to file."""
+        mock_root = MagicMock()
+        mock_text = MagicMock()
+        sink = BufferedLog(mock_root, mock_text, log_path="/logs/app.log", max_lines=3)
+
+        for i in range(5):
+            sink.write(f"line {i}")
+        mock_root.after.assert_called_once()
+        mock_text.insert.assert_not_called()
+
+        sink.flush()
+        mock_text.insert.assert_called_once()
+        inserted = mock_text.insert.call_args[0][1]
+        self.assertNotIn("line 1", inserted)
+        self.assertIn("line 4", inserted)
+        self.assertEqual(sink.line_count, 3)
+
+        sink.write("line 5")
+        sink.flush()
+        mock_text.delete.assert_called_once_with('1.0', '2.0')
+        self.assertEqual(sink.line_count, 3)
+
+        sink.close()
+        with open("/logs/app.log", encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 6)
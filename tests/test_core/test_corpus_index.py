@@ -0,0 +1,64 @@
+import unittest
+import os
+from unittest.mock import patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core import corpus_index
+from core.corpus_index import CorpusIndex, BloomFilter
+from core.scanner import scan_files
+
+class TestCorpusIndex(TestCase):
+    """Tests for the reference-corpus index used by Find Duplicates."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_file("/archive/2023/report.pdf", contents="quarterly report")
+        self.fs.create_file("/archive/2024/photo.jpg", contents="holiday photo")
+        self.fs.create_file("/drop/report-copy.pdf", contents="quarterly report")
+        self.fs.create_file("/drop/other.pdf", contents="quarterly r3port")
+        self.fs.create_file("/drop/new.txt", contents="a brand new file of another size")
+        self.index = CorpusIndex(":memory:")
+        self.index.refresh("/archive")
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_find_known_reads_only_size_candidates(self):
+        with patch.object(corpus_index, 'partial_hash', wraps=corpus_index.partial_hash) as partial_hash:
+            known = self.index.find_known("/archive", scan_files("/drop"))
+        self.assertEqual(list(known.values()), [["/drop/report-copy.pdf", "/archive/2023/report.pdf"]])
+        self.assertEqual(sorted(call.args[0] for call in partial_hash.call_args_list),
+                         ["/drop/other.pdf", "/drop/report-copy.pdf"])
+
+    def test_refresh_only_hashes_changed_files(self):
+        os.remove("/archive/2024/photo.jpg")
+        self.fs.create_file("/archive/2024/scan.pdf", contents="scanned page")
+        stats = self.index.refresh("/archive")
+        self.assertEqual(stats, {'hashed': 1, 'reused': 1, 'removed': 1})
+        self.assertEqual(len(self.index), 2)
+        self.assertTrue(self.index.has_root("/archive"))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        for value in range(0, 5000, 5):
+            bloom.add(value)
+        self.assertTrue(all(bloom.might_contain(value) for value in range(0, 5000, 5)))
+        false_positives = sum(bloom.might_contain(value) for value in range(1, 5000, 5))
+        self.assertLess(false_positives, 50)
+
+    def test_find_known_only_matches_the_reference_folder(self):
+        self.fs.create_file("/other/report.pdf", contents="quarterly report")
+        self.fs.create_file("/other/new.txt", contents="a brand new file of another size")
+        self.index.refresh("/other")
+        known = self.index.find_known("/archive", scan_files("/drop"))
+        self.assertEqual(list(known.values()), [["/drop/report-copy.pdf", "/archive/2023/report.pdf"]])
+        known = self.index.find_known("/other", scan_files("/drop"))
+        self.assertEqual(list(known.values()), [["/drop/new.txt", "/other/new.txt"], ["/drop/report-copy.pdf", "/other/report.pdf"]])
+        known = self.index.find_known("/archive/2024", scan_files("/drop"))
+        self.assertEqual(known, {})
+
+if __name__ == '__main__':
+    unittest.main()
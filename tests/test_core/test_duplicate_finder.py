@@ -0,0 +1,51 @@
+import unittest
+import os
+from unittest.mock import patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core import duplicate_finder
+from core.duplicate_finder import DuplicateFinder, PARTIAL_CHUNK
+from core.scanner import scan_files
+
+class TestDuplicateFinder(TestCase):
+    """Tests for the staged size -> partial hash -> full hash pipeline."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir("/data")
+
+    def find(self, workers=1):
+        return DuplicateFinder(workers=workers).find(scan_files("/data"))
+
+    def test_only_colliding_files_are_fully_hashed(self):
+        """Files differing only in the middle survive the partial hash and are split by the full hash."""
+        head, tail = b"h" * PARTIAL_CHUNK, b"t" * PARTIAL_CHUNK
+        self.fs.create_file("/data/a.bin", contents=head + b"1" * 1000 + tail)
+        self.fs.create_file("/data/b.bin", contents=head + b"2" * 1000 + tail)
+        self.fs.create_file("/data/c.bin", contents=head + b"1" * 1000 + tail)
+        self.fs.create_file("/data/d.bin", contents=b"x" + head[1:] + b"1" * 1000 + tail)
+        self.fs.create_file("/data/unique.bin", contents=b"no other file has this size")
+
+        with patch.object(duplicate_finder, 'full_hash', wraps=duplicate_finder.full_hash) as full_hash:
+            groups = self.find(workers=2)
+
+        self.assertEqual(list(groups.values()), [["/data/a.bin", "/data/c.bin"]])
+        self.assertEqual(sorted(call.args[0] for call in full_hash.call_args_list),
+                         ["/data/a.bin", "/data/b.bin", "/data/c.bin"])
+
+    def test_small_files_skip_the_full_hash(self):
+        self.fs.create_file("/data/one.txt", contents="same")
+        self.fs.create_file("/data/sub/two.txt", contents="same")
+        self.fs.create_file("/data/three.txt", contents="diff")
+
+        with patch.object(duplicate_finder, 'full_hash') as full_hash:
+            groups = self.find()
+
+        full_hash.assert_not_called()
+        self.assertEqual(list(groups.values()), [["/data/one.txt", "/data/sub/two.txt"]])
+
+if __name__ == '__main__':
+    unittest.main()
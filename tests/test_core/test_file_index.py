@@ -0,0 +1,72 @@
+import unittest
+import os
+import time
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.file_index import FileIndex
+
+class TestFileIndex(TestCase):
+    """Test suite for the persistent file-metadata index."""
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_file("/source/top.txt", contents="12345")
+        self.fs.create_file("/source/a/one.txt")
+        self.fs.create_file("/source/b/two.txt")
+        self.index = FileIndex(":memory:")
+
+    def tearDown(self):
+        self.index.close()
+
+    def _age_folders(self):
+        """Moves folder mtimes out of the 'racy' window so they can be trusted."""
+        old = time.time() - 60
+        for folder in ("/source", "/source/a", "/source/b"):
+            os.utime(folder, (old, old))
+
+    def test_refresh_and_query(self):
+        stats = self.index.refresh("/source")
+        self.assertEqual(stats, {'rescanned': 3, 'reused': 0})
+        paths = [entry.path for entry in self.index.iter_files("/source")]
+        self.assertEqual(sorted(paths), ["/source/a/one.txt", "/source/b/two.txt", "/source/top.txt"])
+        top = next(self.index.iter_files("/source", recursive=False))
+        self.assertEqual((top.name, top.size), ("top.txt", 5))
+
+    def test_incremental_refresh_only_rescans_changed_folders(self):
+        self._age_folders()
+        self.index.refresh("/source")
+        open("/source/a/new.txt", 'w').close()
+        os.remove("/source/b/two.txt")
+        os.rmdir("/source/b")
+        # The fake file system does not update folder mtimes itself.
+        changed = time.time() - 30
+        for folder in ("/source", "/source/a"):
+            os.utime(folder, (changed, changed))
+        stats = self.index.refresh("/source")
+        # '/source' changed (b removed) and '/source/a' changed (new file).
+        self.assertEqual(stats, {'rescanned': 2, 'reused': 0})
+        paths = sorted(entry.path for entry in self.index.iter_files("/source"))
+        self.assertEqual(paths, ["/source/a/new.txt", "/source/a/one.txt", "/source/top.txt"])
+
+    def test_unchanged_tree_is_reused(self):
+        self._age_folders()
+        self.index.refresh("/source")
+        self.assertEqual(self.index.refresh("/source"), {'rescanned': 0, 'reused': 3})
+
+    def test_recursive_refresh_after_flat_refresh_lists_subfolders(self):
+        self._age_folders()
+        self.index.refresh("/source", recursive=False)
+        stats = self.index.refresh("/source")
+        self.assertEqual(stats, {'rescanned': 2, 'reused': 1})
+        paths = [entry.path for entry in self.index.iter_files("/source")]
+        self.assertEqual(sorted(paths), ["/source/a/one.txt", "/source/b/two.txt", "/source/top.txt"])
+
+    def test_run_journal_folder_is_not_indexed(self):
+        """The change log's journal folder is left out, as it is by scan_files."""
+        self.fs.create_file("/source/file_name_change_log.journal/runs.json")
+        self.fs.create_file("/source/file_name_change_log.journal/run.jsonl")
+        self.index.refresh("/source")
+        paths = sorted(entry.path for entry in self.index.iter_files("/source"))
+        self.assertEqual(paths, ["/source/a/one.txt", "/source/b/two.txt", "/source/top.txt"])
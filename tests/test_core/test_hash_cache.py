@@ -0,0 +1,71 @@
+import unittest
+import os
+import time
+from unittest.mock import patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core import duplicate_finder
+from core.duplicate_finder import DuplicateFinder, PARTIAL_CHUNK
+from core.hash_cache import HashCache, file_identity
+from core.scanner import scan_files
+
+class TestHashCache(TestCase):
+    """Tests for the persistent content-hash cache used by DuplicateFinder."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        body = b"b" * (3 * PARTIAL_CHUNK)
+        for name in ("a.bin", "b.bin", "c.bin"):
+            self.fs.create_file(f"/data/{name}", contents=body)
+        self._age("/data/a.bin", "/data/b.bin", "/data/c.bin")
+        self.cache = HashCache(":memory:")
+
+    def tearDown(self):
+        self.cache.close()
+
+    def _age(self, *paths):
+        """Moves file mtimes out of the 'racy' window so their hashes are cached."""
+        old = time.time() - 60
+        for path in paths:
+            os.utime(path, (old, old))
+
+    def find(self):
+        groups = DuplicateFinder(cache=self.cache).find(scan_files("/data"))
+        self.cache.flush()
+        return groups
+
+    def test_unchanged_files_are_not_read_again(self):
+        first = self.find()
+        with patch.object(duplicate_finder, 'partial_hash') as partial_hash, \
+             patch.object(duplicate_finder, 'full_hash') as full_hash:
+            second = self.find()
+        partial_hash.assert_not_called()
+        full_hash.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_changed_file_is_hashed_again(self):
+        self.find()
+        with open("/data/c.bin", 'r+b') as f:
+            f.seek(PARTIAL_CHUNK + 1)
+            f.write(b"x")
+        self._age("/data/c.bin")
+        with patch.object(duplicate_finder, 'full_hash', wraps=duplicate_finder.full_hash) as full_hash:
+            groups = self.find()
+        self.assertEqual([call.args[0] for call in full_hash.call_args_list], ["/data/c.bin"])
+        self.assertEqual(list(groups.values()), [["/data/a.bin", "/data/b.bin"]])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_entries = 2
+        entries = {entry.name: entry for entry in scan_files("/data")}
+        for name in ("a.bin", "b.bin", "c.bin"):
+            self.cache.put(file_identity(entries[name]), 'full', name)
+            self.cache.flush()
+            self.cache._run_stamp += 1
+        self.assertIsNone(self.cache.get(file_identity(entries["a.bin"]), 'full'))
+        self.assertEqual(self.cache.get(file_identity(entries["c.bin"]), 'full'), "c.bin")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+from unittest.mock import MagicMock, patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.interfaces import ActionContext
+from core.headless import load_plugin_class, coerce_params, run_action
+from plugins.organize_plugin import OrganizePlugin
+
+class TestHeadless(TestCase):
+    """Test suite for running plugin actions without the GUI."""
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.source_dir = "/source"
+        self.fs.create_dir(self.source_dir)
+        self.messages = []
+
+    def test_run_without_tk(self):
+        """An action runs from a plain dict and reports a structured result."""
+        self.fs.create_file(os.path.join(self.source_dir, "a-b.txt"))
+        self.fs.create_file(os.path.join(self.source_dir, "plain.txt"))
+        result = run_action("organize", {'source_folder': self.source_dir}, log=self.messages.append)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.scanned_count, 2)
+        self.assertEqual(result.success_count, 1)
+        self.assertEqual(result.skipped_count, 1)
+        self.assertEqual(result.operations, [("/source/a-b.txt", "/source/a/b.txt")])
+        self.assertTrue(os.path.exists("/source/a/b.txt"))
+        self.assertIn("SKIPPING 'plain.txt': No delimiter found.", self.messages)
+
+    def test_critical_error_is_recorded(self):
+        """Unexpected errors end up in result.error instead of propagating."""
+        result = OrganizePlugin.run({'source_folder': "/missing", 'recursive': False}, ActionContext(log=self.messages.append))
+        self.assertIsNotNone(result.error)
+
+    def test_param_coercion(self):
+        """String parameters are converted using the type of each default."""
+        plugin_class = load_plugin_class("organize")
+        self.assertIs(plugin_class, OrganizePlugin)
+        params = coerce_params(plugin_class, ["source_folder=/source", "recursive=false", "dry_run=1"])
+        self.assertEqual(params, {'source_folder': "/source", 'recursive': False, 'dry_run': True})
+        with self.assertRaises(ValueError):
+            coerce_params(plugin_class, ["no_such_param=1"])
+    @patch('ttkbootstrap.localization.MessageCatalog.translate', side_effect=lambda text: text)
+    @patch('ttkbootstrap.dialogs.Messagebox.yesno')
+    def test_ask_yes_no_only_proceeds_on_yes(self, mock_yesno, mock_translate):
+        """yesno returns the label of the button pressed, so "No" and closing the dialog both cancel."""
+        app = MagicMock()
+        plugin = OrganizePlugin(app)
+        for answer, expected in (("No", False), (None, False), ("Yes", True)):
+            mock_yesno.return_value = answer
+            self.assertEqual(plugin.ask_yes_no("Continue?", "Confirm", "Cancelled by user."), expected, answer)
+        mock_yesno.assert_called_with("Continue?", "Confirm")
+        self.assertEqual(app.log.call_count, 2)
+
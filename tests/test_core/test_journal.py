@@ -0,0 +1,117 @@
+import unittest
+import os
+import csv
+from unittest.mock import patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.journal import ChangeJournal, RunJournal, JournalWriteError, JOURNAL_HEADER, journal_dir_for, read_lines_reversed, read_csv_reversed
+
+class TestChangeJournal(TestCase):
+    """Test suite for the buffered change-journal writer."""
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir("/source")
+        self.log_path = "/source/file_name_change_log.csv"
+
+    def _read_rows(self):
+        with open(self.log_path, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+
+    def test_rows_are_buffered_until_batch_is_full(self):
+        """Nothing is written (or created) until a batch fills; close flushes the rest."""
+        journal = ChangeJournal(self.log_path, batch_size=3, flush_interval=60)
+        journal.record("/source/a", "/dest/a", "success", "organize")
+        journal.record("/source/b", "/dest/b", "success", "organize")
+        self.assertFalse(os.path.exists(self.log_path))
+        journal.record("/source/c", "/dest/c", "failure - boom", "organize")
+        self.assertEqual(len(self._read_rows()), 4)
+        journal.record("/source/d", "/dest/d", "success", "organize")
+        journal.close()
+        rows = self._read_rows()
+        self.assertEqual(rows[0], JOURNAL_HEADER)
+        self.assertEqual([row[1] for row in rows[1:]], ["/source/a", "/source/b", "/source/c", "/source/d"])
+        self.assertEqual(rows[3][3], "failure - boom")
+
+    def test_appending_runs_share_one_header(self):
+        """A second run appends to an existing log without repeating the header."""
+        for durability in ('batch', 'op'):
+            with ChangeJournal(self.log_path, durability=durability) as journal:
+                journal.record("/source/a", "/dest/a", "success", "replace")
+        rows = self._read_rows()
+        self.assertEqual(rows.count(JOURNAL_HEADER), 1)
+        self.assertEqual(len(rows), 3)
+
+    def test_unknown_durability_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ChangeJournal(self.log_path, durability="sometimes")
+
+    def test_run_journal_records_runs_and_imports_legacy_log(self):
+        """Rows go to a per-run segment; a change log that predates the journal becomes a 'legacy' run."""
+        self.fs.create_file(self.log_path, contents=(
+            "timestamp,old_path,new_path,status,action_type,details\n"
+            "2024-01-01T00:00:00,/source/x,/dest/x,success,organize,\n"))
+        with ChangeJournal(self.log_path, 'replace', {'find': 'a'}) as journal:
+            journal.record("/source/a", "/dest/a", "success", "replace")
+            journal.record("/source/b", "/dest/b", "success", "replace")
+        runs = RunJournal(journal_dir_for(self.log_path))
+        by_id = {run['run_id']: run for run in runs.runs()}
+        self.assertEqual(by_id['legacy']['op_count'], 1)
+        run = by_id[journal.run_id]
+        self.assertEqual((run['plugin'], run['op_count']), ('replace', 2))
+        self.assertEqual(runs.read_header(run)['params'], {'find': 'a'})
+        self.assertNotIn('params', run)
+        self.assertEqual([op['old_path'] for op in runs.iter_ops_reversed(run)], ["/source/b", "/source/a"])
+        runs.mark_reverted(journal.run_id, [2])
+        run = {r['run_id']: r for r in runs.runs()}[journal.run_id]
+        self.assertEqual([op['seq'] for op in runs.iter_ops_reversed(run)], [1])
+
+    def test_read_lines_reversed_across_blocks(self):
+        lines = [f"line {i}" for i in range(50)]
+        self.fs.create_file("/source/lines.txt", contents="\n".join(lines) + "\n")
+        self.assertEqual(list(read_lines_reversed("/source/lines.txt", block_size=7)), lines[::-1])
+
+    def test_read_csv_reversed_joins_multiline_fields(self):
+        with ChangeJournal(self.log_path, log=lambda message: None) as journal:
+            journal.record("/source/a", "/dest/a", "success", "rename")
+            journal.record("/source/b", "/dest/b", "failure - first\nsecond", "rename")
+            journal.record("/source/c", "/dest/c", "success", "rename")
+        rows = [row for _, row in read_csv_reversed(self.log_path, block_size=16)]
+        self.assertEqual([row['old_path'] for row in rows], ["/source/c", "/source/b", "/source/a"])
+        self.assertEqual(rows[1]['status'], "failure - first\nsecond")
+    def test_failed_write_keeps_rows_pending(self):
+        """A failed write raises and keeps the rows; the retry writes each row once to the log and the journal."""
+        journal = ChangeJournal(self.log_path, batch_size=2, flush_interval=60, log=lambda message: None)
+        journal.record("/source/a", "/dest/a", "success", "organize")
+        with patch.object(journal, '_write_segment', side_effect=OSError("No space left on device")):
+            with self.assertRaises(JournalWriteError):
+                journal.record("/source/b", "/dest/b", "success", "organize")
+        journal.record("/source/c", "/dest/c", "success", "organize")
+        journal.close()
+        self.assertEqual([row[1] for row in self._read_rows()[1:]], ["/source/a", "/source/b", "/source/c"])
+        run = RunJournal(journal_dir_for(self.log_path)).runs()[0]
+        self.assertEqual([op['seq'] for op in RunJournal(journal_dir_for(self.log_path)).iter_ops_reversed(run)], [3, 2, 1])
+
+    def test_marking_reverted_ops_leaves_the_index_alone(self):
+        """Rolled-back ranges are appended next to the segment; runs.json is not rewritten per batch."""
+        with ChangeJournal(self.log_path, 'organize', {'terms': ['x'] * 1000}, log=lambda message: None) as journal:
+            for i in range(6):
+                journal.record(f"/source/{i}", f"/dest/{i}", "success", "organize")
+        runs = RunJournal(journal_dir_for(self.log_path))
+        with open(runs.index_path, 'rb') as f:
+            index = f.read()
+        self.assertNotIn(b'terms', index)
+        runs.mark_reverted(journal.run_id, [6, 5])
+        runs.mark_reverted(journal.run_id, [4])
+        with open(runs.index_path, 'rb') as f:
+            self.assertEqual(f.read(), index)
+        run = runs.runs()[0]
+        self.assertEqual(runs.reverted_ranges(run), [[4, 6]])
+        # An index written before the '.reverted' file existed kept the ranges inline.
+        self.assertEqual([op['seq'] for op in runs.iter_ops_reversed({**run, 'reverted': [[1, 2]]})], [3])
+
+
+if __name__ == '__main__':
+    unittest.main()
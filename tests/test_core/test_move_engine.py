@@ -0,0 +1,64 @@
+import unittest
+import os
+import shutil
+import threading
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.move_engine import DeviceMap, copy_across, move_file
+from core.move_planner import plan_moves
+
+class TestMoveEngine(TestCase):
+    """Test suite for the device-aware move engine."""
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.add_mount_point("/other")
+        self.fs.create_file("/work/a.txt", contents="a" * 100)
+
+    def test_cross_device_copy_is_verified_and_never_overwrites(self):
+        """A copy across devices keeps contents and mtime, removes the source, and refuses an existing target."""
+        os.utime("/work/a.txt", (1000, 1000))
+        self.assertTrue(DeviceMap().crosses_device("/work/a.txt", "/other/new/a.txt"))
+        self.assertFalse(DeviceMap().crosses_device("/work/a.txt", "/work/new/a.txt"))
+        os.makedirs("/other/new")
+        copy_across("/work/a.txt", "/other/new/a.txt")
+        with open("/other/new/a.txt") as f:
+            self.assertEqual(f.read(), "a" * 100)
+        self.assertEqual(os.stat("/other/new/a.txt").st_mtime, 1000)
+        self.assertFalse(os.path.exists("/work/a.txt"))
+
+        self.fs.create_file("/work/b.txt", contents="new")
+        with self.assertRaises(FileExistsError):
+            copy_across("/work/b.txt", "/other/new/a.txt")
+        self.assertTrue(os.path.exists("/work/b.txt"))
+
+        move_file("/work/b.txt", "/work/sub/b.txt")
+        self.assertTrue(os.path.exists("/work/sub/b.txt"))
+
+    def test_parallel_run_keeps_order_and_dependencies(self):
+        """Cross-device moves run on the pool, same-device renames in order, and results arrive in plan order."""
+        moves = [(f"/work/f{i}.txt", f"/other/f{i}.txt") for i in range(10)]
+        for src, _ in moves:
+            self.fs.create_file(src)
+        # A cross-device move out of a.txt must finish before a.txt is reused.
+        moves += [("/work/a.txt", "/other/a.txt"), ("/work/f0.moved", "/work/a.txt")]
+        self.fs.create_file("/work/f0.moved", contents="f0")
+        plan = plan_moves(moves)
+        threads = {}
+        def mover(src, dst):
+            threads[src] = threading.current_thread().name
+            shutil.move(src, dst)
+        reported = []
+        plan.run(lambda step, error: reported.append((step.src, error)), mover=mover, workers=4)
+        self.assertEqual([src for src, _ in reported], [step.src for step in plan.steps])
+        self.assertTrue(all(error is None for _, error in reported))
+        self.assertTrue(threads["/work/f1.txt"].startswith("move"))
+        self.assertEqual(threads["/work/f0.moved"], threading.current_thread().name)
+        with open("/work/a.txt") as f:
+            self.assertEqual(f.read(), "f0")
+        self.assertEqual(len(os.listdir("/other")), 11)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.move_planner import plan_moves, MoveBlocked, DUPLICATE_TARGET, TARGET_EXISTS, TARGET_NOT_VACATED
+
+class TestMovePlanner(TestCase):
+    """Test suite for the global move planner."""
+    def setUp(self):
+        self.setUpPyfakefs()
+        for name in ("a", "b", "c", "d", "kept"):
+            self.fs.create_file(f"/work/{name}.txt", contents=name)
+
+    def _run(self, plan):
+        outcomes = []
+        plan.run(lambda step, error: outcomes.append((step, error)))
+        return outcomes
+
+    def _contents(self, name):
+        with open(f"/work/{name}.txt") as f:
+            return f.read()
+
+    def test_chain_and_swap_are_ordered_and_executed(self):
+        """A chain runs from its free end; a swap goes through a temporary name."""
+        plan = plan_moves([
+            ("/work/a.txt", "/work/b.txt"), ("/work/b.txt", "/work/e.txt"),   # chain a -> b -> e
+            ("/work/c.txt", "/work/d.txt"), ("/work/d.txt", "/work/c.txt"),   # swap
+        ])
+        self.assertEqual(plan.conflicts, [])
+        self.assertEqual(len(plan.steps), 5)
+        self.assertTrue(all(error is None for _, error in self._run(plan)))
+        self.assertEqual((self._contents("b"), self._contents("e")), ("a", "b"))
+        self.assertEqual((self._contents("c"), self._contents("d")), ("d", "c"))
+        self.assertFalse(os.path.exists("/work/a.txt"))
+        self.assertEqual(sorted(os.listdir("/work")), ["b.txt", "c.txt", "d.txt", "e.txt", "kept.txt"])
+
+    def test_conflicts_are_found_before_anything_moves(self):
+        """Duplicate targets and existing files are rejected, and rejections cascade."""
+        plan = plan_moves([
+            ("/work/a.txt", "/work/new.txt"),
+            ("/work/b.txt", "/work/new.txt"),    # duplicate target
+            ("/work/c.txt", "/work/kept.txt"),   # clashes with an existing file
+            ("/work/d.txt", "/work/c.txt"),      # c.txt stays, so this cannot run either
+        ])
+        reasons = {src: reason for src, _, reason in plan.conflicts}
+        self.assertEqual(reasons, {"/work/b.txt": DUPLICATE_TARGET, "/work/c.txt": TARGET_EXISTS, "/work/d.txt": TARGET_NOT_VACATED})
+        self.assertEqual(plan.moves, [("/work/a.txt", "/work/new.txt")])
+
+    def test_failed_step_blocks_dependents(self):
+        """If a move out of a path fails, the move into that path is not attempted."""
+        plan = plan_moves([("/work/a.txt", "/work/b.txt"), ("/work/b.txt", "/work/e.txt")])
+        def mover(src, dst):
+            if src == "/work/b.txt":
+                raise OSError("denied")
+        outcomes = []
+        plan.run(lambda step, error: outcomes.append((step.src, error)), mover=mover)
+        self.assertIsInstance(outcomes[0][1], OSError)
+        self.assertEqual(outcomes[1][0], "/work/a.txt")
+        self.assertIsInstance(outcomes[1][1], MoveBlocked)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.name_similarity import normalize_name, find_similar_names
+
+class Entry:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+
+class TestNameSimilarity(unittest.TestCase):
+    """Tests for near-duplicate filename grouping."""
+
+    def test_normalize_removes_case_punctuation_and_copy_markers(self):
+        for name in ("report_final.pdf", "report final (1).pdf", "Report-Final-copy.pdf",
+                     "report_final - Copy (2).pdf", "Copy of Report Final.pdf"):
+            self.assertEqual(normalize_name(name), "report final", name)
+        self.assertEqual(normalize_name("photocopy.pdf"), "photocopy")
+
+    def test_groups_are_ranked_by_similarity(self):
+        paths = ["/a/report_final.pdf", "/b/report final (1).pdf", "/b/Report-Final-copy.pdf",
+                 "/a/quarterly_budget_summary.xlsx", "/b/quarterly budget summry.xlsx",
+                 "/a/report_final.docx", "/a/holiday.jpg", "/a/invoice.pdf"]
+        groups = find_similar_names([Entry(path) for path in paths], similarity=60)
+        self.assertEqual(list(groups.values()), [
+            ["/a/report_final.pdf", "/b/Report-Final-copy.pdf", "/b/report final (1).pdf"],
+            ["/a/quarterly_budget_summary.xlsx", "/b/quarterly budget summry.xlsx"],
+        ])
+        self.assertTrue(list(groups)[0].startswith("report final.pdf (100%"))
+    def test_sequential_names_are_not_chained(self):
+        """Camera names one second apart differ only in their numbers and are not grouped."""
+        paths = [f"/dcim/IMG_20240101_{hour:02d}{minute:02d}00.jpg" for hour in range(4) for minute in range(60)]
+        paths += ["/dcim/IMG_20240101_000000 (1).jpg", "/dcim/IMG_20240101_000000_edited.jpg"]
+        groups = find_similar_names([Entry(path) for path in paths])
+        self.assertEqual(list(groups.values()), [["/dcim/IMG_20240101_000000 (1).jpg", "/dcim/IMG_20240101_000000.jpg"]])
+
+    def test_names_join_the_group_of_their_representative(self):
+        """A name similar to a member but not to the group's representative is not chained into the group."""
+        paths = ["/a/annual report.pdf", "/b/annual report.pdf", "/a/annual reports.pdf", "/a/annual reports final.pdf"]
+        groups = find_similar_names([Entry(path) for path in paths], similarity=70)
+        self.assertEqual(list(groups.values()), [["/a/annual report.pdf", "/a/annual reports.pdf", "/b/annual report.pdf"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
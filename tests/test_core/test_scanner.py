@@ -0,0 +1,50 @@
+import unittest
+import os
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.scanner import scan_files
+
+class TestScanner(TestCase):
+    """Test suite for the shared scandir-based file scanner."""
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.source_dir = "/source"
+        self.fs.create_file("/source/top.txt", contents="12345")
+        self.fs.create_file("/source/a/one.txt")
+        self.fs.create_file("/source/a/deep/two.txt")
+        self.fs.create_file("/source/b/three.txt")
+        self.fs.create_file("/source/file_name_change_log.journal/runs.json")
+
+    def test_recursive_matches_os_walk(self):
+        """Recursive mode returns the same files as os.walk (listing order is not guaranteed), minus the run journal."""
+        expected = [os.path.join(root, name) for root, _, files in os.walk(self.source_dir) for name in files
+                    if "file_name_change_log.journal" not in root]
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(sorted(entry.path for entry in scan_files(self.source_dir)), sorted(expected))
+
+    def test_flat_mode_and_cached_stat(self):
+        """Flat mode skips subfolders; entries expose size, mtime and their parent folder."""
+        entries = list(scan_files(self.source_dir, recursive=False))
+        self.assertEqual([entry.name for entry in entries], ["top.txt"])
+        self.assertEqual(entries[0].root, self.source_dir)
+        self.assertEqual(entries[0].size, 5)
+        self.assertEqual(entries[0].mtime, os.stat("/source/top.txt").st_mtime)
+
+    def test_missing_folder_raises(self):
+        with self.assertRaises(OSError):
+            list(scan_files("/missing"))
+
+    def test_parallel_modes_find_the_same_files(self):
+        """Threaded scans return the same files; ordered mode keeps each subtree together (depth-first)."""
+        expected = sorted(entry.path for entry in scan_files(self.source_dir))
+        ordered = [entry.path for entry in scan_files(self.source_dir, workers=4, prefetch_stat=True)]
+        unordered = [entry.path for entry in scan_files(self.source_dir, workers=4, ordered=False)]
+        self.assertEqual(sorted(ordered), expected)
+        self.assertEqual(sorted(unordered), expected)
+        self.assertEqual(ordered[0], "/source/top.txt")
+        self.assertEqual(ordered.index("/source/a/deep/two.txt"), ordered.index("/source/a/one.txt") + 1)
+        with self.assertRaises(OSError):
+            list(scan_files("/missing", workers=4))
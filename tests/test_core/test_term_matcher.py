@@ -0,0 +1,35 @@
+import unittest
+import os
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from core.term_matcher import TermMatcher, PrefixTrie
+
+class TestTermMatcher(unittest.TestCase):
+    """Test suite for the multi-term matcher."""
+
+    def test_matches_agree_with_substring_search(self):
+        """Overlapping and nested terms are all found, case-insensitively."""
+        terms = ["he", "she", "his", "hers", "Report", "port", "ORT-2", ""]
+        matcher = TermMatcher(terms)
+        for text in ["ushers", "Annual-REPORT-2024.pdf", "this", "nothing", "", "hishe"]:
+            expected = [i for i, term in enumerate(terms) if term and term.lower() in text.lower()]
+            self.assertEqual(matcher.find_all(text), expected, text)
+            self.assertEqual(matcher.first_match(text), expected[0] if expected else None, text)
+
+    def test_first_listed_term_wins(self):
+        self.assertEqual(TermMatcher(["Report", "Project"]).first_match("Project-Alpha-Report.docx"), 0)
+        self.assertEqual(TermMatcher(["Alpha-Report", "Alpha"]).first_match("Project-Alpha-Report.docx"), 0)
+        self.assertEqual(TermMatcher(["Alpha", "Alpha-Report"]).first_match("Project-Alpha-Report.docx"), 0)
+
+    def test_prefix_trie_picks_the_longest_key(self):
+        trie = PrefixTrie([("report", "monthly"), ("report_final", "archive"), ("rep", "misc")])
+        self.assertEqual(trie.longest_prefix("report_final_v2"), ("report_final", "archive"))
+        self.assertEqual(trie.longest_prefix("report2024"), ("report", "monthly"))
+        self.assertEqual(trie.longest_prefix("repo"), ("rep", "misc"))
+        self.assertIsNone(trie.longest_prefix("Report2024"))
+        self.assertEqual(len(trie), 3)
+
+if __name__ == '__main__':
+    unittest.main()
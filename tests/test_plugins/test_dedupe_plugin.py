@@ -0,0 +1,47 @@
+import unittest
+import os
+from unittest.mock import patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from plugins.dedupe_plugin import DedupePlugin
+from plugins.rollback_plugin import RollbackPlugin
+
+@patch('ttkbootstrap.dialogs.Messagebox')
+class TestDedupePlugin(TestCase):
+    """Test suite for the DedupePlugin."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.source_dir = "/source"
+        self.fs.create_file("/source/a/photo.jpg", contents="same picture")
+        self.fs.create_file("/source/b/photo-copy.jpg", contents="same picture")
+        self.fs.create_file("/source/b/other.jpg", contents="else picture")
+
+    def test_link_duplicates_then_roll_back(self, mock_messagebox):
+        result = DedupePlugin.run({'source_folder': self.source_dir}, None)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.success_count, 1)
+        self.assertTrue(os.path.samefile("/source/a/photo.jpg", "/source/b/photo-copy.jpg"))
+        self.assertFalse(os.path.samefile("/source/a/photo.jpg", "/source/b/other.jpg"))
+
+        again = DedupePlugin.run({'source_folder': self.source_dir}, None)
+        self.assertEqual((again.success_count, again.skipped_count), (0, 1))
+
+        rollback = RollbackPlugin.run({'source_folder': self.source_dir}, None)
+        self.assertEqual(rollback.success_count, 1)
+        self.assertFalse(os.path.samefile("/source/a/photo.jpg", "/source/b/photo-copy.jpg"))
+        with open("/source/b/photo-copy.jpg") as f:
+            self.assertEqual(f.read(), "same picture")
+
+    def test_dry_run_changes_nothing(self, mock_messagebox):
+        result = DedupePlugin.run({'source_folder': self.source_dir, 'dry_run': True}, None)
+        self.assertEqual(result.success_count, 1)
+        self.assertEqual(result.data['reclaimed_bytes'], len("same picture"))
+        self.assertFalse(os.path.samefile("/source/a/photo.jpg", "/source/b/photo-copy.jpg"))
+        self.assertFalse(os.path.exists("/source/file_name_change_log.csv"))
+
+if __name__ == '__main__':
+    unittest.main()
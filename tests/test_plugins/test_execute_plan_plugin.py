@@ -0,0 +1,62 @@
+import unittest
+import os
+from unittest.mock import MagicMock, patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from plugins.collapse_plugin import CollapsePlugin
+from plugins.execute_plan_plugin import ExecutePlanPlugin
+from plugins.organize_plugin import OrganizePlugin
+from plugins.rollback_plugin import RollbackPlugin
+from core.saved_plan import SavedPlan, list_plans
+
+@patch('ttkbootstrap.dialogs.Messagebox')
+class TestExecutePlanPlugin(TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.source_dir = "/source"
+        self.plan_path = "/plans/organize.plan.jsonl"
+        self.fs.create_file("/source/a-one.txt", contents="one")
+        self.fs.create_file("/source/b-two.txt", contents="two")
+
+    def test_dry_run_plan_is_executed_without_rescanning(self, mock_messagebox):
+        """The saved plan moves unchanged files, skips changed ones, and can be rolled back."""
+        result = OrganizePlugin.run({'source_folder': self.source_dir, 'delimiter': '-', 'dry_run': True, 'plan_file': self.plan_path}, None)
+        self.assertEqual(result.outputs, [self.plan_path])
+        self.assertTrue(os.path.exists("/source/a-one.txt"))
+        saved = SavedPlan(self.plan_path)
+        self.assertEqual((saved.action, saved.summary['moves']), ('organize', 2))
+
+        with open("/source/b-two.txt", "a") as f:
+            f.write(" edited")
+        self.fs.create_file("/source/c-three.txt")   # not in the plan, so never scanned
+        result = ExecutePlanPlugin.run({'plan_file': self.plan_path}, None)
+        self.assertEqual((result.success_count, result.failure_count), (1, 1))
+        self.assertTrue(os.path.exists("/source/a/one.txt"))
+        self.assertTrue(os.path.exists("/source/b-two.txt"))
+        self.assertTrue(os.path.exists("/source/c-three.txt"))
+
+        result = RollbackPlugin.run({'source_folder': self.source_dir}, None)
+        self.assertEqual(result.success_count, 1)
+        self.assertTrue(os.path.exists("/source/a-one.txt"))
+
+    def test_default_location_and_finish_step(self, mock_messagebox):
+        """Without a plan_file the plan goes to the plans folder; Collapse's folder cleanup runs after the plan."""
+        self.fs.create_file("/parent/sub/deep.txt")
+        CollapsePlugin.run({'collapse_folder': "/parent", 'dry_run': True}, None)
+        plans = list_plans()
+        self.assertEqual(len(plans), 1)
+        result = ExecutePlanPlugin.run({'plan_file': plans[0]}, None)
+        self.assertEqual(result.success_count, 1)
+        self.assertTrue(os.path.exists("/parent/sub_deep.txt"))
+        self.assertFalse(os.path.exists("/parent/sub"))
+
+    def test_incomplete_plan_is_refused(self, mock_messagebox):
+        self.fs.create_file(self.plan_path, contents='{"type": "header", "version": 1, "action": "organize"}\n')
+        result = ExecutePlanPlugin.run({'plan_file': self.plan_path}, None)
+        self.assertIn("incomplete", result.error)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -55,3 +55,14 @@ class TestFindDuplicatesPlugin(TestCase):
         dupes_hash = mock_show_results.call_args[0][0]
         self.assertEqual(len(dupes_hash), 1)
         self.assertIn("/source/monthly.dat", list(dupes_hash.values())[0])
+
+    def test_similar_names_method(self, mock_messagebox):
+        """Near-duplicate names are grouped even when sizes and contents differ."""
+        self.fs.create_file("/source/report_final.pdf", contents="v1")
+        self.fs.create_file("/source/sub/Report-Final (1).pdf", contents="version 2")
+        self.fs.create_file("/source/invoice.pdf", contents="v1")
+
+        result = FindDuplicatesPlugin.run({'source_folder': self.source_dir, 'method': 'fuzzy_name'}, None)
+
+        self.assertEqual(list(result.data['duplicates'].values()),
+                         [["/source/report_final.pdf", "/source/sub/Report-Final (1).pdf"]])
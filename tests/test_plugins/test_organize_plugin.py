@@ -47,4 +47,15 @@ class TestOrganizePlugin(TestCase):
         self.fs.create_file(os.path.join(self.source_dir, "root-f.txt"))
         plugin.recursive_var.set(True)
         plugin.execute()
-        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "sub", "f.txt")))
\ No newline at end of file
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "sub", "f.txt")))
+    def test_run_stops_when_the_change_log_cannot_be_written(self, mock_messagebox):
+        self.fs.create_file(os.path.join(self.source_dir, "a-one.txt"))
+        self.fs.create_file(os.path.join(self.source_dir, "b-two.txt"))
+        with patch('core.journal.ChangeJournal._write_segment', side_effect=OSError("No space left on device")):
+            result = OrganizePlugin.run({'source_folder': self.source_dir, 'output_folder': self.output_dir, 'journal_durability': 'op'}, None)
+        self.assertIn("Could not write to log file", result.error)
+        # The first move is in the CSV log; the second file is never touched.
+        self.assertEqual(result.success_count, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "a", "one.txt")))
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "b-two.txt")))
+
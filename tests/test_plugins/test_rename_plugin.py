@@ -8,6 +8,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from plugins.rename_plugin import RenamePlugin
+from core.move_planner import TARGET_EXISTS
 
 @patch('ttkbootstrap.dialogs.Messagebox')
 class TestRenamePlugin(TestCase):
@@ -41,4 +42,76 @@ class TestRenamePlugin(TestCase):
         plugin.execute()
         self.assertTrue(os.path.exists(os.path.join(self.test_dir, "r.txt")))
         self.mock_app.log.assert_any_call("SKIPPING row 2: Missing original or new filename.")
-        self.mock_app.log.assert_any_call("SKIPPING row 4: Missing original or new filename.")
\ No newline at end of file
+        self.mock_app.log.assert_any_call("SKIPPING row 4: Missing original or new filename.")
+
+    def test_swap_is_planned_and_rolled_back(self, mock_messagebox):
+        """A mapping that swaps two names runs through a temporary name and can be rolled back."""
+        from plugins.rollback_plugin import RollbackPlugin
+        self.fs.create_file(os.path.join(self.test_dir, "a.txt"), contents="a")
+        self.fs.create_file(os.path.join(self.test_dir, "b.txt"), contents="b")
+        csv_path = "/swap.csv"
+        with open(csv_path, 'w', newline='') as f:
+            w=csv.writer(f); w.writerow(['original_filename','new_filename']); w.writerow(['a.txt','b.txt']); w.writerow(['b.txt','a.txt'])
+        result = RenamePlugin.run({'source_folder': self.test_dir, 'csv_path': csv_path}, None)
+        self.assertEqual((result.success_count, result.failure_count), (2, 0))
+        with open(os.path.join(self.test_dir, "a.txt")) as f:
+            self.assertEqual(f.read(), "b")
+        RollbackPlugin.run({'source_folder': self.test_dir}, None)
+        with open(os.path.join(self.test_dir, "a.txt")) as f:
+            self.assertEqual(f.read(), "a")
+        with open(os.path.join(self.test_dir, "b.txt")) as f:
+            self.assertEqual(f.read(), "b")
+
+    def test_recursive_mapping_uses_name_index(self, mock_messagebox):
+        """Nested files are renamed where they are; names found in several folders are reported."""
+        self.fs.create_file(os.path.join(self.test_dir, "2023", "q1", "inv-001.pdf"))
+        self.fs.create_file(os.path.join(self.test_dir, "2023", "dup.txt"))
+        self.fs.create_file(os.path.join(self.test_dir, "2024", "dup.txt"))
+        csv_path = "/nested.csv"
+        with open(csv_path, 'w', newline='') as f:
+            w=csv.writer(f); w.writerow(['original_filename','new_filename']); w.writerow(['inv-001.pdf','invoice-001.pdf']); w.writerow(['dup.txt','x.txt']); w.writerow(['gone.txt','y.txt'])
+        result = RenamePlugin.run({'source_folder': self.test_dir, 'csv_path': csv_path, 'recursive': True}, None)
+        self.assertEqual((result.success_count, result.failure_count), (1, 2))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "2023", "q1", "invoice-001.pdf")))
+        self.assertIn("Ambiguous", dict(result.failures)["dup.txt"])
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "2024", "dup.txt")))
+
+    def write_mapping(self, csv_path, *rows):
+        with open(csv_path, 'w', newline='') as f:
+            w=csv.writer(f); w.writerow(['original_filename','new_filename']); w.writerows(rows)
+
+    def test_existing_target_is_a_conflict(self, mock_messagebox):
+        """A target already in the folder listing is not overwritten."""
+        self.fs.create_file(os.path.join(self.test_dir, "a.txt"), contents="a")
+        self.fs.create_file(os.path.join(self.test_dir, "b.txt"), contents="b")
+        self.write_mapping("/clash.csv", ['a.txt', 'b.txt'])
+        result = RenamePlugin.run({'source_folder': self.test_dir, 'csv_path': "/clash.csv"}, None)
+        self.assertEqual((result.success_count, result.failure_count), (0, 1))
+        self.assertEqual(result.failures, [(os.path.join(self.test_dir, "a.txt"), TARGET_EXISTS)])
+        with open(os.path.join(self.test_dir, "b.txt")) as f:
+            self.assertEqual(f.read(), "b")
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "a.txt")))
+
+    def test_missing_source_is_not_found(self, mock_messagebox):
+        self.write_mapping("/missing.csv", ['gone.txt', 'new.txt'])
+        result = RenamePlugin.run({'source_folder': self.test_dir, 'csv_path': "/missing.csv"}, None)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.failures, [(os.path.join(self.test_dir, "gone.txt"), "File not found.")])
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "new.txt")))
+
+    def test_mixed_mapping_moves_and_journal(self, mock_messagebox):
+        """Good rows are renamed and journaled; conflicts, missing files and blank rows are only reported."""
+        for name in ("one.txt", "two.txt", "three.txt", "taken.txt", "keep.txt"):
+            self.fs.create_file(os.path.join(self.test_dir, name), contents=name)
+        self.write_mapping("/mixed.csv", ['one.txt', '1.txt'], ['two.txt', 'taken.txt'], ['gone.txt', 'x.txt'], ['', 'y.txt'], ['taken.txt', 't.txt'], ['three.txt', 'keep.txt'])
+        result = RenamePlugin.run({'source_folder': self.test_dir, 'csv_path': "/mixed.csv"}, None)
+        self.assertEqual((result.scanned_count, result.success_count, result.failure_count), (6, 3, 3))
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["1.txt", "file_name_change_log.csv", "file_name_change_log.journal", "keep.txt", "t.txt", "taken.txt", "three.txt"])
+        self.assertIn((os.path.join(self.test_dir, "three.txt"), TARGET_EXISTS), result.failures)
+        with open(os.path.join(self.test_dir, "taken.txt")) as f:
+            self.assertEqual(f.read(), "two.txt")
+        with open(os.path.join(self.test_dir, "file_name_change_log.csv"), newline='') as f:
+            rows = [(row['old_path'], row['new_path'], row['status'], row['action_type']) for row in csv.DictReader(f)]
+        moved = {(os.path.basename(old), os.path.basename(new)) for old, new, status, action in rows}
+        self.assertEqual(moved, {("one.txt", "1.txt"), ("taken.txt", "t.txt"), ("two.txt", "taken.txt")})
+        self.assertEqual({(status, action) for _, _, status, action in rows}, {('success', 'rename')})
@@ -99,4 +99,13 @@ class TestRenamePrefixPlugin(TestCase):
         plugin.target_directory_var.set(self.source_dir)
         plugin.csv_path_var.set(self.csv_path)
         is_valid, msg = plugin.validate()
-        self.assertTrue(is_valid)
\ No newline at end of file
+        self.assertTrue(is_valid)
+
+    def test_longest_matching_key_wins(self, mock_messagebox):
+        """Overlapping base names are resolved by the longest match, not by CSV order."""
+        with open(self.csv_path, 'a', newline='') as f:
+            csv.writer(f).writerow(['report2024', 'yearly'])
+        result = RenamePrefixPlugin.run({'target_directory': self.source_dir, 'csv_path': self.csv_path}, None)
+        self.assertEqual(result.success_count, 3)
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "yearly_report2024.pdf")))
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "monthly_report2023.txt")))
@@ -8,6 +8,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from plugins.replace_plugin import ReplacePlugin
+from core.rename_rules import make_rule, save_rule_set
 
 @patch('ttkbootstrap.dialogs.Messagebox')
 class TestReplacePlugin(TestCase):
@@ -66,4 +67,23 @@ class TestReplacePlugin(TestCase):
         is_valid, msg = plugin.validate()
         
         self.assertFalse(is_valid)
-        self.assertIn("Invalid Regex pattern", msg)
\ No newline at end of file
+        self.assertIn("Invalid Regex pattern", msg)
+
+    def test_rule_set_is_applied_in_one_pass(self, mock_messagebox):
+        """Saved rules run in order on each file, which is renamed once however many rules match."""
+        self.fs.create_file(os.path.join(self.source_dir, "IMG 001 (copy).JPEG"))
+        self.fs.create_file(os.path.join(self.source_dir, "notes.txt"))
+        save_rule_set("/rules.json", [
+            make_rule(" (copy)", ""),
+            make_rule(r"\s+", "_", use_regex=True),
+            make_rule("IMG_", "photo-"),
+            make_rule("JPEG", "jpg", target="ext"),
+        ])
+        result = ReplacePlugin.run({'source_folder': self.source_dir, 'rules_file': "/rules.json"}, None)
+        self.assertEqual((result.success_count, result.skipped_count), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "photo-001.jpg")))
+        with open(os.path.join(self.source_dir, "file_name_change_log.csv")) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        result = ReplacePlugin.run({'source_folder': self.source_dir, 'rules': [make_rule("(", "", use_regex=True)]}, None)
+        self.assertIn("Invalid Regex pattern in rule 1", result.error)
@@ -0,0 +1,149 @@
+import unittest
+import os
+from unittest.mock import MagicMock, patch
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from plugins.organize_plugin import OrganizePlugin
+from plugins.rollback_plugin import RollbackPlugin
+from core.interfaces import ActionContext
+from core.journal import RunJournal, journal_dir_for
+
+@patch('ttkbootstrap.dialogs.Messagebox')
+class TestRollbackPlugin(TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.source_dir = "/source"
+        self.log_path = os.path.join(self.source_dir, "file_name_change_log.csv")
+        self.fs.create_dir(self.source_dir)
+        self.mock_app = MagicMock()
+        self.mock_app.log = MagicMock()
+
+    def _organize(self, filename):
+        self.fs.create_file(os.path.join(self.source_dir, filename))
+        result = OrganizePlugin.run({'source_folder': self.source_dir, 'delimiter': '-', 'recursive': False}, None)
+        self.assertEqual(result.success_count, 1)
+
+    def test_rollback_single_run_then_everything(self, mock_messagebox):
+        """A run can be rolled back on its own; a later full rollback skips it and archives the log."""
+        self._organize("a-first.txt")
+        self._organize("b-second.txt")
+        runs = RunJournal(journal_dir_for(self.log_path)).runs()
+        self.assertEqual([run['plugin'] for run in runs], ['organize', 'organize'])
+
+        # runs() is newest first, so this is the run that moved b-second.txt.
+        result = RollbackPlugin.run({'source_folder': self.source_dir, 'run_id': runs[0]['run_id']}, None)
+        self.assertEqual(result.success_count, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "b-second.txt")))
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "a", "first.txt")))
+        self.assertTrue(os.path.exists(self.log_path))
+
+        result = RollbackPlugin.run({'source_folder': self.source_dir}, None)
+        self.assertEqual(result.success_count, 1)
+        self.assertEqual(result.failure_count, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "a-first.txt")))
+        self.assertFalse(os.path.exists(self.log_path))
+        self.assertFalse(os.path.exists(journal_dir_for(self.log_path)))
+        self.assertEqual(len(result.outputs), 2)
+
+    def test_time_range_outside_runs_reverts_nothing(self, mock_messagebox):
+        self._organize("a-first.txt")
+        result = RollbackPlugin.run({'source_folder': self.source_dir, 'until': '2000-01-01'}, None)
+        self.assertEqual(result.success_count, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "a", "first.txt")))
+
+    def test_legacy_log_without_journal(self, mock_messagebox):
+        """A change log written before the journal existed is still rolled back in full."""
+        self.fs.create_file(os.path.join(self.source_dir, "new", "moved.txt"))
+        self.fs.create_file(self.log_path, contents=(
+            "timestamp,old_path,new_path,status,action_type,details\n"
+            "2024-01-01T00:00:00,/source/moved.txt,/source/new/moved.txt,success,organize,\n"))
+        result = RollbackPlugin.run({'source_folder': self.source_dir}, None)
+        self.assertEqual(result.success_count, 1)
+        self.assertTrue(os.path.exists("/source/moved.txt"))
+
+        scoped = RollbackPlugin.run({'source_folder': self.source_dir, 'run_id': 'x'}, None)
+        self.assertIsNotNone(scoped.error)
+
+    def test_legacy_log_is_reverted_last_row_first(self, mock_messagebox):
+        """Chained moves are undone in reverse; failures and deleted duplicates are skipped."""
+        self.fs.create_file("/source/c.txt")
+        self.fs.create_file(self.log_path, contents=(
+            "timestamp,old_path,new_path,status,action_type,details\n"
+            "2024-01-01T00:00:00,/source/a.txt,/source/b.txt,success,rename,\n"
+            "2024-01-01T00:00:01,/source/x.txt,/source/y.txt,\"failure - line one\nline two\",rename,\n"
+            "2024-01-01T00:00:02,/source/dupe.txt,,success,delete_duplicate,\n"
+            "2024-01-01T00:00:03,/source/b.txt,/source/c.txt,success,rename,\n"))
+        result = RollbackPlugin.run({'source_folder': self.source_dir}, None)
+        self.assertTrue(os.path.exists("/source/a.txt"))
+        self.assertEqual(result.success_count, 2)
+        self.assertEqual(result.failure_count, 1)
+        self.assertEqual(result.operations, [("/source/c.txt", "/source/b.txt"), ("/source/b.txt", "/source/a.txt")])
+        self.assertTrue(result.outputs[0].startswith(self.log_path + ".rolled_back_"))
+
+    def test_parallel_rollback_keeps_chains_in_order(self, mock_messagebox):
+        """Independent moves run concurrently, chained moves are undone in order, and conflicts stop the run."""
+        rows = ["timestamp,old_path,new_path,status,action_type,details"]
+        for i in range(20):
+            self.fs.create_file(f"/out/f{i}.txt")
+            rows.append(f"2024-01-01T00:00:00,/source/f{i}.txt,/out/f{i}.txt,success,organize,")
+        self.fs.create_file("/source/c.txt")
+        rows.append("2024-01-01T00:00:01,/source/a.txt,/source/b.txt,success,rename,")
+        rows.append("2024-01-01T00:00:02,/source/b.txt,/source/c.txt,success,rename,")
+        self.fs.create_file(self.log_path, contents="\n".join(rows) + "\n")
+        result = RollbackPlugin.run({'source_folder': self.source_dir, 'workers': 4}, None)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.success_count, 22)
+        self.assertTrue(os.path.exists("/source/a.txt"))
+        self.assertFalse(os.path.exists("/source/b.txt"))
+        self.assertTrue(all(os.path.exists(f"/source/f{i}.txt") for i in range(20)))
+
+        self.fs.create_file("/source/taken.txt")
+        self.fs.create_file("/out/taken.txt")
+        self.fs.create_file(self.log_path, contents=(
+            "timestamp,old_path,new_path,status,action_type,details\n"
+            "2024-01-01T00:00:00,/source/taken.txt,/out/taken.txt,success,organize,\n"))
+        result = RollbackPlugin.run({'source_folder': self.source_dir, 'workers': 4}, None)
+        self.assertIn("Conflict", result.error)
+        self.assertTrue(os.path.exists("/out/taken.txt"))
+        self.assertTrue(os.path.exists(self.log_path))
+
+    def test_cancelled_legacy_rollback_resumes(self, mock_messagebox):
+        """A legacy log is imported into a journal, so a rerun after cancelling skips what was already reverted."""
+        rows = ["timestamp,old_path,new_path,status,action_type,details"]
+        for name in ("a", "b", "c"):
+            self.fs.create_file(f"/out/{name}.txt")
+            rows.append(f"2024-01-01T00:00:00,/source/{name}.txt,/out/{name}.txt,success,organize,")
+        self.fs.create_file(self.log_path, contents="\n".join(rows) + "\n")
+        context = ActionContext(log=lambda message: message.startswith("SUCCESS") and context.cancel())
+        result = RollbackPlugin.run({'source_folder': self.source_dir}, context)
+        self.assertTrue(result.cancelled)
+        self.assertEqual(result.operations, [("/out/c.txt", "/source/c.txt")])
+        self.assertTrue(os.path.exists(self.log_path))
+
+        result = RollbackPlugin.run({'source_folder': self.source_dir}, None)
+        self.assertEqual((result.success_count, result.failure_count), (2, 0))
+        self.assertTrue(all(os.path.exists(f"/source/{name}.txt") for name in ("a", "b", "c")))
+
+    def test_serial_rollback_stops_on_conflict(self, mock_messagebox):
+        """With one worker, an occupied original path stops the rollback instead of being overwritten."""
+        self.fs.create_file("/source/taken.txt", contents="new file")
+        self.fs.create_file("/out/taken.txt", contents="moved file")
+        self.fs.create_file("/out/free.txt")
+        self.fs.create_file(self.log_path, contents=(
+            "timestamp,old_path,new_path,status,action_type,details\n"
+            "2024-01-01T00:00:00,/source/free.txt,/out/free.txt,success,organize,\n"
+            "2024-01-01T00:00:01,/source/taken.txt,/out/taken.txt,success,organize,\n"))
+        result = RollbackPlugin.run({'source_folder': self.source_dir, 'workers': 1}, None)
+        self.assertIn("Conflict", result.error)
+        with open("/source/taken.txt") as f:
+            self.assertEqual(f.read(), "new file")
+        self.assertTrue(os.path.exists("/out/taken.txt"))
+        self.assertTrue(os.path.exists("/out/free.txt"))
+        self.assertTrue(os.path.exists(self.log_path))
+
+
+if __name__ == '__main__':
+    unittest.main()